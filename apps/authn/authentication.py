@@ -1,27 +1,40 @@
 from typing import Tuple, Optional
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
-from .tokens import decode_jwt
+from infra.tracing import traced_methods
+from .tokens import decode_jwt_cached, scope_hash
 
 class Principal:
     """
     Lightweight "user" object (no django.contrib.auth dependency).
+    grocery_scopes: hashed grocery uids from the "grp" claim, or None when the
+    token carries no claim (permissions must then ask the graph).
     """
-    def __init__(self, user_id: str, email: str, role: str):
+    def __init__(self, user_id: str, email: str, role: str, grocery_scopes: Optional[frozenset] = None):
         self.id = user_id
         self.email = email
         self.role = role
+        self.grocery_scopes = grocery_scopes
         self.is_authenticated = True
 
     # DRF sometimes checks these
     @property
     def pk(self): return self.id
+
+    def grocery_scope(self, grocery_uid: str) -> Optional[bool]:
+        """
+        True/False when the token decides it, None when there is no scope claim.
+        """
+        if self.grocery_scopes is None:
+            return None
+        return scope_hash(grocery_uid) in self.grocery_scopes
     def __str__(self): return f"Principal<{self.email}:{self.role}>"
 
+@traced_methods("authentication")
 class CustomJWTAuthentication(BaseAuthentication):
     """
-    Reads Authorization: Bearer <access_token>, validates with PyJWT,
-    and returns a Principal + claims dict.
+    Reads Authorization: Bearer <access_token>, validates with PyJWT
+    (or the per-process verified-token cache), and returns a Principal + claims dict.
     """
     www_authenticate_realm = "api"
     media_type = "application/json"
@@ -37,7 +50,7 @@ class CustomJWTAuthentication(BaseAuthentication):
 
         token = auth[1].decode("utf-8")
         try:
-            claims = decode_jwt(token)
+            claims = decode_jwt_cached(token)
         except Exception as e:
             raise AuthenticationFailed("Invalid or expired token.") from e
 
@@ -48,6 +61,7 @@ class CustomJWTAuthentication(BaseAuthentication):
             user_id=claims["sub"],
             email=claims.get("email", ""),
             role=claims.get("role", ""),
+            grocery_scopes=frozenset(claims["grp"]) if "grp" in claims else None,
         )
         # optionally expose claims to views/permissions
         request.jwt_claims = claims
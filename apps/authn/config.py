@@ -7,3 +7,8 @@ JWT_ISSUER = getattr(settings, "JWT_ISSUER", "gms")
 JWT_AUDIENCE = getattr(settings, "JWT_AUDIENCE", "gms.api")
 JWT_ACCESS_LIFETIME = timedelta(minutes=getattr(settings, "JWT_ACCESS_MINUTES", 30))
 JWT_REFRESH_LIFETIME = timedelta(days=getattr(settings, "JWT_REFRESH_DAYS", 7))
+# Supplier grocery scopes embedded in access tokens (see tokens.scope_hash)
+JWT_SCOPED_ACCESS_LIFETIME = timedelta(minutes=getattr(settings, "JWT_SCOPED_ACCESS_MINUTES", 5))
+JWT_SCOPE_MAX_GROCERIES = getattr(settings, "JWT_SCOPE_MAX_GROCERIES", 64)
+# Verified-claims LRU in front of decode_jwt (0 disables it)
+JWT_DECODE_CACHE_SIZE = getattr(settings, "JWT_DECODE_CACHE_SIZE", 10_000)
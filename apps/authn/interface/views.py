@@ -6,17 +6,34 @@ from django.contrib.auth.hashers import check_password
 from rest_framework.exceptions import AuthenticationFailed, ValidationError
 
 from apps.users.infrastructure.models import UserNode
+from apps.users.infrastructure.repositories import Neo4jUserRepository
+from apps.users.infrastructure.cached_repositories import CachedUserRepository
 from .serializers import LoginSerializer, RefreshSerializer, TokenPairOutSerializer, AccessOutSerializer
 from ..tokens import make_jwt, decode_jwt
+from ..config import JWT_SCOPE_MAX_GROCERIES
 from common.api import ok  # success envelope
 from common.exceptions import problem_response
 
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from common.schemas import Envelope, Problem
+from infra.neo4j.unit_of_work import non_atomic
+
+users = CachedUserRepository(Neo4jUserRepository())
+
+
+def _grocery_scopes(user_uid: str, role: str):
+    """
+    Groceries to embed in a supplier's access token (None for other roles).
+    Fetches one past the cap so make_jwt can tell an oversized set apart.
+    """
+    if role != "SUPPLIER":
+        return None
+    return Neo4jUserRepository().list_responsible_grocery_uids(user_uid, limit=JWT_SCOPE_MAX_GROCERIES + 1)
+
 
 class LoginView(APIView):
     permission_classes = [AllowAny]   # public endpoint
-
+    throttle_scope = "login"
 
     @extend_schema(
         tags=["Auth"],
@@ -28,6 +45,7 @@ class LoginView(APIView):
             401: Problem("invalid_credentials"),
         },
     )
+    @non_atomic   # read-only: no write transaction
     def post(self, request, *args, **kwargs):
         ser = LoginSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -46,7 +64,8 @@ class LoginView(APIView):
                 type_slug="unauthorized"
             )
 
-        access = make_jwt(sub=user.uid, email=user.email, role=user.role, typ="access")
+        access = make_jwt(sub=user.uid, email=user.email, role=user.role, typ="access",
+                          groceries=_grocery_scopes(user.uid, user.role))
         refresh = make_jwt(sub=user.uid, email=user.email, role=user.role, typ="refresh")
         return ok(
             {
@@ -81,6 +100,7 @@ class RefreshView(APIView):
             401: Problem("invalid_token"),
         },
     )
+    @non_atomic   # read-only: no write transaction, so the user cache applies
     def post(self, request, *args, **kwargs):
         ser = RefreshSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -109,9 +129,8 @@ class RefreshView(APIView):
             )
 
         # (Optional) look up user to ensure still active (revocation check).
-        user = UserNode.nodes.get_or_none(uid=claims["sub"])
+        user = users.get_by_id(claims["sub"])
         if not user or not user.is_active:
-            
             return problem_response(
                 request,
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -121,7 +140,8 @@ class RefreshView(APIView):
                 type_slug="unauthorized"
             )
 
-        new_access = make_jwt(sub=claims["sub"], email=claims.get("email",""), role=claims.get("role",""), typ="access")
+        new_access = make_jwt(sub=claims["sub"], email=claims.get("email",""), role=claims.get("role",""), typ="access",
+                              groceries=_grocery_scopes(claims["sub"], claims.get("role","")))
         new_refresh = make_jwt(sub=claims["sub"], email=claims.get("email",""), role=claims.get("role",""), typ="refresh")
 
         return ok(
@@ -0,0 +1,39 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.authn.tokens import make_jwt, decode_jwt, decode_jwt_cached, verified_tokens
+
+class Command(BaseCommand):
+    help = "Micro-benchmark: full decode_jwt vs the verified-token LRU"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50_000,
+                            help="Decodes per measurement")
+        parser.add_argument("--tokens", type=int, default=100,
+                            help="Distinct tokens cycled through (simulates concurrent clients)")
+
+    def handle(self, *args, **options):
+        n = options["iterations"]
+        tokens = [
+            make_jwt(sub=f"user-{i}", email=f"u{i}@example.com", role="SUPPLIER", typ="access",
+                     groceries=[f"grocery-{i}"])
+            for i in range(options["tokens"])
+        ]
+
+        def run(fn):
+            start = time.perf_counter()
+            for i in range(n):
+                fn(tokens[i % len(tokens)])
+            return (time.perf_counter() - start) / n * 1e6
+
+        full = run(decode_jwt)
+        verified_tokens.clear()
+        cached = run(decode_jwt_cached)
+
+        stats = verified_tokens.stats()
+        self.stdout.write(f"decode_jwt        : {full:8.2f} µs/op")
+        self.stdout.write(f"decode_jwt_cached : {cached:8.2f} µs/op "
+                          f"(hits={stats['hits']} misses={stats['misses']} size={stats['size']})")
+        if not stats["maxsize"]:
+            self.stdout.write(self.style.WARNING("JWT_DECODE_CACHE_SIZE=0: cache is disabled"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"speed-up: {full / cached:.1f}x"))
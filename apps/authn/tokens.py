@@ -1,9 +1,16 @@
-import uuid, time, jwt
+import uuid, time, jwt, base64, hashlib
 from datetime import datetime, timezone
+from typing import Iterable, Optional
 from .config import (
     JWT_SECRET, JWT_ALGORITHM, JWT_ISSUER, JWT_AUDIENCE,
-    JWT_ACCESS_LIFETIME, JWT_REFRESH_LIFETIME
+    JWT_ACCESS_LIFETIME, JWT_REFRESH_LIFETIME,
+    JWT_SCOPED_ACCESS_LIFETIME, JWT_SCOPE_MAX_GROCERIES,
+    JWT_DECODE_CACHE_SIZE,
 )
+from infra.monitoring import JWT_CACHE_HITS, JWT_DECODE
+from .token_cache import VerifiedTokenCache
+
+verified_tokens = VerifiedTokenCache(JWT_DECODE_CACHE_SIZE)
 
 def _now():
     return datetime.now(timezone.utc)
@@ -11,13 +18,32 @@ def _now():
 def _ts(dt):
     return int(dt.timestamp())
 
-def make_jwt(*, sub: str, email: str, role: str, typ: str):
+def scope_hash(grocery_uid: str) -> str:
+    """
+    8-char digest of a grocery uid, as stored in the "grp" claim.
+    """
+    digest = hashlib.blake2b(grocery_uid.encode("utf-8"), digest_size=6).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+def make_jwt(*, sub: str, email: str, role: str, typ: str,
+             groceries: Optional[Iterable[str]] = None):
     """
     typ: "access" or "refresh"
+    groceries: uids a supplier is RESPONSIBLE_FOR. Access tokens then carry
+    them hashed in "grp" and get the shorter JWT_SCOPED_ACCESS_LIFETIME. Sets
+    larger than JWT_SCOPE_MAX_GROCERIES are left out (permissions use the graph).
     """
     assert typ in {"access", "refresh"}
     now = _now()
-    exp = now + (JWT_ACCESS_LIFETIME if typ == "access" else JWT_REFRESH_LIFETIME)
+    grp = None
+    if typ == "access" and groceries is not None:
+        groceries = list(groceries)
+        if len(groceries) <= JWT_SCOPE_MAX_GROCERIES:
+            grp = sorted(scope_hash(g) for g in groceries)
+    if typ == "refresh":
+        exp = now + JWT_REFRESH_LIFETIME
+    else:
+        exp = now + (JWT_SCOPED_ACCESS_LIFETIME if grp is not None else JWT_ACCESS_LIFETIME)
     payload = {
         "iss": JWT_ISSUER,
         "aud": JWT_AUDIENCE,
@@ -30,6 +56,8 @@ def make_jwt(*, sub: str, email: str, role: str, typ: str):
         "role": role,
         "typ": typ,
     }
+    if grp is not None:
+        payload["grp"] = grp
     token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return token
 
@@ -45,3 +73,18 @@ def decode_jwt(token: str):
         issuer=JWT_ISSUER,
         options={"require": ["exp", "iat", "nbf", "iss", "aud", "sub", "typ"]},
     )
+
+def decode_jwt_cached(token: str):
+    """
+    decode_jwt behind the verified-token LRU. Returns a copy so callers can't
+    mutate the cached claims. Same exceptions as decode_jwt on a miss.
+    """
+    claims = verified_tokens.get(token)
+    if claims is None:
+        start = time.perf_counter()
+        claims = decode_jwt(token)
+        JWT_DECODE.observe(time.perf_counter() - start)
+        verified_tokens.put(token, claims)
+    else:
+        JWT_CACHE_HITS.inc()
+    return dict(claims)
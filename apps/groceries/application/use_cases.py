@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from apps.groceries.domain.repositories import GroceryRepositoryPort
 from apps.groceries.domain.entities import GroceryEntity
+from infra.tracing import traced_methods
 from .validators import GroceryCreateDTO, GroceryUpdateDTO, validate_create, validate_update
 
+@traced_methods("use_case")
 @dataclass
 class CreateGrocery:
     repo: GroceryRepositoryPort
@@ -10,6 +12,7 @@ class CreateGrocery:
         validate_create(dto)
         return self.repo.create(name=dto.name.strip(), location=dto.location.strip())
 
+@traced_methods("use_case")
 @dataclass
 class UpdateGrocery:
     repo: GroceryRepositoryPort
@@ -20,6 +23,7 @@ class UpdateGrocery:
         if dto.location is not None: fields["location"] = dto.location.strip()
         return self.repo.update_fields(uid=uid, **fields)
 
+@traced_methods("use_case")
 @dataclass
 class DeleteGrocery:
     repo: GroceryRepositoryPort
@@ -1,4 +1,7 @@
+import math
+import time
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
 @dataclass
 class GroceryCreateDTO:
@@ -23,3 +26,55 @@ def validate_update(dto: GroceryUpdateDTO):
         raise ValueError("Grocery name too short.")
     if dto.location is not None and len(dto.location.strip()) < 2:
         raise ValueError("Grocery location too short.")
+
+
+@dataclass(frozen=True, slots=True)
+class SaleEventDTO:
+    item: str
+    qty: int
+    price: float          # unit price
+    ts: float             # epoch seconds (UTC)
+
+# Bounds on a single sale: the sales flusher turns ts into a date and sums qty
+# into Neo4j int64 counters, so out-of-range values must not get that far.
+SALE_MAX_QTY = 1_000_000
+SALE_MAX_PRICE = 1_000_000_000.0
+SALE_MIN_TS = 946_684_800.0          # 2000-01-01T00:00:00Z
+SALE_MAX_TS_AHEAD = 86_400.0         # clock skew tolerated on the point of sale
+
+def parse_sale(row) -> SaleEventDTO:
+    """
+    One point-of-sale event: {"item": uid, "qty": n, "price": p, "ts": ISO-8601 or epoch}.
+    Hand-rolled rather than a DRF serializer: ingestion validates thousands per second.
+    Raises ValueError.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Expected an object.")
+    item = row.get("item")
+    if not isinstance(item, str) or not item:
+        raise ValueError("item: a uid is required.")
+    qty = row.get("qty")
+    if isinstance(qty, bool) or not isinstance(qty, int) or qty < 1:
+        raise ValueError("qty: a positive integer is required.")
+    if qty > SALE_MAX_QTY:
+        raise ValueError(f"qty: at most {SALE_MAX_QTY}.")
+    price = row.get("price")
+    if isinstance(price, bool) or not isinstance(price, (int, float)) or price < 0:
+        raise ValueError("price: a non-negative number is required.")
+    if not math.isfinite(price) or price > SALE_MAX_PRICE:
+        raise ValueError(f"price: a finite number up to {SALE_MAX_PRICE:.0f} is required.")
+    ts = row.get("ts")
+    if isinstance(ts, str):
+        try:
+            parsed = datetime.fromisoformat(ts)
+        except ValueError:
+            raise ValueError("ts: ISO-8601 datetime or epoch seconds expected.")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        ts = parsed.timestamp()
+    elif isinstance(ts, bool) or not isinstance(ts, (int, float)):
+        raise ValueError("ts: ISO-8601 datetime or epoch seconds expected.")
+    # also rejects NaN and values datetime.fromtimestamp() can't take
+    if not SALE_MIN_TS <= ts <= time.time() + SALE_MAX_TS_AHEAD:
+        raise ValueError("ts: must be after 2000-01-01 and not in the future.")
+    return SaleEventDTO(item=item, qty=qty, price=float(price), ts=float(ts))
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime, date
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GroceryEntity:
     id: str
     name: str
@@ -12,7 +12,7 @@ class GroceryEntity:
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ItemEntity:
     id: str
     name: str
@@ -24,10 +24,29 @@ class ItemEntity:
     updated_at: datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DailyIncomeEntity:
     id: str
     amount: float
     date: date
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeEntity:
+    kind: str                 # item | income | income_deleted
+    entity: ItemEntity | DailyIncomeEntity | str   # income_deleted: the removed income's uid
+    position: tuple           # (stored updated_at, uid): where the changes feed resumes
+
+
+@dataclass(frozen=True, slots=True)
+class IncomeRollupEntity:
+    granularity: str          # month | week
+    period: str               # 2025-09 | 2025-W36
+    start: date
+    end: date
+    sum: float
+    count: int
+    min: float | None
+    max: float | None
@@ -0,0 +1,15 @@
+class BulkImportInterrupted(Exception):
+    """
+    A batched import failed after `created` rows (the first ones, in order)
+    had been committed; `__cause__` is the error that stopped it.
+    """
+    def __init__(self, created: int, message: str):
+        super().__init__(message)
+        self.created = created
+
+
+class ConcurrentUpdate(Exception):
+    """
+    A compare-and-set write found the row changed since the version the
+    client based its edit on (If-Match).
+    """
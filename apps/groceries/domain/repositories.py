@@ -1,10 +1,16 @@
+from datetime import datetime
 from typing import Protocol, Optional, Iterable
-from .entities import GroceryEntity, ItemEntity,DailyIncomeEntity
+from .entities import GroceryEntity, ItemEntity,DailyIncomeEntity, IncomeRollupEntity, ChangeEntity
 
 class GroceryRepositoryPort(Protocol):
     def create(self, *, name: str, location: str) -> GroceryEntity: ...
     def get_by_id(self, uid: str) -> Optional[GroceryEntity]: ...
-    def list_active(self) -> Iterable[GroceryEntity]: ...
+    # Keyset pagination: `after`/`before` are (sort_key, uid) positions, `limit` caps the rows.
+    def list_active(self, *, after: tuple | None = None, before: tuple | None = None,
+                    limit: int | None = None) -> Iterable[GroceryEntity]: ...
+    # Validators for conditional GETs: (max updated_at, count) of the list / one row's updated_at
+    def list_version(self) -> tuple[Optional[datetime], int]: ...
+    def version(self, uid: str) -> Optional[datetime]: ...
     def update_fields(self, *, uid: str, **fields) -> GroceryEntity: ...
     def soft_delete(self, *, uid: str) -> None: ...
 
@@ -12,9 +18,16 @@ class GroceryRepositoryPort(Protocol):
 class ItemRepositoryPort(Protocol):
     def create(self, *, grocery_uid: str, name: str, item_type: str,
                item_location: str, price: float) -> ItemEntity: ...
+    def bulk_create(self, *, grocery_uid: str, rows: list[dict], batch_size: int = 1000) -> int: ...
     def get_by_id(self, uid: str) -> Optional[ItemEntity]: ...
-    def list_by_grocery(self, grocery_uid: str, include_deleted: bool=False) -> Iterable[ItemEntity]: ...
-    def update_fields(self, *, uid: str, **fields) -> ItemEntity: ...
+    def list_by_grocery(self, grocery_uid: str, include_deleted: bool=False, *,
+                        after: tuple | None = None, before: tuple | None = None,
+                        limit: int | None = None) -> Iterable[ItemEntity]: ...
+    def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]: ...
+    def version(self, uid: str) -> Optional[datetime]: ...
+    # `expected_updated_at`: compare-and-set, raises ConcurrentUpdate if the item changed since
+    def update_fields(self, *, uid: str, expected_updated_at: Optional[datetime] = None,
+                      **fields) -> ItemEntity: ...
     def soft_delete(self, *, uid: str) -> None: ...
 
 
@@ -22,6 +35,65 @@ class ItemRepositoryPort(Protocol):
 
 
 class DailyIncomeRepositoryPort(Protocol):
-    def create(self, *, grocery_uid: str, amount: float, date: str) -> DailyIncomeEntity: ...
+    # One node per (grocery, date): mode "add" adds to the day's amount, "replace" sets it
+    def create(self, *, grocery_uid: str, amount: float, date: str, mode: str = "add") -> DailyIncomeEntity: ...
+    def create_many(self, *, grocery_uid: str, rows: list[dict], mode: str = "add") -> list[DailyIncomeEntity]: ...
     def list_by_grocery(self, grocery_uid: str, start: str | None = None,
-                        end: str | None = None) -> Iterable[DailyIncomeEntity]: ...
+                        end: str | None = None, *,
+                        after: tuple | None = None, before: tuple | None = None,
+                        limit: int | None = None) -> Iterable[DailyIncomeEntity]: ...
+    def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]: ...
+    # Reads only the IncomeRollup nodes for periods overlapping [start, end]
+    def summarize(self, grocery_uid: str, granularity: str, start: str | None = None,
+                  end: str | None = None) -> Iterable[IncomeRollupEntity]: ...
+
+
+class SalesRepositoryPort(Protocol):
+    # Adds pre-aggregated point-of-sale totals in one transaction:
+    # days = [{gid, date, amount}], items = [{gid, uid, qty, revenue, last}]
+    def record_sales(self, *, days: list[dict], items: list[dict]) -> None: ...
+
+
+class ChangeFeedPort(Protocol):
+    # Items (soft-deleted ones included), income and removed income uids of a grocery changed after the
+    # `after` position and up to `until` (epoch seconds), in (updated_at, uid) order
+    def changes(self, grocery_uid: str, *, after: tuple | None = None, until: float,
+                limit: int) -> list[ChangeEntity]: ...
+
+
+class AuthorizationPort(Protocol):
+    def supplier_grocery_access(self, *, user_uid: str, grocery_uid: str) -> bool: ...
+    def supplier_item_access(self, *, user_uid: str, item_uid: str) -> tuple[Optional[str], bool]: ...
+
+
+# Async read ports (ASGI hot paths). Lists come back materialised: callers always
+# ask for one keyset page.
+class AsyncGroceryReadPort(Protocol):
+    async def get_by_id(self, uid: str) -> Optional[GroceryEntity]: ...
+    async def list_active(self, *, after: tuple | None = None, before: tuple | None = None,
+                          limit: int | None = None) -> list[GroceryEntity]: ...
+    async def list_version(self) -> tuple[Optional[datetime], int]: ...
+    async def version(self, uid: str) -> Optional[datetime]: ...
+
+
+class AsyncItemReadPort(Protocol):
+    async def get_by_id(self, uid: str) -> Optional[ItemEntity]: ...
+    async def list_by_grocery(self, grocery_uid: str, include_deleted: bool=False, *,
+                              after: tuple | None = None, before: tuple | None = None,
+                              limit: int | None = None) -> list[ItemEntity]: ...
+    async def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]: ...
+    async def version(self, uid: str) -> Optional[datetime]: ...
+
+
+class AsyncDailyIncomeReadPort(Protocol):
+    async def list_by_grocery(self, grocery_uid: str, start: str | None = None,
+                              end: str | None = None, *,
+                              after: tuple | None = None, before: tuple | None = None,
+                              limit: int | None = None) -> list[DailyIncomeEntity]: ...
+    async def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]: ...
+    async def summarize(self, grocery_uid: str, granularity: str, start: str | None = None,
+                        end: str | None = None) -> list[IncomeRollupEntity]: ...
+
+
+class AsyncAuthorizationPort(Protocol):
+    async def supplier_grocery_access(self, *, user_uid: str, grocery_uid: str) -> bool: ...
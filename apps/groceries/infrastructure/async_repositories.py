@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Optional
+from apps.groceries.domain.entities import GroceryEntity, ItemEntity, DailyIncomeEntity, IncomeRollupEntity
+from apps.groceries.domain.repositories import (
+    AsyncGroceryReadPort, AsyncItemReadPort, AsyncDailyIncomeReadPort, AsyncAuthorizationPort,
+)
+from infra.neo4j.driver import acypher_read
+from infra.tracing import traced_methods
+from .authorization import GROCERY_ACCESS
+from .repositories import (
+    GROCERY_BY_ID, ITEM_BY_ID, INCOME_SUMMARY,
+    GROCERY_LIST_VERSION, GROCERY_VERSION, ITEM_LIST_VERSION, ITEM_VERSION, INCOME_LIST_VERSION,
+    _list_version, _version,
+    _grocery_list_query, _item_list_query, _income_list_query, _summary_params,
+    _to_entity, _to_item_entity, _to_income_entity, _to_rollup_entity,
+)
+
+# Same Cypher as the sync repositories, run on the async driver (infra.neo4j.driver)
+# so one ASGI worker can have many queries in flight. Read paths only: writes stay on
+# the sync repositories and the request unit of work.
+
+
+async def _rows(query: str, params: dict, backwards: bool = False) -> list:
+    res, _ = await acypher_read(query, params)
+    return res[::-1] if backwards else res
+
+
+@traced_methods("repository")
+class AsyncNeo4jGroceryRepository(AsyncGroceryReadPort):
+    async def get_by_id(self, uid: str) -> Optional[GroceryEntity]:
+        res = await _rows(GROCERY_BY_ID, {"uid": uid})
+        return _to_entity(res[0][0]) if res else None
+
+    async def list_active(self, *, after: tuple | None = None, before: tuple | None = None,
+                          limit: int | None = None) -> list[GroceryEntity]:
+        q, params, backwards = _grocery_list_query(after=after, before=before, limit=limit)
+        return [_to_entity(row[0]) for row in await _rows(q, params, backwards)]
+
+    async def list_version(self) -> tuple[Optional[datetime], int]:
+        return _list_version(await _rows(GROCERY_LIST_VERSION, {}))
+
+    async def version(self, uid: str) -> Optional[datetime]:
+        return _version(await _rows(GROCERY_VERSION, {"uid": uid}))
+
+
+@traced_methods("repository")
+class AsyncNeo4jItemRepository(AsyncItemReadPort):
+    async def get_by_id(self, uid: str) -> Optional[ItemEntity]:
+        res = await _rows(ITEM_BY_ID, {"uid": uid})
+        return _to_item_entity(res[0][0]) if res else None
+
+    async def list_by_grocery(self, grocery_uid: str, include_deleted: bool=False, *,
+                              after: tuple | None = None, before: tuple | None = None,
+                              limit: int | None = None) -> list[ItemEntity]:
+        q, params, backwards = _item_list_query(grocery_uid, include_deleted,
+                                                after=after, before=before, limit=limit)
+        return [_to_item_entity(row[0]) for row in await _rows(q, params, backwards)]
+
+    async def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]:
+        return _list_version(await _rows(ITEM_LIST_VERSION, {"gid": grocery_uid}))
+
+    async def version(self, uid: str) -> Optional[datetime]:
+        return _version(await _rows(ITEM_VERSION, {"uid": uid}))
+
+
+@traced_methods("repository")
+class AsyncNeo4jDailyIncomeRepository(AsyncDailyIncomeReadPort):
+    async def list_by_grocery(self, grocery_uid: str, start: str | None = None, end: str | None = None, *,
+                              after: tuple | None = None, before: tuple | None = None,
+                              limit: int | None = None) -> list[DailyIncomeEntity]:
+        q, params, backwards = _income_list_query(grocery_uid, start, end,
+                                                  after=after, before=before, limit=limit)
+        return [_to_income_entity(row[0]) for row in await _rows(q, params, backwards)]
+
+    async def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]:
+        return _list_version(await _rows(INCOME_LIST_VERSION, {"gid": grocery_uid}))
+
+    async def summarize(self, grocery_uid: str, granularity: str, start: str | None = None,
+                        end: str | None = None) -> list[IncomeRollupEntity]:
+        res = await _rows(INCOME_SUMMARY, _summary_params(grocery_uid, granularity, start, end))
+        return [_to_rollup_entity(row[0]) for row in res]
+
+
+@traced_methods("repository")
+class AsyncNeo4jAuthorizationRepository(AsyncAuthorizationPort):
+    async def supplier_grocery_access(self, *, user_uid: str, grocery_uid: str) -> bool:
+        res = await _rows(GROCERY_ACCESS, {"gid": grocery_uid, "user": user_uid})
+        return bool(res and res[0][0])
@@ -0,0 +1,67 @@
+from typing import Optional
+from apps.groceries.domain.repositories import AuthorizationPort
+from infra.neo4j.driver import cypher_read
+from infra.tracing import traced_methods
+
+GROCERY_ACCESS = """
+MATCH (g:Grocery {uid:$gid})
+WHERE g.is_active = true
+RETURN EXISTS { MATCH (:User {uid:$user, is_active:true})-[:RESPONSIBLE_FOR]->(g) }
+"""
+
+
+@traced_methods("repository")
+class Neo4jAuthorizationRepository(AuthorizationPort):
+    """
+    Answers "may supplier U write to grocery G / item I" in one round trip each,
+    instead of loading the user, the grocery and then testing the relationship.
+    """
+    def supplier_grocery_access(self, *, user_uid: str, grocery_uid: str) -> bool:
+        res, _ = cypher_read(GROCERY_ACCESS, {"gid": grocery_uid, "user": user_uid})
+        return bool(res and res[0][0])
+
+    def supplier_item_access(self, *, user_uid: str, item_uid: str) -> tuple[Optional[str], bool]:
+        q = """
+        MATCH (g:Grocery)-[:SELLS]->(:Item {uid:$item})
+        WHERE g.is_active = true
+        RETURN g.uid, EXISTS { MATCH (:User {uid:$user, is_active:true})-[:RESPONSIBLE_FOR]->(g) }
+        LIMIT 1
+        """
+        res, _ = cypher_read(q, {"item": item_uid, "user": user_uid})
+        if not res:
+            return None, False
+        return res[0][0], bool(res[0][1])
+
+
+class SupplierAccess:
+    """
+    Per-request memo in front of the authorization queries, so a permission
+    class and the view asking the same question share one Cypher call.
+    """
+    def __init__(self, repo: AuthorizationPort, user_uid: str):
+        self.repo = repo
+        self.user_uid = user_uid
+        self._memo = {}
+
+    def can_write_grocery(self, grocery_uid: str) -> bool:
+        key = ("grocery", grocery_uid)
+        if key not in self._memo:
+            self._memo[key] = self.repo.supplier_grocery_access(user_uid=self.user_uid, grocery_uid=grocery_uid)
+        return self._memo[key]
+
+    def item_grocery(self, item_uid: str) -> tuple[Optional[str], bool]:
+        """
+        (grocery uid of the item or None, whether the supplier may write to it)
+        """
+        key = ("item", item_uid)
+        if key not in self._memo:
+            self._memo[key] = self.repo.supplier_item_access(user_uid=self.user_uid, item_uid=item_uid)
+        return self._memo[key]
+
+
+def supplier_access(request) -> SupplierAccess:
+    access = getattr(request, "_supplier_access", None)
+    if access is None:
+        access = SupplierAccess(Neo4jAuthorizationRepository(), getattr(request.user, "id", None))
+        request._supplier_access = access
+    return access
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from apps.groceries.domain.entities import GroceryEntity
+from apps.groceries.domain.repositories import GroceryRepositoryPort, AsyncGroceryReadPort
+from infra.cache import entity_cache
+from infra.neo4j.unit_of_work import current_uow, on_commit
+from infra.tracing import traced_methods
+
+# Read-through caching of active groceries by uid (infra.cache). Writes
+# invalidate the uid in every worker once the request transaction commits.
+
+
+@traced_methods("repository")
+class CachedGroceryRepository(GroceryRepositoryPort):
+    def __init__(self, inner: GroceryRepositoryPort):
+        self.inner = inner
+        self.cache = entity_cache("grocery")
+
+    def create(self, *, name: str, location: str) -> GroceryEntity:
+        return self.inner.create(name=name, location=location)
+
+    def get_by_id(self, uid: str) -> Optional[GroceryEntity]:
+        if current_uow() is not None:
+            # inside a write transaction: read what the transaction sees
+            return self.inner.get_by_id(uid)
+        return self.cache.get_or_load(uid, lambda: self.inner.get_by_id(uid))
+
+    def list_active(self, *, after: tuple | None = None, before: tuple | None = None,
+                    limit: int | None = None) -> Iterable[GroceryEntity]:
+        return self.inner.list_active(after=after, before=before, limit=limit)
+
+    def list_version(self) -> tuple[Optional[datetime], int]:
+        return self.inner.list_version()
+
+    def version(self, uid: str) -> Optional[datetime]:
+        # served from the cached entity: it is invalidated on every write
+        entity = self.get_by_id(uid)
+        return entity.updated_at if entity is not None and entity.is_active else None
+
+    def update_fields(self, *, uid: str, **fields) -> GroceryEntity:
+        entity = self.inner.update_fields(uid=uid, **fields)
+        on_commit(lambda: self.cache.invalidate(uid))
+        return entity
+
+    def soft_delete(self, *, uid: str) -> None:
+        self.inner.soft_delete(uid=uid)
+        on_commit(lambda: self.cache.invalidate(uid))
+
+
+@traced_methods("repository")
+class AsyncCachedGroceryRepository(AsyncGroceryReadPort):
+    # same cache as CachedGroceryRepository; the ASGI views only read
+    def __init__(self, inner: AsyncGroceryReadPort):
+        self.inner = inner
+        self.cache = entity_cache("grocery")
+
+    async def get_by_id(self, uid: str) -> Optional[GroceryEntity]:
+        return await self.cache.aget_or_load(uid, lambda: self.inner.get_by_id(uid))
+
+    async def list_active(self, *, after: tuple | None = None, before: tuple | None = None,
+                          limit: int | None = None) -> list[GroceryEntity]:
+        return await self.inner.list_active(after=after, before=before, limit=limit)
+
+    async def list_version(self) -> tuple[Optional[datetime], int]:
+        return await self.inner.list_version()
+
+    async def version(self, uid: str) -> Optional[datetime]:
+        entity = await self.get_by_id(uid)
+        return entity.updated_at if entity is not None and entity.is_active else None
@@ -3,10 +3,12 @@ from neomodel import (
     StructuredNode, UniqueIdProperty, StringProperty,
     BooleanProperty, DateTimeProperty, RelationshipFrom, RelationshipTo,
     FloatProperty,
-    DateProperty
+    DateProperty,
+    IntegerProperty,
 )
 
 class GroceryNode(StructuredNode):
+    __label__ = "Grocery"                            # label used by the repositories' Cypher
     # ⚠️ don't use "id" (reserved by neomodel for element id)
     uid = UniqueIdProperty()                         # app PK (UUID string)
     name = StringProperty(required=True, index=True)
@@ -28,6 +30,7 @@ class GroceryNode(StructuredNode):
 
 
 class ItemNode(StructuredNode):
+    __label__ = "Item"
     uid = UniqueIdProperty()                         # app PK (UUID string)
     name = StringProperty(required=True, index=True)
     item_type = StringProperty(required=True)        # e.g. food, game
@@ -35,6 +38,11 @@ class ItemNode(StructuredNode):
     price = FloatProperty(required=True)             # item price
     is_deleted = BooleanProperty(default=False)      # soft-delete flag
 
+    # point-of-sale counters, kept by the sales ingestion (not part of updated_at)
+    sold_qty = IntegerProperty(default=0)
+    sold_revenue = FloatProperty(default=0.0)
+    last_sold_at = DateTimeProperty()
+
     created_at = DateTimeProperty(default=lambda: datetime.now(timezone.utc))
     updated_at = DateTimeProperty(default=lambda: datetime.now(timezone.utc))
 
@@ -47,9 +55,11 @@ class ItemNode(StructuredNode):
 
 
 class DailyIncomeNode(StructuredNode):
+    __label__ = "DailyIncome"
     uid = UniqueIdProperty()              # app PK (UUID string)
     amount = FloatProperty(required=True) # daily revenue
     date = DateProperty(required=True)    # YYYY-MM-DD
+    key = StringProperty(unique_index=True)  # "<grocery uid>:<date>": one node per grocery and day
 
     created_at = DateTimeProperty(default=lambda: datetime.now(timezone.utc))
     updated_at = DateTimeProperty(default=lambda: datetime.now(timezone.utc))
@@ -58,4 +68,26 @@ class DailyIncomeNode(StructuredNode):
     of_grocery = RelationshipFrom("apps.groceries.infrastructure.models.GroceryNode", "REPORTS")
 
     def touch(self):
-        self.updated_at = datetime.now(timezone.utc)
\ No newline at end of file
+        self.updated_at = datetime.now(timezone.utc)
+
+
+
+class IncomeRollupNode(StructuredNode):
+    """
+    Pre-aggregated DailyIncome totals for one grocery and one period; rewritten
+    in the same transaction as every income write so summaries never scan days.
+    """
+    __label__ = "IncomeRollup"
+    uid = UniqueIdProperty()
+    key = StringProperty(unique_index=True)               # "<grocery>:<granularity>:<period>"
+    grocery = StringProperty(required=True, index=True)   # grocery uid
+    granularity = StringProperty(required=True, choices={"month": "month", "week": "week"})
+    period = StringProperty(required=True)                # "2025-09" | "2025-W36"
+    start = DateProperty(required=True)                   # first day of the period
+    end = DateProperty(required=True)                     # last day of the period
+    sum = FloatProperty(default=0.0)
+    count = IntegerProperty(default=0)                    # number of DailyIncome nodes
+    min = FloatProperty()
+    max = FloatProperty()
+
+    updated_at = DateTimeProperty(default=lambda: datetime.now(timezone.utc))
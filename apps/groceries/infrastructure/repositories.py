@@ -1,130 +1,698 @@
+import uuid
+from datetime import date as date_cls, datetime, timedelta, timezone
 from typing import Iterable, Optional
-from neomodel import db
-from apps.groceries.domain.entities import GroceryEntity, ItemEntity,DailyIncomeEntity
-from apps.groceries.domain.repositories import GroceryRepositoryPort, ItemRepositoryPort, DailyIncomeRepositoryPort
-from .models import GroceryNode, ItemNode,DailyIncomeNode
+from apps.groceries.domain.entities import GroceryEntity, ItemEntity,DailyIncomeEntity, IncomeRollupEntity, ChangeEntity
+from apps.groceries.domain.exceptions import BulkImportInterrupted, ConcurrentUpdate
+from apps.groceries.domain.repositories import (
+    GroceryRepositoryPort, ItemRepositoryPort, DailyIncomeRepositoryPort, ChangeFeedPort,
+    SalesRepositoryPort,
+)
+from infra.neo4j.driver import cypher_read, cypher_write, stream_read
+from infra.cache import invalidate_tags
+from infra.events import publish
+from infra.neo4j.unit_of_work import atomic, identity_get, identity_put, on_commit
+from infra.tracing import traced_methods
+from .models import GroceryNode, ItemNode
 
 
-def _to_entity(n: GroceryNode) -> GroceryEntity:
+# Map projections the read/write queries return (`RETURN g{GROCERY_FIELDS}`): plain
+# dicts of stored values, mapped straight to entities without building a neomodel
+# StructuredNode per row.
+GROCERY_FIELDS = "{.uid, .name, .location, .is_active, .created_at, .updated_at}"
+ITEM_FIELDS = "{.uid, .name, .item_type, .item_location, .price, .is_deleted, .created_at, .updated_at}"
+INCOME_FIELDS = "{.uid, .amount, .date, .created_at, .updated_at}"
+ROLLUP_FIELDS = "{.granularity, .period, .start, .end, .sum, .count, .min, .max}"
+
+
+def _ts(value) -> Optional[datetime]:
+    # DateTimeProperty stores UTC epoch floats
+    return datetime.fromtimestamp(value, timezone.utc) if value is not None else None
+
+
+def _day(value) -> Optional[date_cls]:
+    # DateProperty stores ISO "YYYY-MM-DD" strings
+    return date_cls.fromisoformat(value) if value is not None else None
+
+
+def _to_entity(m: dict) -> GroceryEntity:
     return GroceryEntity(
-        id=n.uid, name=n.name, location=n.location,
-        is_active=bool(n.is_active),
-        created_at=n.created_at, updated_at=n.updated_at
+        id=m["uid"], name=m["name"], location=m["location"],
+        is_active=bool(m["is_active"]),
+        created_at=_ts(m["created_at"]), updated_at=_ts(m["updated_at"])
     )
 
-def _to_item_entity(n: ItemNode) -> ItemEntity:
+def _to_item_entity(m: dict) -> ItemEntity:
     return ItemEntity(
-        id=n.uid,
-        name=n.name,
-        item_type=n.item_type,
-        item_location=n.item_location,
-        price=n.price,
-        is_deleted=bool(n.is_deleted),
-        created_at=n.created_at,
-        updated_at=n.updated_at,
+        id=m["uid"],
+        name=m["name"],
+        item_type=m["item_type"],
+        item_location=m["item_location"],
+        price=m["price"],
+        is_deleted=bool(m["is_deleted"]),
+        created_at=_ts(m["created_at"]),
+        updated_at=_ts(m["updated_at"]),
     )
 
-def _to_income_entity(n: DailyIncomeNode, grocery_uid: str | None = None) -> DailyIncomeEntity:
+def _to_income_entity(m: dict) -> DailyIncomeEntity:
     return DailyIncomeEntity(
-        id=n.uid,
-        amount=n.amount,
-        date=n.date,
-        created_at=n.created_at,
-        updated_at=n.updated_at,
+        id=m["uid"],
+        amount=m["amount"],
+        date=_day(m["date"]),
+        created_at=_ts(m["created_at"]),
+        updated_at=_ts(m["updated_at"]),
     )
 
 
+def _to_rollup_entity(m: dict) -> IncomeRollupEntity:
+    return IncomeRollupEntity(
+        granularity=m["granularity"],
+        period=m["period"],
+        start=_day(m["start"]),
+        end=_day(m["end"]),
+        sum=m["sum"] or 0.0,
+        count=m["count"] or 0,
+        min=m["min"],
+        max=m["max"],
+    )
+
+
+def _now() -> float:
+    # DateTimeProperty's stored form. Every write to a Grocery / Item / DailyIncome
+    # sets updated_at = $now: the ETags and the changes feed are derived from it.
+    return datetime.now(timezone.utc).timestamp()
+
+
+def _purge(*tags: str) -> None:
+    # cached GET responses (common.response_cache) depending on these tags go
+    # stale once the write commits
+    on_commit(lambda: invalidate_tags(*tags))
+
+
+def _publish(grocery_uid: Optional[str], type: str, data) -> None:
+    # live streams (infra.events) only see committed changes
+    if grocery_uid:
+        on_commit(lambda: publish(grocery_uid, type, data))
+
+
+def _deflate_fields(node_cls, fields: dict) -> dict:
+    """
+    Converts update kwargs to their stored form through the node's property
+    definitions, so a Cypher `SET n += $fields` writes what `save()` would have.
+    """
+    props = node_cls.defined_properties(aliases=False, rels=False)
+    out = {}
+    for k, v in fields.items():
+        if k not in props:
+            raise ValueError(f"Unknown field: {k}")
+        out[k] = props[k].deflate(v) if v is not None else None
+    return out
+
+
+def _keyset(var: str, key: str, *, after=None, before=None, limit=None):
+    """
+    Builds the keyset part of a list query over `(var.key, var.uid)`.
+    Returns (extra WHERE, ORDER BY/LIMIT tail, params, reversed). When walking
+    backwards the rows come back DESC and the caller must flip them.
+    """
+    where, params = "", {}
+    if after is not None:
+        where = f" AND ({var}.{key} > $k_key OR ({var}.{key} = $k_key AND {var}.uid > $k_uid))"
+        params = {"k_key": after[0], "k_uid": after[1]}
+    elif before is not None:
+        where = f" AND ({var}.{key} < $k_key OR ({var}.{key} = $k_key AND {var}.uid < $k_uid))"
+        params = {"k_key": before[0], "k_uid": before[1]}
+    backwards = before is not None and after is None
+    direction = "DESC" if backwards else "ASC"
+    tail = f"ORDER BY {var}.{key} {direction}, {var}.uid {direction}"
+    if limit is not None:
+        tail += " LIMIT $k_limit"
+        params["k_limit"] = int(limit)
+    return where, tail, params, backwards
+
+
+def _iso_date(value) -> Optional[str]:
+    """
+    Normalises a date / "YYYY-MM-DD" to the form DailyIncomeNode.date is stored in.
+    Raises ValueError for anything else.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date_cls):
+        return value.isoformat()
+    return date_cls.fromisoformat(str(value)).isoformat()
+
+
+def _rollup_periods(grocery_uid: str, dates: Iterable) -> list[dict]:
+    """
+    The month and ISO-week periods (with their first/last day) that the given
+    income dates fall into, deduplicated, as Cypher parameters.
+    """
+    periods = {}
+    for d in dates:
+        if isinstance(d, str):
+            d = date_cls.fromisoformat(d)
+        month_start = d.replace(day=1)
+        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        iso_year, iso_week, _ = d.isocalendar()
+        week_start = d - timedelta(days=d.weekday())
+        for granularity, period, start, end in (
+            ("month", f"{d:%Y-%m}", month_start, month_end),
+            ("week", f"{iso_year}-W{iso_week:02d}", week_start, week_start + timedelta(days=6)),
+        ):
+            key = f"{grocery_uid}:{granularity}:{period}"
+            periods[key] = {"key": key, "uid": uuid.uuid4().hex, "granularity": granularity,
+                            "period": period, "start": start.isoformat(), "end": end.isoformat()}
+    return list(periods.values())
+
+
+def income_key(grocery_uid: str, date: str) -> str:
+    # DailyIncomeNode.key: one node per grocery and day
+    return f"{grocery_uid}:{date}"
+
+
+def _replace(mode: str) -> bool:
+    if mode not in ("add", "replace"):
+        raise ValueError("mode must be 'add' or 'replace'.")
+    return mode == "replace"
+
+
+def _merge_income(rows: list[dict], *, replace: bool, now: float) -> list:
+    """
+    Upserts DailyIncome nodes by key for rows of {gid, date (ISO), amount}:
+    MERGE on the unique key, so concurrent writers and retries never create a
+    second node for a day. Call inside the write's transaction. Rows of
+    missing / inactive groceries are skipped. Returns [income map, grocery uid].
+    """
+    q = f"""
+    UNWIND $rows AS r
+    MATCH (g:Grocery {{uid:r.gid}})
+    WHERE g.is_active = true
+    MERGE (d:DailyIncome {{key:r.key}})
+      ON CREATE SET d.uid = r.uid, d.date = r.date, d.amount = 0.0, d.created_at = $now
+    MERGE (g)-[:REPORTS]->(d)
+    SET d.amount = CASE WHEN $replace THEN r.amount ELSE d.amount + r.amount END,
+        d.updated_at = $now
+    RETURN d{INCOME_FIELDS}, g.uid
+    """
+    params = [{**r, "key": income_key(r["gid"], r["date"]), "uid": uuid.uuid4().hex} for r in rows]
+    res, _ = cypher_write(q, {"rows": params, "replace": replace, "now": now})
+    return res
+
+
+def _refresh_rollups(grocery_uid: str, dates: Iterable) -> None:
+    """
+    Recomputes the IncomeRollup nodes covering `dates` from their DailyIncome
+    nodes (at most ~31 per period). Call it inside the write's transaction.
+    Recomputing rather than incrementing keeps min/max exact whatever the write did.
+
+    Each rollup is write-locked (the SET before the CALL) before its days are
+    read: two transactions writing days of the same period then recompute one
+    after the other, and the second sees the first one's committed day instead
+    of overwriting its total. Periods are locked in key order to avoid deadlocks.
+    """
+    periods = sorted(_rollup_periods(grocery_uid, dates), key=lambda p: p["key"])
+    if not periods:
+        return
+    q = """
+    UNWIND $periods AS p
+    MERGE (r:IncomeRollup {key:p.key})
+      ON CREATE SET r.uid = p.uid, r.grocery = $gid, r.granularity = p.granularity,
+                    r.period = p.period, r.start = p.start, r.end = p.end
+    SET r.updated_at = $now
+    WITH r, p
+    CALL {
+      WITH p
+      MATCH (:Grocery {uid:$gid})-[:REPORTS]->(d:DailyIncome)
+      WHERE d.date >= p.start AND d.date <= p.end
+      RETURN sum(d.amount) AS total, count(d) AS n, min(d.amount) AS lo, max(d.amount) AS hi
+    }
+    SET r.sum = total, r.count = n, r.min = lo, r.max = hi
+    """
+    cypher_write(q, {"gid": grocery_uid, "periods": periods, "now": _now()})
+
+
+# ---- read queries, shared with the async repositories ----
+GROCERY_BY_ID = f"""
+MATCH (g:Grocery {{uid:$uid}})
+WHERE g.is_active = true
+RETURN g{GROCERY_FIELDS}
+"""
+
+ITEM_BY_ID = f"""
+MATCH (i:Item {{uid:$uid}})
+WHERE i.is_deleted = false
+RETURN i{ITEM_FIELDS}
+"""
+
+INCOME_SUMMARY = f"""
+MATCH (r:IncomeRollup {{grocery:$gid, granularity:$granularity}})
+WHERE ($start IS NULL OR r.end >= $start)
+  AND ($end   IS NULL OR r.start <= $end)
+  AND r.count > 0
+RETURN r{ROLLUP_FIELDS} ORDER BY r.start ASC
+"""
+
+# validators for conditional GETs (common.conditional): (max(updated_at), count)
+# of a list or one row's updated_at, without reading the rows
+GROCERY_LIST_VERSION = """
+MATCH (g:Grocery)
+RETURN max(g.updated_at), count(CASE WHEN g.is_active THEN 1 END)
+"""
+
+GROCERY_VERSION = """
+MATCH (g:Grocery {uid:$uid})
+WHERE g.is_active = true
+RETURN g.updated_at
+"""
+
+ITEM_LIST_VERSION = """
+MATCH (:Grocery {uid:$gid})-[:SELLS]->(i:Item)
+RETURN max(i.updated_at), count(CASE WHEN i.is_deleted = false THEN 1 END)
+"""
+
+ITEM_VERSION = """
+MATCH (i:Item {uid:$uid})
+WHERE i.is_deleted = false
+RETURN i.updated_at
+"""
+
+INCOME_LIST_VERSION = """
+MATCH (:Grocery {uid:$gid})-[:REPORTS]->(d:DailyIncome)
+RETURN max(d.updated_at), count(d)
+"""
+
+
+def _list_version(res) -> tuple[Optional[datetime], int]:
+    latest, count = res[0] if res else (None, 0)
+    return (_ts(latest) if latest is not None else None), count
+
+
+def _version(res) -> Optional[datetime]:
+    return _ts(res[0][0]) if res and res[0][0] is not None else None
+
+
+def _grocery_list_query(*, after=None, before=None, limit=None) -> tuple[str, dict, bool]:
+    where, tail, params, backwards = _keyset("g", "created_at", after=after, before=before, limit=limit)
+    q = f"""
+    MATCH (g:Grocery)
+    WHERE g.is_active = true{where}
+    RETURN g{GROCERY_FIELDS} {tail}
+    """
+    return q, params, backwards
+
+
+def _item_list_query(grocery_uid: str, include_deleted: bool = False, *,
+                     after=None, before=None, limit=None) -> tuple[str, dict, bool]:
+    where, tail, params, backwards = _keyset("i", "created_at", after=after, before=before, limit=limit)
+    q = f"""
+    MATCH (g:Grocery {{uid:$gid}})-[:SELLS]->(i:Item)
+    WHERE ($include OR i.is_deleted = false){where}
+    RETURN i{ITEM_FIELDS} {tail}
+    """
+    return q, {"gid": grocery_uid, "include": include_deleted, **params}, backwards
+
+
+def _income_list_query(grocery_uid: str, start=None, end=None, *,
+                       after=None, before=None, limit=None) -> tuple[str, dict, bool]:
+    where, tail, params, backwards = _keyset("d", "date", after=after, before=before, limit=limit)
+    # DateProperty stores ISO "YYYY-MM-DD" strings, which sort like dates; comparing
+    # the raw property (not date(d.date)) lets the planner use index_DailyIncome_date.
+    q = f"""
+    MATCH (g:Grocery {{uid:$gid}})-[:REPORTS]->(d:DailyIncome)
+    WHERE ($start IS NULL OR d.date >= $start)
+      AND ($end   IS NULL OR d.date <= $end){where}
+    RETURN d{INCOME_FIELDS} {tail}
+    """
+    return q, {"gid": grocery_uid, "start": _iso_date(start), "end": _iso_date(end), **params}, backwards
+
+
+def _summary_params(grocery_uid: str, granularity: str, start=None, end=None) -> dict:
+    return {"gid": grocery_uid, "granularity": granularity, "start": start, "end": end}
+
+
+@traced_methods("repository")
 class Neo4jGroceryRepository(GroceryRepositoryPort):
     def create(self, *, name: str, location: str) -> GroceryEntity:
-        g = GroceryNode(name=name, location=location)
-        g.touch(); g.save()
-        return _to_entity(g)
+        q = f"""
+        CREATE (g:Grocery {{uid:$uid, name:$name, location:$location, is_active:true,
+                           created_at:$now, updated_at:$now}})
+        RETURN g{GROCERY_FIELDS}
+        """
+        res, _ = cypher_write(q, {"uid": uuid.uuid4().hex, "name": name, "location": location, "now": _now()})
+        _purge("groceries")
+        return _to_entity(res[0][0])
 
     def get_by_id(self, uid: str) -> Optional[GroceryEntity]:
-        g = GroceryNode.nodes.get_or_none(uid=uid, is_active=True)
-        return _to_entity(g) if g else None
+        cached = identity_get("grocery", uid)
+        if cached is not None:
+            return cached if cached.is_active else None
+        res, _ = cypher_read(GROCERY_BY_ID, {"uid": uid})
+        if not res:
+            return None
+        entity = _to_entity(res[0][0])
+        identity_put("grocery", uid, entity)
+        return entity
+
+    def list_active(self, *, after: tuple | None = None, before: tuple | None = None,
+                    limit: int | None = None) -> Iterable[GroceryEntity]:
+        q, params, backwards = _grocery_list_query(after=after, before=before, limit=limit)
+        rows = stream_read(q, params)
+        for row in (reversed(list(rows)) if backwards else rows):
+            yield _to_entity(row[0])
+
+    def list_version(self) -> tuple[Optional[datetime], int]:
+        res, _ = cypher_read(GROCERY_LIST_VERSION)
+        return _list_version(res)
 
-    def list_active(self) -> Iterable[GroceryEntity]:
-        # Simple scan; for big graphs, prefer a Cypher with WHERE is_active true
-        for g in GroceryNode.nodes.filter(is_active=True):
-            yield _to_entity(g)
+    def version(self, uid: str) -> Optional[datetime]:
+        res, _ = cypher_read(GROCERY_VERSION, {"uid": uid})
+        return _version(res)
 
     def update_fields(self, *, uid: str, **fields) -> GroceryEntity:
-        g = GroceryNode.nodes.get(uid=uid)
-        if not g.is_active:
-            # optional: forbid updating inactive groceries
-            pass
-        for k, v in fields.items():
-            setattr(g, k, v)
-        g.touch(); g.save()
-        return _to_entity(g)
+        q = f"""
+        MATCH (g:Grocery {{uid:$uid}})
+        SET g += $fields, g.updated_at = $now
+        RETURN g{GROCERY_FIELDS}
+        """
+        res, _ = cypher_write(q, {"uid": uid, "fields": _deflate_fields(GroceryNode, fields), "now": _now()})
+        if not res:
+            raise GroceryNode.DoesNotExist(f"Grocery {uid} not found")
+        entity = _to_entity(res[0][0])
+        identity_put("grocery", uid, entity)
+        _purge("groceries", f"grocery:{uid}")
+        return entity
 
     def soft_delete(self, *, uid: str) -> None:
-        g = GroceryNode.nodes.get(uid=uid)
-        g.is_active = False
-        g.touch(); g.save()
+        q = f"""
+        MATCH (g:Grocery {{uid:$uid}})
+        SET g.is_active = false, g.updated_at = $now
+        RETURN g{GROCERY_FIELDS}
+        """
+        res, _ = cypher_write(q, {"uid": uid, "now": _now()})
+        if not res:
+            raise GroceryNode.DoesNotExist(f"Grocery {uid} not found")
+        identity_put("grocery", uid, _to_entity(res[0][0]))
+        _purge("groceries", f"grocery:{uid}")
 
 
+@traced_methods("repository")
 class Neo4jItemRepository(ItemRepositoryPort):
     def create(self, *, grocery_uid: str, name: str, item_type: str,
                item_location: str, price: float) -> ItemEntity:
-        g = GroceryNode.nodes.get(uid=grocery_uid, is_active=True)
-        i = ItemNode(name=name, item_type=item_type,
-                     item_location=item_location, price=float(price))
-        i.touch(); i.save()
-        g.sells.connect(i)
-        return _to_item_entity(i)
-
-    def get_by_id(self, uid: str) -> Optional[ItemEntity]:
-        i = ItemNode.nodes.get_or_none(uid=uid, is_deleted=False)
-        return _to_item_entity(i) if i else None
+        # node and SELLS edge in one statement: no window where the item exists unlinked
+        q = f"""
+        MATCH (g:Grocery {{uid:$gid}})
+        WHERE g.is_active = true
+        CREATE (g)-[:SELLS]->(i:Item {{uid:$uid, name:$name, item_type:$item_type,
+                                       item_location:$item_location, price:$price,
+                                       is_deleted:false, created_at:$now, updated_at:$now}})
+        RETURN i{ITEM_FIELDS}
+        """
+        now = _now()
+        res, _ = cypher_write(q, {"gid": grocery_uid, "uid": uuid.uuid4().hex, "name": name,
+                                     "item_type": item_type, "item_location": item_location,
+                                     "price": float(price), "now": now})
+        if not res:
+            raise GroceryNode.DoesNotExist(f"Grocery {grocery_uid} not found")
+        entity = _to_item_entity(res[0][0])
+        identity_put("item", entity.id, entity)
+        _purge(f"grocery:{grocery_uid}")
+        _publish(grocery_uid, "item.created", entity)
+        return entity
 
-    def list_by_grocery(self, grocery_uid: str, include_deleted: bool=False) -> Iterable[ItemEntity]:
+    def bulk_create(self, *, grocery_uid: str, rows: list[dict], batch_size: int = 1000) -> int:
+        """
+        Creates items in UNWIND batches, one transaction per batch (instead of three
+        per item). Rows must already be validated. Returns the number created;
+        raises ValueError if the grocery does not exist or is inactive, and
+        BulkImportInterrupted when a later batch fails after earlier ones
+        committed (rows[:created] are stored, the rest are not).
+        """
         q = """
-        MATCH (g:Grocery {uid:$gid})-[:SELLS]->(i:Item)
-        WHERE $include OR i.is_deleted = false
-        RETURN i
+        MATCH (g:Grocery {uid:$gid})
+        WHERE g.is_active = true
+        UNWIND $rows AS r
+        CREATE (i:Item {uid:r.uid, name:r.name, item_type:r.item_type, item_location:r.item_location,
+                        price:r.price, is_deleted:false, created_at:$now, updated_at:$now})
+        MERGE (g)-[:SELLS]->(i)
+        RETURN count(i)
         """
-        res, _ = db.cypher_query(q, {"gid": grocery_uid, "include": include_deleted})
-        for row in res:
-            yield _to_item_entity(ItemNode.inflate(row[0]))
+        created = 0
+        try:
+            for offset in range(0, len(rows), batch_size):
+                batch = [
+                    {"uid": uuid.uuid4().hex, "name": r["name"], "item_type": r["item_type"],
+                     "item_location": r["item_location"], "price": float(r["price"])}
+                    for r in rows[offset:offset + batch_size]
+                ]
+                res, _ = cypher_write(q, {"gid": grocery_uid, "rows": batch, "now": _now()})
+                count = res[0][0] if res else 0
+                if count == 0 and batch:
+                    raise ValueError("Grocery not found or inactive.")
+                created += count
+        except Exception as e:
+            if not created:
+                raise
+            raise BulkImportInterrupted(created, f"Import stopped after {created} rows: {e}") from e
+        finally:
+            # after the batches that did commit
+            if created:
+                _purge(f"grocery:{grocery_uid}")
+                # one event for the import, not one per row
+                _publish(grocery_uid, "items.imported", {"count": created})
+        return created
 
-    def update_fields(self, *, uid: str, **fields) -> ItemEntity:
-        i = ItemNode.nodes.get(uid=uid)
-        for k, v in fields.items():
-            setattr(i, k, v)
-        i.touch(); i.save()
-        return _to_item_entity(i)
+    def get_by_id(self, uid: str) -> Optional[ItemEntity]:
+        cached = identity_get("item", uid)
+        if cached is not None:
+            return None if cached.is_deleted else cached
+        res, _ = cypher_read(ITEM_BY_ID, {"uid": uid})
+        if not res:
+            return None
+        entity = _to_item_entity(res[0][0])
+        identity_put("item", uid, entity)
+        return entity
+
+    def list_by_grocery(self, grocery_uid: str, include_deleted: bool=False, *,
+                        after: tuple | None = None, before: tuple | None = None,
+                        limit: int | None = None) -> Iterable[ItemEntity]:
+        q, params, backwards = _item_list_query(grocery_uid, include_deleted,
+                                                after=after, before=before, limit=limit)
+        rows = stream_read(q, params)
+        for row in (reversed(list(rows)) if backwards else rows):
+            yield _to_item_entity(row[0])
+
+    def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]:
+        res, _ = cypher_read(ITEM_LIST_VERSION, {"gid": grocery_uid})
+        return _list_version(res)
+
+    def version(self, uid: str) -> Optional[datetime]:
+        res, _ = cypher_read(ITEM_VERSION, {"uid": uid})
+        return _version(res)
+
+    def update_fields(self, *, uid: str, expected_updated_at: Optional[datetime] = None,
+                      **fields) -> ItemEntity:
+        # the throwaway SET takes the node's write lock before updated_at is
+        # compared, so two writers holding the same version can't both pass;
+        # stamps are compared to the microsecond the ETag carried
+        q = f"""
+        MATCH (i:Item {{uid:$uid}})
+        OPTIONAL MATCH (g:Grocery)-[:SELLS]->(i)
+        SET i._lock = true REMOVE i._lock
+        WITH i, g, ($expected IS NULL OR abs(i.updated_at - $expected) < 0.000001) AS fresh
+        FOREACH (_ IN CASE WHEN fresh THEN [1] ELSE [] END |
+            SET i += $fields, i.updated_at = $now)
+        RETURN i{ITEM_FIELDS}, g.uid, fresh
+        """
+        expected = expected_updated_at.timestamp() if expected_updated_at else None
+        res, _ = cypher_write(q, {"uid": uid, "fields": _deflate_fields(ItemNode, fields),
+                                  "expected": expected, "now": _now()})
+        if not res:
+            raise ItemNode.DoesNotExist(f"Item {uid} not found")
+        if not res[0][2]:
+            raise ConcurrentUpdate(f"Item {uid} was modified concurrently")
+        entity = _to_item_entity(res[0][0])
+        identity_put("item", uid, entity)
+        _purge(f"grocery:{res[0][1]}")
+        _publish(res[0][1], "item.updated", entity)
+        return entity
 
     def soft_delete(self, *, uid: str) -> None:
-        i = ItemNode.nodes.get(uid=uid)
-        i.is_deleted = True
-        i.touch(); i.save()
+        q = f"""
+        MATCH (i:Item {{uid:$uid}})
+        OPTIONAL MATCH (g:Grocery)-[:SELLS]->(i)
+        SET i.is_deleted = true, i.updated_at = $now
+        RETURN i{ITEM_FIELDS}, g.uid
+        """
+        res, _ = cypher_write(q, {"uid": uid, "now": _now()})
+        if not res:
+            raise ItemNode.DoesNotExist(f"Item {uid} not found")
+        entity = _to_item_entity(res[0][0])
+        identity_put("item", uid, entity)
+        _purge(f"grocery:{res[0][1]}")
+        _publish(res[0][1], "item.deleted", entity)
 
     def get_item_grocery_uid(self, *, item_uid: str) -> Optional[str]:
         q = """
         MATCH (g:Grocery)-[:SELLS]->(i:Item {uid:$item})
         RETURN g.uid LIMIT 1
         """
-        res, _ = db.cypher_query(q, {"item": item_uid})
+        res, _ = cypher_read(q, {"item": item_uid})
         return res[0][0] if res else None
 
 
+@traced_methods("repository")
 class Neo4jDailyIncomeRepository(DailyIncomeRepositoryPort):
-    def create(self, *, grocery_uid: str, amount: float, date: str) -> DailyIncomeEntity:
-        g = GroceryNode.nodes.get(uid=grocery_uid, is_active=True)
-        d = DailyIncomeNode(amount=float(amount), date=date)
-        d.touch(); d.save()
-        g.reports.connect(d)
-        return _to_income_entity(d, grocery_uid)
-
-    def list_by_grocery(self, grocery_uid: str, start: str | None = None, end: str | None = None) -> Iterable[DailyIncomeEntity]:
+    def create(self, *, grocery_uid: str, amount: float, date: str, mode: str = "add") -> DailyIncomeEntity:
+        """
+        Adds `amount` to the grocery's income for `date` (mode="add") or sets it
+        (mode="replace", safe to retry); the day's node is created on first write.
+        """
+        day = _iso_date(date)
+        with atomic():
+            res = _merge_income([{"gid": grocery_uid, "date": day, "amount": float(amount)}],
+                                replace=_replace(mode), now=_now())
+            if not res:
+                raise GroceryNode.DoesNotExist(f"Grocery {grocery_uid} not found")
+            _refresh_rollups(grocery_uid, [day])
+        entity = _to_income_entity(res[0][0])
+        _purge(f"grocery:{grocery_uid}")
+        _publish(grocery_uid, "income.added", entity)
+        return entity
+
+    def create_many(self, *, grocery_uid: str, rows: list[dict], mode: str = "add") -> list[DailyIncomeEntity]:
+        """
+        create() for many days (`rows` of {date, amount}) in one statement and
+        transaction. Rows for the same day are summed (add) or the last one
+        wins (replace).
+        """
+        replace = _replace(mode)
+        amounts: dict[str, float] = {}
+        for row in rows:
+            day = _iso_date(row["date"])
+            amounts[day] = float(row["amount"]) + (0.0 if replace else amounts.get(day, 0.0))
+        if not amounts:
+            return []
+        with atomic():
+            res = _merge_income([{"gid": grocery_uid, "date": day, "amount": amount}
+                                 for day, amount in amounts.items()], replace=replace, now=_now())
+            if not res:
+                raise GroceryNode.DoesNotExist(f"Grocery {grocery_uid} not found")
+            _refresh_rollups(grocery_uid, amounts)
+        entities = [_to_income_entity(row[0]) for row in res]
+        _purge(f"grocery:{grocery_uid}")
+        for entity in entities:
+            _publish(grocery_uid, "income.added", entity)
+        return entities
+
+    def list_by_grocery(self, grocery_uid: str, start: str | None = None, end: str | None = None, *,
+                        after: tuple | None = None, before: tuple | None = None,
+                        limit: int | None = None) -> Iterable[DailyIncomeEntity]:
+        q, params, backwards = _income_list_query(grocery_uid, start, end,
+                                                  after=after, before=before, limit=limit)
+        rows = stream_read(q, params)
+        for row in (reversed(list(rows)) if backwards else rows):
+            yield _to_income_entity(row[0])
+
+    def list_version(self, grocery_uid: str) -> tuple[Optional[datetime], int]:
+        res, _ = cypher_read(INCOME_LIST_VERSION, {"gid": grocery_uid})
+        return _list_version(res)
+
+    def summarize(self, grocery_uid: str, granularity: str, start: str | None = None,
+                  end: str | None = None) -> Iterable[IncomeRollupEntity]:
+        res, _ = cypher_read(INCOME_SUMMARY, _summary_params(grocery_uid, granularity, start, end))
+        for row in res:
+            yield _to_rollup_entity(row[0])
+
+    def rebuild_rollups(self, grocery_uid: str) -> int:
+        """
+        Backfill: recompute every rollup of a grocery from its DailyIncome nodes.
+        Returns the number of distinct income days seen.
+        """
         q = """
         MATCH (g:Grocery {uid:$gid})-[:REPORTS]->(d:DailyIncome)
-        WHERE ($start IS NULL OR date(d.date) >= date($start))
-          AND ($end   IS NULL OR date(d.date) <= date($end))
-        RETURN d ORDER BY d.date ASC
+        RETURN DISTINCT d.date
         """
-        res, _ = db.cypher_query(q, {"gid": grocery_uid, "start": start, "end": end})
-        for row in res:
-            yield _to_income_entity(DailyIncomeNode.inflate(row[0]), grocery_uid)
+        res, _ = cypher_read(q, {"gid": grocery_uid})
+        days = [row[0] for row in res]
+        with atomic():
+            _refresh_rollups(grocery_uid, days)
+        _purge(f"grocery:{grocery_uid}")
+        return len(days)
+
+
+@traced_methods("repository")
+class Neo4jSalesRepository(SalesRepositoryPort):
+    def record_sales(self, *, days: list[dict], items: list[dict]) -> None:
+        """
+        Adds sales totals to the per-day DailyIncome nodes (as create(mode="add")
+        does) and to the item counters, then refreshes the rollups of the
+        touched days. Items that aren't sold by that grocery only count towards
+        revenue. Raises on failure so the caller keeps the batch.
+        """
+        items_q = """
+        UNWIND $items AS r
+        MATCH (:Grocery {uid:r.gid})-[:SELLS]->(i:Item {uid:r.uid})
+        SET i.sold_qty = coalesce(i.sold_qty, 0) + r.qty,
+            i.sold_revenue = coalesce(i.sold_revenue, 0.0) + r.revenue,
+            i.last_sold_at = CASE WHEN i.last_sold_at IS NULL OR i.last_sold_at < r.last
+                                  THEN r.last ELSE i.last_sold_at END
+        """
+        now = _now()
+        touched: dict[str, set] = {}
+        written = []
+        with atomic():
+            if days:
+                for row in _merge_income(days, replace=False, now=now):
+                    touched.setdefault(row[1], set()).add(row[0]["date"])
+                    written.append((row[1], _to_income_entity(row[0])))
+            if items:
+                cypher_write(items_q, {"items": items})
+            for gid, dates in touched.items():
+                _refresh_rollups(gid, dates)
+        for gid in touched:
+            _purge(f"grocery:{gid}")
+        # one event per grocery and day, like create_many()
+        for gid, entity in written:
+            _publish(gid, "income.added", entity)
+
+
+# Each part walks its timestamp index from the feed position; the position is
+# the stored float itself, so resuming never skips rows stamped the same instant.
+CHANGES = f"""
+CALL {{
+    MATCH (:Grocery {{uid:$gid}})-[:SELLS]->(i:Item)
+    WHERE i.updated_at >= $k_key AND i.updated_at <= $until
+      AND (i.updated_at > $k_key OR i.uid > $k_uid)
+    RETURN "item" AS kind, i{ITEM_FIELDS} AS row, i.updated_at AS ts, i.uid AS uid
+    ORDER BY ts, uid LIMIT $limit
+    UNION ALL
+    MATCH (:Grocery {{uid:$gid}})-[:REPORTS]->(d:DailyIncome)
+    WHERE d.updated_at >= $k_key AND d.updated_at <= $until
+      AND (d.updated_at > $k_key OR d.uid > $k_uid)
+    RETURN "income" AS kind, d{INCOME_FIELDS} AS row, d.updated_at AS ts, d.uid AS uid
+    ORDER BY ts, uid LIMIT $limit
+    UNION ALL
+    MATCH (t:IncomeTombstone {{grocery:$gid}})
+    WHERE t.deleted_at >= $k_key AND t.deleted_at <= $until
+      AND (t.deleted_at > $k_key OR t.uid > $k_uid)
+    RETURN "income_deleted" AS kind, t.uid AS row, t.deleted_at AS ts, t.uid AS uid
+    ORDER BY ts, uid LIMIT $limit
+}}
+RETURN kind, row, ts, uid
+ORDER BY ts, uid LIMIT $limit
+"""
+
+
+@traced_methods("repository")
+class Neo4jChangeFeedRepository(ChangeFeedPort):
+    def changes(self, grocery_uid: str, *, after: tuple | None = None, until: float,
+                limit: int) -> list[ChangeEntity]:
+        key, uid = after if after is not None else (0.0, "")
+        res, _ = cypher_read(CHANGES, {"gid": grocery_uid, "k_key": key, "k_uid": uid,
+                                       "until": until, "limit": int(limit)})
+        to_entity = {"item": _to_item_entity, "income": _to_income_entity, "income_deleted": str}
+        return [ChangeEntity(kind=kind, entity=to_entity[kind](row), position=(ts, uid))
+                for kind, row, ts, uid in res]
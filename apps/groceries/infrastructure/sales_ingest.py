@@ -0,0 +1,349 @@
+"""
+Point-of-sale ingestion: sales events are accepted into a per-worker buffer
+and written to Neo4j in micro-batches.
+
+    accept()  validated events -> spool file (append, flush, fsync) -> buffer
+    flusher   every SALES_FLUSH_INTERVAL seconds, or as soon as
+              SALES_FLUSH_SIZE events are buffered: aggregate per (grocery, day)
+              and per item, write them in one transaction
+              (Neo4jSalesRepository.record_sales), delete the spool segments
+
+The buffer holds at most SALES_BUFFER_SIZE events, counting a batch that is
+waiting for a retry; accept() refuses a request that doesn't fit (the view
+answers 429), so a slow or unavailable Neo4j pushes back on the clients
+instead of growing memory.
+
+Durability is at-least-once: events are in the spool before the request is
+acknowledged, and a segment is only deleted after its batch committed.
+A worker holds an exclusive flock() on each of its segments until it deletes
+it; a worker that starts claims (locks) every segment nobody holds, including
+ones named after its own pid (a restarted container often reuses the pid of
+the previous run), and replays them. A crash between a commit and the
+deletion replays that batch once more.
+
+A batch that can never be written is quarantined rather than retried
+forever, which would stall ingestion (the buffer stays full, every request
+gets 429) and replay the same events on every restart: events that can't be
+aggregated are set aside at once and the rest are written, and a batch the
+database rejects with the same error QUARANTINE_AFTER times in a row is set
+aside whole. Connection and transient errors never count. Quarantined events
+go to `quarantine/` in SALES_SPOOL_DIR, in the spool's format; once the cause
+is fixed they can be moved back into SALES_SPOOL_DIR to be replayed by the
+next worker that starts.
+"""
+import fcntl
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+from typing import Optional
+
+import orjson
+from django.conf import settings
+from neo4j.exceptions import DriverError, TransientError
+
+from apps.groceries.application.validators import SaleEventDTO
+from apps.groceries.domain.repositories import SalesRepositoryPort
+from .repositories import Neo4jSalesRepository
+
+logger = logging.getLogger(__name__)
+
+# an event in the buffer and in the spool: [grocery uid, item uid, qty, unit price, epoch ts]
+Sale = list
+
+# failures a retry can fix: Neo4j unreachable, leader switch, deadlock, ...
+_RETRYABLE = (DriverError, TransientError, OSError)
+
+
+def aggregate(sales: list[Sale]) -> tuple[list[dict], list[dict]]:
+    """
+    Per (grocery, UTC day) revenue and per item quantity / revenue / last sale,
+    in the shape Neo4jSalesRepository.record_sales takes.
+    """
+    days: dict[tuple, float] = {}
+    items: dict[tuple, list] = {}
+    for gid, item, qty, price, ts in sales:
+        revenue = qty * price
+        day = datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+        days[(gid, day)] = days.get((gid, day), 0.0) + revenue
+        counters = items.get((gid, item))
+        if counters is None:
+            items[(gid, item)] = [qty, revenue, ts]
+        else:
+            counters[0] += qty
+            counters[1] += revenue
+            counters[2] = max(counters[2], ts)
+    return (
+        [{"gid": gid, "date": day, "amount": amount} for (gid, day), amount in days.items()],
+        [{"gid": gid, "uid": item, "qty": qty, "revenue": revenue, "last": last}
+         for (gid, item), (qty, revenue, last) in items.items()],
+    )
+
+
+def split_invalid(sales: list[Sale]) -> tuple[list[Sale], list[Sale]]:
+    """
+    (events aggregate() takes, events it raises on): malformed spool lines,
+    timestamps out of datetime's range, ...
+    """
+    valid, invalid = [], []
+    for sale in sales:
+        try:
+            aggregate([sale])
+        except (ValueError, OverflowError, TypeError):
+            invalid.append(sale)
+        else:
+            valid.append(sale)
+    return valid, invalid
+
+
+class Spool:
+    """
+    Append-only NDJSON segments `<pid>-<token>-<n>.ndjson` in SALES_SPOOL_DIR;
+    the token is unique per process, so a reused pid never reopens a segment
+    of the previous run. Ownership is the flock() held on each segment until
+    it is deleted, not the pid in the name.
+    """
+    def __init__(self, directory: str, fsync: bool = True):
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self._token = uuid.uuid4().hex[:8]
+        self._seq = count(1)
+        self._file = None
+        self._path: Optional[Path] = None
+        # segment -> open file holding its lock, until discard()
+        self._held: dict[Path, object] = {}
+
+    def _segment(self) -> Path:
+        return self.directory / f"{os.getpid()}-{self._token}-{next(self._seq)}.ndjson"
+
+    def append(self, sales: list[Sale]) -> None:
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._path = self._segment()
+            self._file = open(self._path, "ab")
+            # a new, unique name: nobody else can hold it
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            self._held[self._path] = self._file
+        self._file.write(b"".join(orjson.dumps(s) + b"\n" for s in sales))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def quarantine(self, sales: list[Sale]) -> Path:
+        """
+        Writes events that can't be ingested to a new segment in `quarantine/`.
+        """
+        directory = self.directory / "quarantine"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}-{self._token}-{next(self._seq)}.ndjson"
+        with open(path, "ab") as f:
+            f.write(b"".join(orjson.dumps(s) + b"\n" for s in sales))
+            f.flush()
+            os.fsync(f.fileno())
+        return path
+
+    def seal(self) -> Optional[Path]:
+        """
+        Ends the current segment and returns it (still locked); the next
+        append starts a new one.
+        """
+        path, self._path = self._path, None
+        if self._file is not None:
+            self._file.flush()
+            self._file = None
+        return path
+
+    def discard(self, paths: list[Path]) -> None:
+        """
+        Deletes segments whose events are written, then releases their locks.
+        """
+        for path in paths:
+            path.unlink(missing_ok=True)
+            held = self._held.pop(path, None)
+            if held is not None:
+                held.close()
+
+    def claim_orphans(self) -> list[tuple[Path, list[Sale]]]:
+        """
+        Every segment no running worker holds, locked by this one and read
+        back. A torn last line (crash mid-append) is skipped.
+        """
+        if not self.directory.is_dir():
+            return []
+        claimed = []
+        for path in sorted(self.directory.glob("*.ndjson")):
+            if path in self._held:
+                continue
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                # its owner may have deleted it between our open() and flock()
+                current = os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+            except (BlockingIOError, FileNotFoundError):
+                current = False
+            if not current:
+                f.close()
+                continue
+            sales = []
+            for line in f.read().splitlines():
+                try:
+                    sales.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    logger.warning("sales spool: skipped a torn line in %s", path.name)
+            self._held[path] = f
+            claimed.append((path, sales))
+        return claimed
+
+
+class SalesIngestor:
+    QUARANTINE_AFTER = 3
+
+    def __init__(self, repo: SalesRepositoryPort, *, capacity: int, flush_size: int,
+                 flush_interval: float, spool: Spool):
+        self.repo = repo
+        self.capacity = capacity
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.spool = spool
+        self._cond = threading.Condition()
+        self._buffer: list[Sale] = []
+        # a batch whose write failed, with its spool segments: retried before anything else
+        self._pending: list[Sale] = []
+        self._pending_segments: list[Path] = []
+        # the pending batch's last failure, and how many times in a row it failed so
+        self._failure: Optional[tuple[str, str]] = None
+        self._failures = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None:
+                return
+            for path, sales in self.spool.claim_orphans():
+                self._pending.extend(sales)
+                self._pending_segments.append(path)
+            if self._pending:
+                logger.info("sales spool: replaying %d events from %d segments",
+                            len(self._pending), len(self._pending_segments))
+            self._thread = threading.Thread(target=self._run, name="sales-flusher", daemon=True)
+            self._thread.start()
+
+    def accept(self, grocery_uid: str, events: list[SaleEventDTO]) -> bool:
+        """
+        Spools and buffers the events; False (nothing accepted) when they don't fit.
+        """
+        sales = [[grocery_uid, e.item, e.qty, e.price, e.ts] for e in events]
+        with self._cond:
+            if len(self._buffer) + len(self._pending) + len(sales) > self.capacity:
+                return False
+            self.spool.append(sales)
+            self._buffer.extend(sales)
+            if len(self._buffer) >= self.flush_size:
+                self._cond.notify()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if len(self._buffer) < self.flush_size:
+                    self._cond.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                # the thread must outlive any one batch, or the buffer never drains
+                logger.exception("sales flush crashed")
+
+    def flush(self) -> int:
+        """
+        Writes the pending batch plus everything buffered; returns the number
+        of events written (0 when the write failed and the batch was kept).
+        """
+        with self._cond:
+            if self._buffer:
+                self._pending.extend(self._buffer)
+                self._buffer = []
+                segment = self.spool.seal()
+                if segment is not None:
+                    self._pending_segments.append(segment)
+            batch, segments = self._pending, list(self._pending_segments)
+        if not batch:
+            return 0
+        try:
+            try:
+                days, items = aggregate(batch)
+            except (ValueError, OverflowError, TypeError):
+                valid, invalid = split_invalid(batch)
+                if not invalid:
+                    # only the batch as a whole fails: counted like a database error
+                    raise
+                batch = self._set_aside(valid, invalid)
+                days, items = aggregate(batch)
+            if batch:
+                self.repo.record_sales(days=days, items=items)
+        except Exception as e:
+            if not self._failed_permanently(e):
+                logger.exception("sales flush failed; %d events kept for retry", len(batch))
+                return 0
+            try:
+                path = self.spool.quarantine(batch)
+            except OSError:
+                logger.exception("sales flush: quarantine failed; %d events kept for retry", len(batch))
+                return 0
+            logger.error("sales flush failed %d times with %s: %s; %d events quarantined in %s",
+                         self._failures, type(e).__name__, e, len(batch), path, exc_info=e)
+            batch = []
+        with self._cond:
+            # accept() only appends to _buffer, so the pending batch is still ours
+            self._pending = []
+            self._pending_segments = []
+            self._failure, self._failures = None, 0
+        self.spool.discard(segments)
+        return len(batch)
+
+    def _set_aside(self, valid: list[Sale], invalid: list[Sale]) -> list[Sale]:
+        path = self.spool.quarantine(invalid)
+        logger.error("sales flush: %d events can't be aggregated, quarantined in %s", len(invalid), path)
+        with self._cond:
+            # a retry of this batch must not quarantine them again
+            self._pending = valid
+        return valid
+
+    def _failed_permanently(self, exc: Exception) -> bool:
+        if isinstance(exc, _RETRYABLE):
+            self._failure, self._failures = None, 0
+            return False
+        failure = (type(exc).__name__, str(exc))
+        if failure == self._failure:
+            self._failures += 1
+        else:
+            self._failure, self._failures = failure, 1
+        return self._failures >= self.QUARANTINE_AFTER
+
+
+_lock = threading.Lock()
+_ingestors: dict[int, SalesIngestor] = {}
+
+
+def sales_ingestor() -> SalesIngestor:
+    """
+    This process's ingestor, started (spool recovered, flusher running) on first use.
+    """
+    pid = os.getpid()
+    with _lock:
+        ingestor = _ingestors.get(pid)
+        if ingestor is None:
+            ingestor = _ingestors[pid] = SalesIngestor(
+                Neo4jSalesRepository(),
+                capacity=settings.SALES_BUFFER_SIZE,
+                flush_size=settings.SALES_FLUSH_SIZE,
+                flush_interval=settings.SALES_FLUSH_INTERVAL,
+                spool=Spool(settings.SALES_SPOOL_DIR, fsync=settings.SALES_SPOOL_FSYNC),
+            )
+    ingestor.start()
+    return ingestor
@@ -0,0 +1,166 @@
+from rest_framework import status
+
+from apps.groceries.infrastructure.async_repositories import (
+    AsyncNeo4jGroceryRepository, AsyncNeo4jItemRepository,
+    AsyncNeo4jDailyIncomeRepository, AsyncNeo4jAuthorizationRepository,
+)
+from apps.groceries.infrastructure.cached_repositories import AsyncCachedGroceryRepository
+from apps.groceries.interface.serializers import IncomeListQuerySerializer, IncomeSummaryQuerySerializer
+from common.api import ok
+from common.async_views import async_read_view, async_stream_view
+from common.conditional import conditional, list_validator, resource_validator
+from common.exceptions import problem_response
+from common.pagination import KeysetPagination
+from common.response_cache import cache_response
+from common.sse import sse_response
+from infra.events import broker
+from .permissions import _token_scope
+from .views import (
+    GroceryAdminViewSet, GroceryItemViewSet, GroceryIncomeViewSet,
+    dump_grocery, dump_item, dump_income, dump_rollup, groceries_tags, grocery_tags,
+)
+
+# Async GET handlers for the read-heavy endpoints; see common.async_views.
+# Each mirrors the list/retrieve action of the DRF view it falls back to.
+
+grocery_repo = AsyncCachedGroceryRepository(AsyncNeo4jGroceryRepository())
+item_repo = AsyncNeo4jItemRepository()
+income_repo = AsyncNeo4jDailyIncomeRepository()
+authz = AsyncNeo4jAuthorizationRepository()
+
+
+async def is_admin(request, **kwargs) -> bool:
+    return getattr(request.user, "role", None) == "ADMIN"
+
+
+async def admin_or_owning_supplier(request, grocery_uid=None, **kwargs) -> bool:
+    # AdminOrOwningSupplierOnGrocery, awaiting the graph instead of blocking on it
+    role = getattr(request.user, "role", None)
+    if not grocery_uid:
+        return False
+    if role == "ADMIN":
+        return True
+    if role != "SUPPLIER" or not getattr(request.user, "id", None):
+        return False
+    in_scope = _token_scope(request, grocery_uid)
+    if in_scope is not None:
+        return in_scope
+    return await authz.supplier_grocery_access(user_uid=request.user.id, grocery_uid=grocery_uid)
+
+
+async def groceries_validator(request, **kwargs):
+    return list_validator(request, *await grocery_repo.list_version())
+
+
+async def grocery_validator(request, pk=None, **kwargs):
+    return resource_validator(await grocery_repo.version(pk))
+
+
+async def items_validator(request, grocery_uid=None, **kwargs):
+    return list_validator(request, *await item_repo.list_version(grocery_uid))
+
+
+async def income_validator(request, grocery_uid=None, **kwargs):
+    return list_validator(request, *await income_repo.list_version(grocery_uid))
+
+
+def _bad_request(request, e: ValueError):
+    return problem_response(
+        request,
+        status=status.HTTP_400_BAD_REQUEST,
+        title="Validation failed.",
+        code="VALIDATION_FAILED",
+        detail=str(e),
+        errors={"non_field_errors": [str(e)]},
+        type_slug="validation_failed"
+    )
+
+
+@async_read_view(GroceryAdminViewSet.as_view({"get": "list", "post": "create"}), permission=is_admin)
+@cache_response(tags=groceries_tags)
+@conditional(groceries_validator)
+async def grocery_collection(request):
+    page = KeysetPagination(key=lambda g: (g.created_at.timestamp(), g.id))
+    try:
+        data = await page.apaginate(request, grocery_repo.list_active)
+    except ValueError as e:
+        return _bad_request(request, e)
+    return ok([dump_grocery(x) for x in data],
+              code="GROCERIES_LIST", message="Groceries fetched.", request=request,
+              meta=page.get_meta())
+
+
+@async_read_view(GroceryAdminViewSet.as_view({"get": "retrieve", "put": "update",
+                                              "patch": "partial_update", "delete": "destroy"}),
+                 permission=is_admin)
+@cache_response(tags=grocery_tags)
+@conditional(grocery_validator)
+async def grocery_detail(request, pk=None):
+    g = await grocery_repo.get_by_id(pk)
+    if not g:
+        return problem_response(
+            request,
+            status=status.HTTP_404_NOT_FOUND,
+            title="Grocery not found.",
+            code="GROCERY_NOT_FOUND",
+            detail="Grocery not found or inactive.",
+            errors={"id": ["Grocery not found or inactive."]},
+            type_slug="not_found"
+        )
+    return ok(dump_grocery(g),
+              code="GROCERY_DETAIL", message="Grocery detail.", request=request)
+
+
+@async_read_view(GroceryItemViewSet.as_view({"get": "list", "post": "create"}))
+@cache_response(tags=grocery_tags)
+@conditional(items_validator)
+async def grocery_items(request, grocery_uid=None):
+    page = KeysetPagination(key=lambda i: (i.created_at.timestamp(), i.id))
+    try:
+        items = await page.apaginate(
+            request, lambda **kw: item_repo.list_by_grocery(grocery_uid=grocery_uid, include_deleted=False, **kw))
+    except ValueError as e:
+        return _bad_request(request, e)
+    return ok([dump_item(x) for x in items],
+              code="ITEMS_LIST", message="Items fetched.", request=request,
+              meta=page.get_meta())
+
+
+@async_read_view(GroceryIncomeViewSet.as_view({"post": "create", "get": "list"}),
+                 permission=admin_or_owning_supplier)
+@cache_response(tags=grocery_tags)
+@conditional(income_validator)
+async def grocery_income(request, grocery_uid=None):
+    params = IncomeListQuerySerializer(data=request.GET); params.is_valid(raise_exception=True)
+    start = params.validated_data.get("start")
+    end = params.validated_data.get("end")
+    page = KeysetPagination(key=lambda d: (d.date.isoformat(), d.id))
+    try:
+        data = await page.apaginate(
+            request, lambda **kw: income_repo.list_by_grocery(grocery_uid=grocery_uid, start=start, end=end, **kw))
+    except ValueError as e:
+        return _bad_request(request, e)
+    return ok([dump_income(x) for x in data],
+              code="INCOME_LIST", message="Income fetched.", request=request,
+              meta=page.get_meta())
+
+
+@async_read_view(GroceryIncomeViewSet.as_view({"get": "summary"}), permission=admin_or_owning_supplier)
+async def grocery_income_summary(request, grocery_uid=None):
+    ser = IncomeSummaryQuerySerializer(data=request.GET); ser.is_valid(raise_exception=True)
+    start, end = ser.validated_data.get("start"), ser.validated_data.get("end")
+    data = await income_repo.summarize(
+        grocery_uid=grocery_uid,
+        granularity=ser.validated_data["granularity"],
+        start=start.isoformat() if start else None,
+        end=end.isoformat() if end else None,
+    )
+    return ok([dump_rollup(x) for x in data],
+              code="INCOME_SUMMARY", message="Income summary fetched.", request=request)
+
+
+@async_stream_view(permission=admin_or_owning_supplier)
+async def grocery_events(request, grocery_uid=None):
+    # Server-Sent Events: item.created / item.updated / item.deleted /
+    # items.imported / income.added for this grocery, as they commit
+    return sse_response(lambda: broker().subscribe(grocery_uid))
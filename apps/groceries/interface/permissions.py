@@ -1,13 +1,25 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
-from apps.users.infrastructure.models import UserNode
-from apps.groceries.infrastructure.models import GroceryNode
-from apps.groceries.infrastructure.repositories import Neo4jItemRepository
+from apps.groceries.infrastructure.authorization import supplier_access
+from infra.tracing import traced_methods
 
+
+def _token_scope(request, grocery_uid):
+    """
+    True/False when the access token's grocery scope claim decides, None otherwise.
+    """
+    grocery_scope = getattr(request.user, "grocery_scope", None)
+    return grocery_scope(grocery_uid) if grocery_scope else None
+
+
+@traced_methods("permission")
 class SupplierOwnsTargetOrAdmin(BasePermission):
     """
     - SAFE methods: allow (any authenticated user will be enforced at view level).
     - CREATE under /groceries/{grocery_uid}/items: Supplier must be responsible for that grocery OR Admin.
     - PATCH/DELETE /items/{item_uid}: Supplier must own that item's grocery OR Admin.
+    Supplier checks use the token's grocery scopes when present, else one
+    Cypher query each, memoized on the request. Item targets always need the
+    lookup to find the item's grocery.
     """
     def has_permission(self, request, view):
         role = getattr(request.user, "role", None)
@@ -28,25 +40,22 @@ class SupplierOwnsTargetOrAdmin(BasePermission):
         # Create: grocery_uid in URL kwarg
         grocery_uid = view.kwargs.get("grocery_uid")
         if grocery_uid:
-            u = UserNode.nodes.get_or_none(uid=user_uid, is_active=True)
-            g = GroceryNode.nodes.get_or_none(uid=grocery_uid, is_active=True)
-            return bool(u and g and u.responsible_for.is_connected(g))
+            in_scope = _token_scope(request, grocery_uid)
+            if in_scope is not None:
+                return in_scope
+            return supplier_access(request).can_write_grocery(grocery_uid)
 
         # Update/Delete: we have item uid (pk)
         item_uid = view.kwargs.get("pk")
         if item_uid:
-            repo = Neo4jItemRepository()
-            g_uid = repo.get_item_grocery_uid(item_uid=item_uid)
-            if not g_uid:
-                return False
-            u = UserNode.nodes.get_or_none(uid=user_uid, is_active=True)
-            g = GroceryNode.nodes.get_or_none(uid=g_uid, is_active=True)
-            return bool(u and g and u.responsible_for.is_connected(g))
+            _, allowed = supplier_access(request).item_grocery(item_uid)
+            return allowed
 
         return False
 
 
 
+@traced_methods("permission")
 class AdminOrOwningSupplierOnGrocery(BasePermission):
     """
     Applies to income endpoints that include grocery_uid in path.
@@ -69,6 +78,7 @@ class AdminOrOwningSupplierOnGrocery(BasePermission):
         if not user_uid:
             return False
 
-        u = UserNode.nodes.get_or_none(uid=user_uid, is_active=True)
-        g = GroceryNode.nodes.get_or_none(uid=grocery_uid, is_active=True)
-        return bool(u and g and u.responsible_for.is_connected(g))
+        in_scope = _token_scope(request, grocery_uid)
+        if in_scope is not None:
+            return in_scope
+        return supplier_access(request).can_write_grocery(grocery_uid)
@@ -43,9 +43,49 @@ class DailyIncomeCreateSerializer(serializers.Serializer):
     amount = serializers.FloatField(min_value=0)
     date = serializers.DateField()  # "YYYY-MM-DD"
 
+class DailyIncomeWriteModeSerializer(serializers.Serializer):
+    # add: amount is added to the day's total; replace: it becomes the total (safe to retry)
+    mode = serializers.ChoiceField(choices=["add", "replace"], default="add")
+
 class DailyIncomeOutSerializer(serializers.Serializer):
     id = serializers.CharField()
     amount = serializers.FloatField()
     date = serializers.DateField()
     created_at = serializers.DateTimeField()
     updated_at = serializers.DateTimeField()
+
+class IncomeListQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+class SaleEventSerializer(serializers.Serializer):
+    # request schema only: events are validated by application.validators.parse_sale
+    item = serializers.CharField(help_text="Item uid.")
+    qty = serializers.IntegerField(min_value=1)
+    price = serializers.FloatField(min_value=0, help_text="Unit price.")
+    ts = serializers.DateTimeField(help_text="ISO-8601 (UTC if no offset) or epoch seconds.")
+
+class ChangesQuerySerializer(serializers.Serializer):
+    since = serializers.CharField(required=False)   # meta.high_water_mark of the previous poll
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+class ChangesOutSerializer(serializers.Serializer):
+    items = ItemOutSerializer(many=True)            # soft-deleted items come back with is_deleted=true
+    income = DailyIncomeOutSerializer(many=True)
+    # income records removed (duplicates merged by compact_daily_income): drop them locally
+    deleted_income = serializers.ListField(child=serializers.CharField())
+
+class IncomeSummaryQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=["month", "week"], default="month")
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+class IncomeRollupOutSerializer(serializers.Serializer):
+    granularity = serializers.CharField()
+    period = serializers.CharField()
+    start = serializers.DateField()
+    end = serializers.DateField()
+    sum = serializers.FloatField()
+    count = serializers.IntegerField()
+    min = serializers.FloatField(allow_null=True)
+    max = serializers.FloatField(allow_null=True)
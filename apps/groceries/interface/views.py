@@ -1,25 +1,116 @@
+import logging
+import time
+from django.conf import settings
 from rest_framework import status, viewsets, mixins
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from apps.groceries.application.use_cases import CreateGrocery, UpdateGrocery, DeleteGrocery
-from apps.groceries.application.validators import GroceryCreateDTO, GroceryUpdateDTO
+from apps.groceries.application.validators import GroceryCreateDTO, GroceryUpdateDTO, parse_sale
+from apps.groceries.domain.entities import GroceryEntity, ItemEntity, DailyIncomeEntity, IncomeRollupEntity
+from apps.groceries.domain.exceptions import BulkImportInterrupted, ConcurrentUpdate
+from apps.groceries.infrastructure.models import GroceryNode
 from apps.groceries.infrastructure.repositories import Neo4jGroceryRepository
+from apps.groceries.infrastructure.cached_repositories import CachedGroceryRepository
+from apps.groceries.infrastructure.sales_ingest import sales_ingestor
 from .serializers import GroceryCreateSerializer, GroceryUpdateSerializer, GroceryOutSerializer, ItemCreateSerializer, ItemUpdateSerializer, ItemOutSerializer
 from apps.groceries.interface.serializers import (
-    DailyIncomeCreateSerializer, DailyIncomeOutSerializer
+    DailyIncomeCreateSerializer, DailyIncomeOutSerializer, DailyIncomeWriteModeSerializer,
+    IncomeListQuerySerializer, IncomeSummaryQuerySerializer, IncomeRollupOutSerializer,
+    ChangesQuerySerializer, ChangesOutSerializer, SaleEventSerializer,
 )
 from apps.users.interface.permissions import IsAdminRole  # reuse from users app
-from apps.groceries.infrastructure.repositories import Neo4jItemRepository, Neo4jDailyIncomeRepository
+from apps.groceries.infrastructure.repositories import Neo4jItemRepository, Neo4jDailyIncomeRepository, Neo4jChangeFeedRepository
 from common.api import ok
+from common.conditional import conditional, list_validator, resource_validator, precondition_failed
 from common.exceptions import problem_response
+from common.pagination import KeysetPagination, encode_cursor, decode_cursor
+from common.response_cache import cache_response
+from common.serialization import dumper
+from common.streaming import NDJSONRenderer, wants_stream, stream_ok
+from common.parsers import NDJSONParser, CSVParser
+from infra.neo4j.unit_of_work import non_atomic
 from .permissions import SupplierOwnsTargetOrAdmin, AdminOrOwningSupplierOnGrocery
 from common.api import ok
 
 from drf_spectacular.utils import extend_schema, OpenApiResponse,OpenApiParameter
 from common.schemas import Envelope, Problem
 
+logger = logging.getLogger(__name__)
+
+# output fast paths; the *OutSerializer classes stay the documented schema
+dump_grocery = dumper(GroceryEntity)
+dump_item = dumper(ItemEntity)
+dump_income = dumper(DailyIncomeEntity)
+dump_rollup = dumper(IncomeRollupEntity)
+
+
+# response cache tags (common.response_cache), purged by the repository writes
+def groceries_tags(request, **kwargs):
+    return ["groceries"]
+
+
+def grocery_tags(request, grocery_uid=None, pk=None, **kwargs):
+    return [f"grocery:{grocery_uid or pk}"]
+
+
+# ETag / Last-Modified validators (common.conditional): one aggregate query, no rows
+def groceries_validator(request, **kwargs):
+    return list_validator(request, *GroceryAdminViewSet.repo.list_version())
+
+
+def grocery_validator(request, pk=None, **kwargs):
+    return resource_validator(GroceryAdminViewSet.repo.version(pk))
+
+
+def items_validator(request, grocery_uid=None, **kwargs):
+    return list_validator(request, *GroceryItemViewSet.repo.list_version(grocery_uid))
+
+
+def item_validator(request, pk=None, **kwargs):
+    return resource_validator(ItemDetailViewSet.repo.version(pk))
+
+
+def income_validator(request, grocery_uid=None, **kwargs):
+    return list_validator(request, *GroceryIncomeViewSet.repo.list_version(grocery_uid))
+
+
+def grocery_not_found(request):
+    return problem_response(
+        request,
+        status=status.HTTP_404_NOT_FOUND,
+        title="Grocery not found.",
+        code="GROCERY_NOT_FOUND",
+        detail="Grocery not found or inactive.",
+        errors={"id": ["Grocery not found or inactive."]},
+        type_slug="not_found"
+    )
+
+
+CONDITIONAL_GET_PARAMETERS = [
+    OpenApiParameter(name="If-None-Match", location=OpenApiParameter.HEADER, required=False,
+                     description="ETag of a cached copy; answered with 304 when it is still current."),
+    OpenApiParameter(name="If-Modified-Since", location=OpenApiParameter.HEADER, required=False,
+                     description="Ignored when If-None-Match is sent."),
+]
+
+
+# `?stream=1` or `Accept: application/x-ndjson` streams the whole list instead of a page
+STREAM_PARAMETERS = [
+    OpenApiParameter(name="stream", location=OpenApiParameter.QUERY, required=False,
+                     description="`1` streams the full list as one JSON envelope (no pagination)."),
+]
+
+# Cursor parameters for the plain ViewSets (GenericViewSets get them from the paginator)
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(name="cursor", location=OpenApiParameter.QUERY, required=False,
+                     description="Opaque cursor from `meta.next` / `meta.prev`."),
+    OpenApiParameter(name="limit", location=OpenApiParameter.QUERY, required=False, type=int,
+                     description="Page size (default 20)."),
+]
+
 
 class GroceryAdminViewSet(mixins.CreateModelMixin,
                           mixins.UpdateModelMixin,
@@ -28,7 +119,8 @@ class GroceryAdminViewSet(mixins.CreateModelMixin,
                           mixins.ListModelMixin,
                           viewsets.GenericViewSet):
     permission_classes = [IsAuthenticated, IsAdminRole]
-    repo = Neo4jGroceryRepository()
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    repo = CachedGroceryRepository(Neo4jGroceryRepository())
 
     def get_serializer_class(self):
         if self.action in ("partial_update",):
@@ -41,44 +133,62 @@ class GroceryAdminViewSet(mixins.CreateModelMixin,
         tags=["Groceries"],
         summary="List groceries (Admin only)",
         description="Return all active grocery accounts. Not part of assessment core, but useful for admin QA/debug.",
+        parameters=[*STREAM_PARAMETERS, *CONDITIONAL_GET_PARAMETERS],
         responses={
             200: OpenApiResponse(Envelope(GroceryOutSerializer(many=True)), description="Groceries list."),
+            304: OpenApiResponse(description="Not modified since the ETag / date sent."),
+            400: Problem("validation_error"),
             401: Problem("unauthorized"),
             403: Problem("forbidden"),
         },
         # security=[{"BearerAuth": []}],
         # security=[{"bearerAuth": []}]
     )
+    @cache_response(tags=groceries_tags)
+    @conditional(groceries_validator)
     def list(self, request):
-        data = list(self.repo.list_active())
-        return ok(GroceryOutSerializer(data, many=True).data,
-                  code="GROCERIES_LIST", message="Groceries fetched.", request=request)
+        mode = wants_stream(request)
+        if mode:
+            return stream_ok(self.repo.list_active(), to_dict=dump_grocery,
+                             code="GROCERIES_LIST", message="Groceries fetched.", request=request, mode=mode)
+        page = KeysetPagination(key=lambda g: (g.created_at.timestamp(), g.id))
+        try:
+            data = page.paginate(request, lambda **kw: list(self.repo.list_active(**kw)))
+        except ValueError as e:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail=str(e),
+                errors={"non_field_errors": [str(e)]},
+                type_slug="validation_failed"
+            )
+        return ok([dump_grocery(x) for x in data],
+                  code="GROCERIES_LIST", message="Groceries fetched.", request=request,
+                  meta=page.get_meta())
 
 
     @extend_schema(
         tags=["Groceries"],
         summary="Retrieve grocery (Admin only)",
         description="Get details of a single grocery by UID.",
+        parameters=CONDITIONAL_GET_PARAMETERS,
         responses={
             200: OpenApiResponse(Envelope(GroceryOutSerializer), description="Grocery details."),
+            304: OpenApiResponse(description="Not modified since the ETag / date sent."),
             401: Problem("unauthorized"),
             403: Problem("forbidden"),
             404: Problem("not_found"),
         },
     )
+    @cache_response(tags=grocery_tags)
+    @conditional(grocery_validator)
     def retrieve(self, request, pk=None):
         g = self.repo.get_by_id(pk)
         if not g:
-            return problem_response(
-                request,
-                status=status.HTTP_404_NOT_FOUND,
-                title="Grocery not found.",
-                code="GROCERY_NOT_FOUND",
-                detail="Grocery not found or inactive.",
-                errors={"id": ["Grocery not found or inactive."]},
-                type_slug="not_found"
-            )
-        return ok(GroceryOutSerializer(g).data,
+            return grocery_not_found(request)
+        return ok(dump_grocery(g),
                   code="GROCERY_DETAIL", message="Grocery detail.", request=request)
 
     @extend_schema(
@@ -107,7 +217,7 @@ class GroceryAdminViewSet(mixins.CreateModelMixin,
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(GroceryOutSerializer(g).data,
+        return ok(dump_grocery(g),
                   code="GROCERY_CREATED", message="Grocery created.", status=status.HTTP_201_CREATED, request=request)
 
     
@@ -138,7 +248,7 @@ class GroceryAdminViewSet(mixins.CreateModelMixin,
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(GroceryOutSerializer(g).data,
+        return ok(dump_grocery(g),
                   code="GROCERY_UPDATED", message="Grocery updated.", request=request)
 
     
@@ -169,22 +279,50 @@ class GroceryItemViewSet(viewsets.ViewSet):
     Routes:
       GET  /api/v1/groceries/{grocery_uid}/items/       -> list
       POST /api/v1/groceries/{grocery_uid}/items/       -> create
+      POST /api/v1/groceries/{grocery_uid}/items/bulk/  -> bulk_create (JSON array, NDJSON or CSV)
     """
     permission_classes = [IsAuthenticated, SupplierOwnsTargetOrAdmin]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser, CSVParser]
+    read_throttle_scope = "item_read"
     repo = Neo4jItemRepository()
 
     @extend_schema(
         tags=["Items"],
         summary="List items for a grocery (any authenticated)",
+        parameters=[*PAGINATION_PARAMETERS, *STREAM_PARAMETERS, *CONDITIONAL_GET_PARAMETERS],
         responses={
             200: OpenApiResponse(Envelope(ItemOutSerializer(many=True)), description="Items list."),
+            304: OpenApiResponse(description="Not modified since the ETag / date sent."),
+            400: Problem("validation_error"),
             401: Problem("unauthorized"),
         },
     )
+    @cache_response(tags=grocery_tags)
+    @conditional(items_validator)
     def list(self, request, grocery_uid=None):
-        items = list(self.repo.list_by_grocery(grocery_uid=grocery_uid, include_deleted=False))
-        return ok(ItemOutSerializer(items, many=True).data,
-                  code="ITEMS_LIST", message="Items fetched.", request=request)
+        mode = wants_stream(request)
+        if mode:
+            rows = self.repo.list_by_grocery(grocery_uid=grocery_uid, include_deleted=False)
+            return stream_ok(rows, to_dict=dump_item,
+                             code="ITEMS_LIST", message="Items fetched.", request=request, mode=mode)
+        page = KeysetPagination(key=lambda i: (i.created_at.timestamp(), i.id))
+        try:
+            items = page.paginate(request, lambda **kw: list(
+                self.repo.list_by_grocery(grocery_uid=grocery_uid, include_deleted=False, **kw)))
+        except ValueError as e:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail=str(e),
+                errors={"non_field_errors": [str(e)]},
+                type_slug="validation_failed"
+            )
+        return ok([dump_item(x) for x in items],
+                  code="ITEMS_LIST", message="Items fetched.", request=request,
+                  meta=page.get_meta())
 
     @extend_schema(
         tags=["Items"],
@@ -212,10 +350,108 @@ class GroceryItemViewSet(viewsets.ViewSet):
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(ItemOutSerializer(item).data,
+        return ok(dump_item(item),
                   code="ITEM_CREATED", message="Item created.",
                   status=status.HTTP_201_CREATED, request=request)
 
+    @extend_schema(
+        tags=["Items"],
+        summary="Bulk import items for a grocery (Admin or owning Supplier)",
+        description=(
+            "Body is a JSON array, NDJSON (`application/x-ndjson`) or CSV with a header row "
+            "(`text/csv`), each row shaped like the single-item create. Valid rows are written in "
+            "batches of `ITEM_BULK_BATCH_SIZE`, one transaction per batch; invalid rows are "
+            "reported by index and skipped. If a batch fails after earlier ones were committed, "
+            "the problem response's `meta.created` counts the stored items and `meta.resume_from` "
+            "is the index of the first row not written: resend the rows from there on."
+        ),
+        request=ItemCreateSerializer(many=True),
+        responses={
+            201: OpenApiResponse(description="Items imported; `data.errors` lists rejected rows."),
+            400: Problem("validation_error"),
+            401: Problem("unauthorized"),
+            403: Problem("forbidden"),
+            500: Problem("server_error"),
+        },
+    )
+    @non_atomic  # one transaction per batch, not one for the whole import
+    def bulk_create(self, request, grocery_uid=None):
+        rows = request.data
+        if not isinstance(rows, list):
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail="Expected a JSON array, NDJSON or CSV rows.",
+                errors={"non_field_errors": ["Expected a JSON array, NDJSON or CSV rows."]},
+                type_slug="validation_failed"
+            )
+        max_rows = settings.ITEM_BULK_MAX_ROWS
+        if len(rows) > max_rows:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="TOO_MANY_ROWS",
+                detail=f"At most {max_rows} rows per request.",
+                errors={"non_field_errors": [f"At most {max_rows} rows per request."]},
+                type_slug="validation_failed"
+            )
+
+        valid, indexes, errors = [], [], []
+        for index, row in enumerate(rows):
+            ser = ItemCreateSerializer(data=row)
+            if ser.is_valid():
+                valid.append(ser.validated_data)
+                indexes.append(index)
+            else:
+                errors.append({"row": index, "errors": ser.errors})
+        if not valid:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail="No valid rows to import.",
+                errors={"rows": errors},
+                type_slug="validation_failed"
+            )
+
+        started = time.perf_counter()
+        try:
+            created = self.repo.bulk_create(grocery_uid=grocery_uid, rows=valid,
+                                            batch_size=settings.ITEM_BULK_BATCH_SIZE)
+        except BulkImportInterrupted as e:
+            # rows before resume_from are stored: a retry of the whole body would duplicate them
+            logger.error("%s", e, exc_info=e.__cause__, extra={"grocery": grocery_uid})
+            return problem_response(
+                request,
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                title="Import interrupted.",
+                code="IMPORT_INTERRUPTED",
+                detail=f"{e.created} items were created before the import failed; "
+                       f"resend the rows from index {indexes[e.created]} on.",
+                errors={"rows": errors},
+                meta={"created": e.created, "resume_from": indexes[e.created]},
+            )
+        except ValueError as e:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail=str(e),
+                errors={"non_field_errors": [str(e)]},
+                type_slug="validation_failed"
+            )
+        elapsed = time.perf_counter() - started
+        return ok({"created": created, "failed": len(errors), "errors": errors},
+                  code="ITEMS_IMPORTED", message="Items imported.",
+                  status=status.HTTP_201_CREATED, request=request,
+                  meta={"elapsed_ms": round(elapsed * 1000, 1),
+                        "rows_per_sec": round(created / elapsed) if elapsed else None})
+
 class ItemDetailViewSet(viewsets.ViewSet):
     """
       PATCH /api/v1/items/{item_uid}/
@@ -228,19 +464,30 @@ class ItemDetailViewSet(viewsets.ViewSet):
     @extend_schema(
         tags=["Items"],
         summary="Update item (Admin or owning Supplier, partial)",
+        description="Send the item's ETag in `If-Match` to update only if nobody changed it since.",
         request=ItemUpdateSerializer,
+        parameters=[
+            OpenApiParameter(name="If-Match", location=OpenApiParameter.HEADER, required=False,
+                             description="ETag the edit is based on (optimistic concurrency)."),
+        ],
         responses={
             200: OpenApiResponse(Envelope(ItemOutSerializer), description="Item updated."),
             400: Problem("validation_error"),
             401: Problem("unauthorized"),
             403: Problem("forbidden"),
             404: Problem("not_found"),
+            412: Problem("precondition_failed"),
         },
     )
+    @conditional(item_validator)
     def partial_update(self, request, pk=None):
         ser = ItemUpdateSerializer(data=request.data, partial=True); ser.is_valid(raise_exception=True)
+        # with If-Match the write re-checks the version under the node lock
+        expected = request.validator.updated_at if "If-Match" in request.headers and request.validator else None
         try:
-            updated = self.repo.update_fields(uid=pk, **ser.validated_data)
+            updated = self.repo.update_fields(uid=pk, expected_updated_at=expected, **ser.validated_data)
+        except ConcurrentUpdate:
+            return precondition_failed(request)
         except ValueError as e:
             return problem_response(
                 request,
@@ -251,8 +498,10 @@ class ItemDetailViewSet(viewsets.ViewSet):
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(ItemOutSerializer(updated).data,
-                  code="ITEM_UPDATED", message="Item updated.", request=request)
+        response = ok(dump_item(updated),
+                      code="ITEM_UPDATED", message="Item updated.", request=request)
+        response["ETag"] = resource_validator(updated.updated_at).etag
+        return response
 
 
     @extend_schema(
@@ -276,18 +525,34 @@ class GroceryIncomeViewSet(viewsets.ViewSet):
     """
     Routes:
       POST /api/v1/groceries/{grocery_uid}/income/   -> create (Admin or owning Supplier)
+      POST /api/v1/groceries/{grocery_uid}/income/bulk/ -> bulk_create (JSON array, NDJSON or CSV)
+        optional query param for both: ?mode=add|replace
       GET  /api/v1/groceries/{grocery_uid}/income/   -> list  (Admin; Supplier only for their grocery)
         optional query params: ?start=YYYY-MM-DD&end=YYYY-MM-DD
+      GET  /api/v1/groceries/{grocery_uid}/income/summary/ -> summary (monthly/weekly rollups)
+        optional query params: ?granularity=month|week&start=YYYY-MM-DD&end=YYYY-MM-DD
     """
     permission_classes = [IsAuthenticated, AdminOrOwningSupplierOnGrocery]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser, CSVParser]
     repo = Neo4jDailyIncomeRepository()
 
 
     @extend_schema(
         tags=["Income"],
         summary="Add daily income (Admin or owning Supplier)",
+        description=(
+            "There is one income record per grocery and day. `mode=add` (default) adds `amount` "
+            "to the day's total; `mode=replace` sets the total, so a retried request has no "
+            "further effect."
+        ),
         request=DailyIncomeCreateSerializer,
+        parameters=[
+            OpenApiParameter(name="mode", location=OpenApiParameter.QUERY, required=False,
+                             enum=["add", "replace"], description="Defaults to add."),
+        ],
         responses={
+            200: OpenApiResponse(Envelope(DailyIncomeOutSerializer), description="Day's income updated."),
             201: OpenApiResponse(Envelope(DailyIncomeOutSerializer), description="Income recorded."),
             400: Problem("validation_error"),
             401: Problem("unauthorized"),
@@ -297,8 +562,12 @@ class GroceryIncomeViewSet(viewsets.ViewSet):
     )
     def create(self, request, grocery_uid=None):
         ser = DailyIncomeCreateSerializer(data=request.data); ser.is_valid(raise_exception=True)
+        mode = DailyIncomeWriteModeSerializer(data=request.query_params); mode.is_valid(raise_exception=True)
         try:
-            rec = self.repo.create(grocery_uid=grocery_uid, **ser.validated_data)
+            rec = self.repo.create(grocery_uid=grocery_uid, mode=mode.validated_data["mode"],
+                                   **ser.validated_data)
+        except GroceryNode.DoesNotExist:
+            return grocery_not_found(request)
         except ValueError as e:
             return problem_response(
                 request,
@@ -309,9 +578,75 @@ class GroceryIncomeViewSet(viewsets.ViewSet):
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(DailyIncomeOutSerializer(rec).data,
+        # both stamps are set by the write that created the day
+        created = rec.created_at == rec.updated_at
+        return ok(dump_income(rec),
                   code="INCOME_ADDED", message="Income recorded.",
-                  status=status.HTTP_201_CREATED, request=request)
+                  status=status.HTTP_201_CREATED if created else status.HTTP_200_OK, request=request)
+
+    @extend_schema(
+        tags=["Income"],
+        summary="Record income for many days (Admin or owning Supplier)",
+        description=(
+            "Body is a JSON array, NDJSON (`application/x-ndjson`) or CSV with a header row "
+            "(`text/csv`) of `{date, amount}` rows, written in one transaction with the same "
+            "`mode` semantics as the single create. Rows for the same day are summed (add) or the "
+            "last one wins (replace); invalid rows are reported by index and skipped."
+        ),
+        request=DailyIncomeCreateSerializer(many=True),
+        parameters=[
+            OpenApiParameter(name="mode", location=OpenApiParameter.QUERY, required=False,
+                             enum=["add", "replace"], description="Defaults to add."),
+        ],
+        responses={
+            200: OpenApiResponse(description="Days written; `data.errors` lists rejected rows."),
+            400: Problem("validation_error"),
+            401: Problem("unauthorized"),
+            403: Problem("forbidden"),
+            404: Problem("not_found"),
+        },
+    )
+    def bulk_create(self, request, grocery_uid=None):
+        mode = DailyIncomeWriteModeSerializer(data=request.query_params); mode.is_valid(raise_exception=True)
+        rows = request.data
+        max_rows = settings.INCOME_BULK_MAX_ROWS
+        if not isinstance(rows, list) or len(rows) > max_rows:
+            detail = (f"At most {max_rows} rows per request." if isinstance(rows, list)
+                      else "Expected a JSON array, NDJSON or CSV rows.")
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail=detail,
+                errors={"non_field_errors": [detail]},
+                type_slug="validation_failed"
+            )
+
+        valid, errors = [], []
+        for index, row in enumerate(rows):
+            ser = DailyIncomeCreateSerializer(data=row)
+            if ser.is_valid():
+                valid.append(ser.validated_data)
+            else:
+                errors.append({"row": index, "errors": ser.errors})
+        if not valid:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail="No valid rows to write.",
+                errors={"rows": errors},
+                type_slug="validation_failed"
+            )
+
+        try:
+            days = self.repo.create_many(grocery_uid=grocery_uid, rows=valid, mode=mode.validated_data["mode"])
+        except GroceryNode.DoesNotExist:
+            return grocery_not_found(request)
+        return ok({"days": [dump_income(d) for d in days], "failed": len(errors), "errors": errors},
+                  code="INCOME_BULK_WRITTEN", message="Income recorded.", request=request)
 
 
     @extend_schema(
@@ -320,16 +655,213 @@ class GroceryIncomeViewSet(viewsets.ViewSet):
         parameters=[
             OpenApiParameter(name="start", location=OpenApiParameter.QUERY, required=False, description="YYYY-MM-DD"),
             OpenApiParameter(name="end",   location=OpenApiParameter.QUERY, required=False, description="YYYY-MM-DD"),
+            *PAGINATION_PARAMETERS,
+            *STREAM_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
         ],
         responses={
             200: OpenApiResponse(Envelope(DailyIncomeOutSerializer(many=True)), description="Income list."),
+            304: OpenApiResponse(description="Not modified since the ETag / date sent."),
+            400: Problem("validation_error"),
+            401: Problem("unauthorized"),
+            403: Problem("forbidden"),
+        },
+    )
+    @cache_response(tags=grocery_tags)
+    @conditional(income_validator)
+    def list(self, request, grocery_uid=None):
+        params = IncomeListQuerySerializer(data=request.query_params); params.is_valid(raise_exception=True)
+        start = params.validated_data.get("start")
+        end = params.validated_data.get("end")
+        mode = wants_stream(request)
+        if mode:
+            rows = self.repo.list_by_grocery(grocery_uid=grocery_uid, start=start, end=end)
+            return stream_ok(rows, to_dict=dump_income,
+                             code="INCOME_LIST", message="Income fetched.", request=request, mode=mode)
+        page = KeysetPagination(key=lambda d: (d.date.isoformat(), d.id))
+        try:
+            data = page.paginate(request, lambda **kw: list(
+                self.repo.list_by_grocery(grocery_uid=grocery_uid, start=start, end=end, **kw)))
+        except ValueError as e:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail=str(e),
+                errors={"non_field_errors": [str(e)]},
+                type_slug="validation_failed"
+            )
+        return ok([dump_income(x) for x in data],
+                  code="INCOME_LIST", message="Income fetched.", request=request,
+                  meta=page.get_meta())
+
+
+    @extend_schema(
+        tags=["Income"],
+        summary="Income totals per month or ISO week (Admin any grocery; Supplier only their grocery)",
+        description="Reads the pre-aggregated rollups only; returns every period overlapping `start`..`end`.",
+        parameters=[
+            OpenApiParameter(name="granularity", location=OpenApiParameter.QUERY, required=False,
+                             enum=["month", "week"], description="Defaults to month."),
+            OpenApiParameter(name="start", location=OpenApiParameter.QUERY, required=False, description="YYYY-MM-DD"),
+            OpenApiParameter(name="end",   location=OpenApiParameter.QUERY, required=False, description="YYYY-MM-DD"),
+        ],
+        responses={
+            200: OpenApiResponse(Envelope(IncomeRollupOutSerializer(many=True)), description="Income summary."),
+            400: Problem("validation_error"),
+            401: Problem("unauthorized"),
+            403: Problem("forbidden"),
+        },
+    )
+    def summary(self, request, grocery_uid=None):
+        ser = IncomeSummaryQuerySerializer(data=request.query_params); ser.is_valid(raise_exception=True)
+        start, end = ser.validated_data.get("start"), ser.validated_data.get("end")
+        data = list(self.repo.summarize(
+            grocery_uid=grocery_uid,
+            granularity=ser.validated_data["granularity"],
+            start=start.isoformat() if start else None,
+            end=end.isoformat() if end else None,
+        ))
+        return ok([dump_rollup(x) for x in data],
+                  code="INCOME_SUMMARY", message="Income summary fetched.", request=request)
+
+
+
+class GrocerySalesViewSet(viewsets.ViewSet):
+    """
+    Routes:
+      POST /api/v1/groceries/{grocery_uid}/sales/  -> ingest point-of-sale events (Admin or owning Supplier)
+
+    Events are spooled and buffered by this worker and added to the grocery's
+    DailyIncome totals and item sales counters within about
+    SALES_FLUSH_INTERVAL seconds (see infrastructure.sales_ingest).
+    """
+    permission_classes = [IsAuthenticated, AdminOrOwningSupplierOnGrocery]
+    parser_classes = [NDJSONParser, *api_settings.DEFAULT_PARSER_CLASSES]
+
+    @extend_schema(
+        tags=["Income"],
+        summary="Ingest point-of-sale events (Admin or owning Supplier)",
+        description=(
+            "Body is NDJSON (`application/x-ndjson`) or a JSON array of sales. Accepted events are "
+            "durable once the response is sent and are counted asynchronously; invalid rows are "
+            "reported by index and skipped. 429 means this worker's buffer is full: retry the same "
+            "batch after `Retry-After` seconds."
+        ),
+        request=SaleEventSerializer(many=True),
+        responses={
+            202: OpenApiResponse(description="Events accepted; `data.errors` lists rejected rows."),
+            400: Problem("validation_error"),
+            401: Problem("unauthorized"),
+            403: Problem("forbidden"),
+            429: Problem("rate_limited"),
+        },
+    )
+    @non_atomic  # nothing is written to Neo4j in the request
+    def create(self, request, grocery_uid=None):
+        rows = request.data
+        max_events = settings.SALES_MAX_EVENTS
+        if not isinstance(rows, list) or len(rows) > max_events:
+            detail = (f"At most {max_events} events per request." if isinstance(rows, list)
+                      else "Expected NDJSON or a JSON array of sales.")
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail=detail,
+                errors={"non_field_errors": [detail]},
+                type_slug="validation_failed"
+            )
+
+        events, errors = [], []
+        for index, row in enumerate(rows):
+            try:
+                events.append(parse_sale(row))
+            except ValueError as e:
+                errors.append({"row": index, "errors": [str(e)]})
+        if not events:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail="No valid sales to ingest.",
+                errors={"rows": errors},
+                type_slug="validation_failed"
+            )
+
+        if not sales_ingestor().accept(grocery_uid, events):
+            response = problem_response(
+                request,
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                title="Ingestion buffer full.",
+                code="INGEST_BACKPRESSURE",
+                detail="Sales are arriving faster than they can be written; retry this batch later.",
+                type_slug="rate_limited"
+            )
+            response["Retry-After"] = str(max(1, round(settings.SALES_FLUSH_INTERVAL)))
+            return response
+        return ok({"accepted": len(events), "failed": len(errors), "errors": errors},
+                  code="SALES_ACCEPTED", message="Sales accepted.",
+                  status=status.HTTP_202_ACCEPTED, request=request)
+
+
+class GroceryChangesViewSet(viewsets.ViewSet):
+    """
+    Routes:
+      GET /api/v1/groceries/{grocery_uid}/changes/?since=<high_water_mark>  (Admin; Supplier only for their grocery)
+
+    Delta sync for offline clients: the items (soft-deleted ones as tombstones),
+    the income and the uids of removed income records (`deleted_income`)
+    changed since the previous poll, so a poll costs O(changes)
+    instead of O(catalogue). Start without `since`, apply the rows, keep
+    `meta.high_water_mark` and poll again with it (immediately while
+    `meta.has_more`).
+    """
+    permission_classes = [IsAuthenticated, AdminOrOwningSupplierOnGrocery]
+    repo = Neo4jChangeFeedRepository()
+
+    @extend_schema(
+        tags=["Sync"],
+        summary="Items and income changed since a high-water mark",
+        parameters=[
+            OpenApiParameter(name="since", location=OpenApiParameter.QUERY, required=False,
+                             description="`meta.high_water_mark` of the previous poll; omit for a full sync."),
+            OpenApiParameter(name="limit", location=OpenApiParameter.QUERY, required=False, type=int,
+                             description="Max changes per response (default 20)."),
+        ],
+        responses={
+            200: OpenApiResponse(Envelope(ChangesOutSerializer), description="Changes in (updated_at, id) order."),
+            400: Problem("validation_error"),
             401: Problem("unauthorized"),
             403: Problem("forbidden"),
         },
     )
     def list(self, request, grocery_uid=None):
-        start = request.query_params.get("start")
-        end = request.query_params.get("end")
-        data = list(self.repo.list_by_grocery(grocery_uid=grocery_uid, start=start, end=end))
-        return ok(DailyIncomeOutSerializer(data, many=True).data,
-                  code="INCOME_LIST", message="Income fetched.", request=request)
\ No newline at end of file
+        params = ChangesQuerySerializer(data=request.query_params); params.is_valid(raise_exception=True)
+        since = params.validated_data.get("since")
+        limit = min(params.validated_data.get("limit") or api_settings.PAGE_SIZE or 20, settings.MAX_PAGE_SIZE)
+        try:
+            after = decode_cursor(since).position if since else None
+        except ValueError as e:
+            return problem_response(
+                request,
+                status=status.HTTP_400_BAD_REQUEST,
+                title="Validation failed.",
+                code="VALIDATION_FAILED",
+                detail=str(e),
+                errors={"since": [str(e)]},
+                type_slug="validation_failed"
+            )
+        changes = self.repo.changes(grocery_uid, after=after, limit=limit + 1,
+                                    until=time.time() - settings.CHANGES_SETTLE_SECONDS)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        high_water_mark = encode_cursor(*changes[-1].position) if changes else since
+        return ok({"items": [dump_item(c.entity) for c in changes if c.kind == "item"],
+                   "income": [dump_income(c.entity) for c in changes if c.kind == "income"],
+                   "deleted_income": [c.entity for c in changes if c.kind == "income_deleted"]},
+                  code="CHANGES_LIST", message="Changes fetched.", request=request,
+                  meta={"high_water_mark": high_water_mark, "has_more": has_more, "limit": limit})
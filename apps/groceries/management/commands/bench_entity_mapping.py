@@ -0,0 +1,66 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from neomodel import db
+from apps.groceries.domain.entities import ItemEntity
+from apps.groceries.infrastructure.models import ItemNode
+from apps.groceries.infrastructure.repositories import (
+    Neo4jGroceryRepository, Neo4jItemRepository, ITEM_FIELDS, _to_item_entity,
+)
+
+
+def _from_node(n: ItemNode) -> ItemEntity:
+    # the pre-projection mapping: StructuredNode attributes -> entity
+    return ItemEntity(
+        id=n.uid, name=n.name, item_type=n.item_type, item_location=n.item_location,
+        price=n.price, is_deleted=bool(n.is_deleted),
+        created_at=n.created_at, updated_at=n.updated_at,
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark: per-row cost of ItemNode.inflate vs map-projection entity mapping"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grocery", help="Existing grocery uid to read (default: seed a temporary one)")
+        parser.add_argument("--rows", type=int, default=50_000,
+                            help="Items to seed when no --grocery is given")
+
+    def handle(self, *args, **options):
+        grocery_uid = options["grocery"]
+        seeded = grocery_uid is None
+        if seeded:
+            grocery_uid = Neo4jGroceryRepository().create(name=f"bench-{uuid.uuid4().hex[:8]}", location="bench").id
+            rows = [{"name": f"item {i}", "item_type": "food", "item_location": "shelf", "price": 1.0}
+                    for i in range(options["rows"])]
+            Neo4jItemRepository().bulk_create(grocery_uid=grocery_uid, rows=rows)
+
+        try:
+            match = "MATCH (:Grocery {uid:$gid})-[:SELLS]->(i:Item)"
+            nodes, _ = db.cypher_query(f"{match} RETURN i", {"gid": grocery_uid})
+            maps, _ = db.cypher_query(f"{match} RETURN i{ITEM_FIELDS}", {"gid": grocery_uid})
+            n = len(nodes)
+            if not n:
+                self.stdout.write(self.style.WARNING("Grocery has no items."))
+                return
+
+            start = time.perf_counter()
+            for row in nodes:
+                _from_node(ItemNode.inflate(row[0]))
+            inflate_us = (time.perf_counter() - start) / n * 1e6
+
+            start = time.perf_counter()
+            for row in maps:
+                _to_item_entity(row[0])
+            projection_us = (time.perf_counter() - start) / n * 1e6
+
+            self.stdout.write(f"rows                 : {n}")
+            self.stdout.write(f"inflate + to_entity  : {inflate_us:8.2f} µs/row")
+            self.stdout.write(f"projection to_entity : {projection_us:8.2f} µs/row")
+            self.stdout.write(self.style.SUCCESS(f"speed-up: {inflate_us / projection_us:.1f}x"))
+        finally:
+            if seeded:
+                db.cypher_query(
+                    "MATCH (g:Grocery {uid:$gid}) OPTIONAL MATCH (g)-[:SELLS]->(i:Item) DETACH DELETE i, g",
+                    {"gid": grocery_uid},
+                )
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from apps.authn.tokens import make_jwt
+
+
+async def _read_response(reader) -> tuple[int, bool]:
+    """
+    Reads one HTTP/1.1 response; returns (status, server closes the connection).
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    length, chunked, close = 0, False, False
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value:
+            chunked = True
+        elif name == "connection" and value == "close":
+            close = True
+    if chunked:
+        while (size := int((await reader.readline()).split(b";")[0], 16)):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    elif length:
+        await reader.readexactly(length)
+    return int(status_line.split()[1]), close
+
+
+async def _run(url: str, token: str, concurrency: int, total: int) -> dict:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    request = (f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: application/json\r\n"
+               f"Authorization: Bearer {token}\r\n\r\n").encode("latin-1")
+    remaining = [total]
+    latencies, failures = [], [0]
+
+    async def worker():
+        reader = writer = None
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, close = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                failures[0] += 1
+                writer.close()
+                reader = writer = None
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                failures[0] += 1
+            if close:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return {"rps": len(latencies) / elapsed, "p50": pct(0.50), "p99": pct(0.99),
+            "failures": failures[0], "done": len(latencies)}
+
+
+class Command(BaseCommand):
+    help = ("Load test GET endpoints at a fixed concurrency (keep-alive connections) and report "
+            "requests/sec and p50/p99, e.g. the same path on a WSGI and an ASGI deployment")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", action="append", required=True,
+                            help="Full URL to GET; repeat to compare deployments")
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=20_000, help="Requests per URL")
+        parser.add_argument("--token", help="Access token (default: mint an ADMIN token with this SECRET_KEY)")
+
+    def handle(self, *args, **options):
+        token = options["token"] or make_jwt(sub="bench", email="bench@example.com", role="ADMIN", typ="access")
+        for url in options["url"]:
+            if urlsplit(url).scheme != "http":
+                raise CommandError(f"Only plain http:// URLs are supported: {url}")
+            r = asyncio.run(_run(url, token, options["concurrency"], options["requests"]))
+            self.stdout.write(f"{url}")
+            self.stdout.write(f"  {r['done']} requests, c={options['concurrency']}: "
+                              f"{r['rps']:8.1f} req/s   p50 {r['p50']:7.1f} ms   p99 {r['p99']:7.1f} ms")
+            if r["failures"]:
+                self.stdout.write(self.style.WARNING(f"  {r['failures']} failed / non-2xx responses"))
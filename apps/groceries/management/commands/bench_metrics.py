@@ -0,0 +1,62 @@
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from infra import monitoring
+
+ROUTES = ["api/v1/groceries/", "api/v1/groceries/<str:grocery_uid>/items/", "api/v1/items/<str:pk>/"]
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark: metrics collection cost per request and /metrics render time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200_000,
+                            help="Simulated requests per measurement")
+        parser.add_argument("--fingerprints", type=int, default=200,
+                            help="Distinct Cypher fingerprints in the rendered output")
+
+    def handle(self, *args, **options):
+        n = options["iterations"]
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory, METRICS_POOL_INTERVAL=0):
+            monitoring.reset_values()
+            try:
+                self._run(n, options["fingerprints"], directory)
+            finally:
+                monitoring.reset_values()
+
+    def _run(self, n, fingerprints, directory):
+        def per_op(fn):
+            fn(0)   # creates the series
+            start = time.perf_counter()
+            for i in range(n):
+                fn(i)
+            return (time.perf_counter() - start) / n * 1e6
+
+        def request(i):
+            # what MetricsMiddleware does per request
+            monitoring.IN_FLIGHT.inc()
+            monitoring.IN_FLIGHT.dec()
+            monitoring.REQUEST_LATENCY.observe(0.012, "GET", ROUTES[i % 3], "200")
+
+        baseline = per_op(lambda i: None)
+        counter = per_op(lambda i: monitoring.THROTTLE_REJECTIONS.inc("bench")) - baseline
+        histogram = per_op(lambda i: monitoring.REQUEST_LATENCY.observe(0.012, "GET", ROUTES[0], "200")) - baseline
+        middleware = per_op(request) - baseline
+
+        for i in range(fingerprints):
+            monitoring.CYPHER_LATENCY.observe(0.003, f"{i:012x}")
+        start = time.perf_counter()
+        body = monitoring.render(directory)
+        render_ms = (time.perf_counter() - start) * 1000
+
+        self.stdout.write(f"counter inc          : {counter:8.2f} µs/op")
+        self.stdout.write(f"histogram observe    : {histogram:8.2f} µs/op")
+        self.stdout.write(f"per request (mw)     : {middleware:8.2f} µs/op")
+        self.stdout.write(f"render /metrics      : {render_ms:8.2f} ms "
+                          f"({body.count(chr(10))} lines, {len(body) // 1024} KiB)")
+        style = self.style.SUCCESS if middleware < 5 else self.style.WARNING
+        self.stdout.write(style(f"collection overhead: {middleware:.2f} µs per request"))
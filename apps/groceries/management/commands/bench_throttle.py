@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from common.throttling import GCRAStore
+
+
+def _worker(path, key, limit, attempts):
+    store = GCRAStore(path)
+    return sum(store.hit(key, limit, 3600)[0] for _ in range(attempts))
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark: cost per throttle check and the quota held across worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50_000,
+                            help="Checks per measurement")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Processes hitting one shared key")
+        parser.add_argument("--limit", type=int, default=1000,
+                            help="Requests per hour allowed on the shared key")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            self._run(os.path.join(directory, "throttle.sqlite3"), options["iterations"],
+                      options["workers"], options["limit"])
+
+    def _run(self, path, n, workers, limit):
+        store = GCRAStore(path)
+
+        def per_op(fn):
+            fn(0)   # opens the connection, creates the row
+            start = time.perf_counter()
+            for i in range(n):
+                fn(i)
+            return (time.perf_counter() - start) / n * 1e6
+
+        allowed = per_op(lambda i: store.hit("allowed", 10 ** 9, 86400))
+        rejected = per_op(lambda i: store.hit("rejected", 1, 86400))
+        many_keys = per_op(lambda i: store.hit(f"user_{i % 10_000}", 10 ** 9, 86400))
+
+        # every worker tries the whole quota: together they must get exactly `limit`
+        attempts = limit
+        context = multiprocessing.get_context("fork")
+        start = time.perf_counter()
+        with context.Pool(workers) as pool:
+            counts = pool.starmap(_worker, [(path, "shared", limit, attempts)] * workers)
+        elapsed = time.perf_counter() - start
+        concurrent = elapsed / (workers * attempts) * 1e6
+
+        self.stdout.write(f"allowed check        : {allowed:8.2f} µs/op")
+        self.stdout.write(f"rejected check       : {rejected:8.2f} µs/op")
+        self.stdout.write(f"10k keys, allowed    : {many_keys:8.2f} µs/op")
+        self.stdout.write(f"{workers} workers, one key   : {concurrent:8.2f} µs/op (wall clock per check)")
+        total = sum(counts)
+        style = self.style.SUCCESS if total == limit else self.style.ERROR
+        self.stdout.write(style(f"shared quota: {total} of {workers * attempts} requests allowed "
+                                f"(limit {limit}, per worker {counts})"))
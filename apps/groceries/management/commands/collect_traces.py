@@ -0,0 +1,57 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Local stand-in for an OpenTelemetry collector: accepts OTLP/HTTP JSON on /v1/traces "
+            "(TRACING_EXPORTER=infra.tracing.OTLPHttpExporter) and prints or saves the spans")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=4318)
+        parser.add_argument("--output", help="Append the spans as JSON lines to this file instead of printing them")
+
+    def handle(self, *args, **options):
+        command = self
+        output = open(options["output"], "ab") if options["output"] else None
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/v1/traces":
+                    self.send_error(404)
+                    return
+                try:
+                    body = orjson.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                except orjson.JSONDecodeError:
+                    self.send_error(400)
+                    return
+                spans = [span for resource in body.get("resourceSpans", [])
+                         for scope in resource.get("scopeSpans", []) for span in scope.get("spans", [])]
+                if output is not None:
+                    output.write(b"".join(orjson.dumps(span) + b"\n" for span in spans))
+                    output.flush()
+                else:
+                    for span in spans:
+                        ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                        command.stdout.write(f"{span['traceId']} {span['spanId']} <- "
+                                             f"{span.get('parentSpanId', '-'):16} {ms:9.3f}ms  {span['name']}")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options["host"], options["port"]), Handler)
+        self.stdout.write(f"Collecting spans on http://{options['host']}:{options['port']}/v1/traces")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if output is not None:
+                output.close()
@@ -0,0 +1,90 @@
+import time
+
+from django.core.management.base import BaseCommand
+from neomodel import db
+
+from apps.groceries.infrastructure.repositories import Neo4jDailyIncomeRepository
+
+# Per grocery: collapse the DailyIncome nodes of each date into one carrying the
+# (grocery, date) key that create() MERGEs on. A keyed node already written for
+# the date (by create() before this ran) holds what was added since and is kept;
+# the legacy un-keyed nodes are folded into it: all of them (sum) or only the most
+# recently updated one (latest, when the duplicates are retries / double submits).
+# Each removed node leaves an IncomeTombstone, so clients of the changes feed
+# (GET .../changes/) drop the duplicate rows they already synced.
+COMPACT = """
+MATCH (g:Grocery {uid:$gid})-[:REPORTS]->(d:DailyIncome)
+WITH g, d ORDER BY d.updated_at DESC
+WITH g, d.date AS date, collect(d) AS nodes
+WITH g, date, nodes,
+     [n IN nodes WHERE n.key = g.uid + ':' + date] AS keyed,
+     [n IN nodes WHERE n.key IS NULL OR n.key <> g.uid + ':' + date] AS legacy
+WITH g, date, nodes, coalesce(head(keyed), head(legacy)) AS keep,
+     reduce(total = 0.0, n IN keyed | total + n.amount) +
+     CASE WHEN $strategy = 'latest' THEN coalesce(head(legacy).amount, 0.0)
+          ELSE reduce(total = 0.0, n IN legacy | total + n.amount) END AS amount
+FOREACH (n IN [x IN nodes WHERE x <> keep] |
+    MERGE (t:IncomeTombstone {uid:n.uid})
+      ON CREATE SET t.grocery = g.uid, t.date = n.date, t.deleted_at = $now
+    DETACH DELETE n)
+SET keep.key = g.uid + ':' + date
+FOREACH (_ IN CASE WHEN size(nodes) > 1 THEN [1] ELSE [] END |
+    SET keep.amount = amount, keep.updated_at = $now)
+RETURN count(date), sum(size(nodes) - 1)
+"""
+
+DUPLICATES = """
+MATCH (g:Grocery {uid:$gid})-[:REPORTS]->(d:DailyIncome)
+WITH d.date AS date, count(d) AS n
+RETURN count(date), sum(n - 1)
+"""
+
+
+class Command(BaseCommand):
+    help = ("Merge duplicate DailyIncome nodes (same grocery and date) and set the (grocery, date) key. "
+            "Run once before relying on the DailyIncome key constraint. Removed nodes are reported "
+            "to offline clients as `deleted_income` uids by the changes feed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grocery", type=str, default=None,
+            help="Only compact this grocery uid (default: all groceries)"
+        )
+        parser.add_argument(
+            "--strategy", choices=["sum", "latest"], default="sum",
+            help="Amount kept for a date: the sum of all its nodes (default, what the summary "
+                 "reported before), or only the most recently updated legacy node's when the "
+                 "duplicates are known to be retries / double submits. Either way, amounts "
+                 "already written to the keyed node are kept."
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report the duplicates")
+
+    def handle(self, *args, **options):
+        if options["grocery"]:
+            uids = [options["grocery"]]
+        else:
+            res, _ = db.cypher_query("MATCH (g:Grocery) RETURN g.uid")
+            uids = [row[0] for row in res]
+
+        repo = Neo4jDailyIncomeRepository()
+        removed_total = 0
+        for uid in uids:
+            # one transaction per grocery
+            if options["dry_run"]:
+                res, _ = db.cypher_query(DUPLICATES, {"gid": uid})
+            else:
+                with db.write_transaction:
+                    res, _ = db.cypher_query(COMPACT, {"gid": uid, "strategy": options["strategy"],
+                                                       "now": time.time()})
+            days, removed = res[0] if res else (0, 0)
+            removed = removed or 0
+            removed_total += removed
+            if removed and not options["dry_run"]:
+                repo.rebuild_rollups(uid)
+            if removed:
+                self.stdout.write(f"{uid}: {days} income days, {removed} duplicates"
+                                  f"{' found' if options['dry_run'] else ' merged'}")
+
+        verb = "Found" if options["dry_run"] else "Merged"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed_total} duplicate income nodes "
+                                             f"across {len(uids)} groceries"))
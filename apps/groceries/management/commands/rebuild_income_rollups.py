@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from neomodel import db
+from apps.groceries.infrastructure.repositories import Neo4jDailyIncomeRepository
+
+class Command(BaseCommand):
+    help = "Recompute monthly/weekly IncomeRollup nodes from existing DailyIncome nodes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grocery", type=str, default=None,
+            help="Only rebuild this grocery uid (default: all groceries)"
+        )
+
+    def handle(self, *args, **options):
+        if options["grocery"]:
+            uids = [options["grocery"]]
+        else:
+            res, _ = db.cypher_query("MATCH (g:Grocery) RETURN g.uid")
+            uids = [row[0] for row in res]
+
+        repo = Neo4jDailyIncomeRepository()
+        for uid in uids:
+            days = repo.rebuild_rollups(uid)
+            self.stdout.write(f"{uid}: {days} income days rolled up")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {len(uids)} groceries"))
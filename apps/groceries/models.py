@@ -1,2 +1,2 @@
 # Re-export your neomodel classes so Django finds them
-from .infrastructure.models import GroceryNode, ItemNode, DailyIncomeNode  # noqa: F401
+from .infrastructure.models import GroceryNode, ItemNode, DailyIncomeNode, IncomeRollupNode  # noqa: F401
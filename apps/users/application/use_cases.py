@@ -2,9 +2,11 @@ from dataclasses import dataclass
 from django.contrib.auth.hashers import make_password
 from apps.users.domain.repositories import UserRepositoryPort
 from apps.users.domain.entities import UserEntity
+from infra.tracing import traced_methods
 from .validators import UserCreateDTO, validate_user_create
 
 
+@traced_methods("use_case")
 @dataclass
 class CreateUser:
     repo: UserRepositoryPort
@@ -20,6 +22,7 @@ class CreateUser:
         )
 
 
+@traced_methods("use_case")
 @dataclass
 class CreateSupplierAndAssign:
     repo: UserRepositoryPort
@@ -34,6 +37,7 @@ class CreateSupplierAndAssign:
         )
 
 
+@traced_methods("use_case")
 @dataclass
 class UpdateUser:
     repo: UserRepositoryPort
@@ -48,6 +52,7 @@ class UpdateUser:
             raise ValueError("Nothing to update")
         return self.repo.update(user_id, **fields)
 
+@traced_methods("use_case")
 @dataclass
 class SoftDeleteUser:
     repo: UserRepositoryPort
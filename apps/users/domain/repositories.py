@@ -9,3 +9,4 @@ class UserRepositoryPort(Protocol):
     def list(self) -> Iterable[UserEntity]: ...
     def update(self, user_id: str, **fields) -> UserEntity: ...
     def soft_delete(self, user_id: str) -> None: ...
+    def list_responsible_grocery_uids(self, user_id: str, *, limit: int | None = None) -> Iterable[str]: ...
@@ -0,0 +1,48 @@
+from typing import Iterable, Optional
+from apps.users.domain.entities import UserEntity
+from apps.users.domain.repositories import UserRepositoryPort
+from infra.cache import entity_cache
+from infra.neo4j.unit_of_work import current_uow, on_commit
+from infra.tracing import traced_methods
+
+# Read-through caching of users by uid (infra.cache). Writes invalidate the
+# uid in every worker once the request transaction commits.
+
+
+@traced_methods("repository")
+class CachedUserRepository(UserRepositoryPort):
+    def __init__(self, inner: UserRepositoryPort):
+        self.inner = inner
+        self.cache = entity_cache("user")
+
+    def create(self, *, name: str, email: str, password_hash: str, role: str) -> UserEntity:
+        return self.inner.create(name=name, email=email, password_hash=password_hash, role=role)
+
+    def create_supplier_and_assign(self, *, name: str, email: str,
+                                   password_hash: str, grocery_uid: str) -> UserEntity:
+        return self.inner.create_supplier_and_assign(name=name, email=email, password_hash=password_hash,
+                                                     grocery_uid=grocery_uid)
+
+    def get_by_id(self, user_id: str) -> Optional[UserEntity]:
+        if current_uow() is not None:
+            # inside a write transaction: read what the transaction sees
+            return self.inner.get_by_id(user_id)
+        return self.cache.get_or_load(user_id, lambda: self.inner.get_by_id(user_id))
+
+    def get_by_email(self, email: str) -> Optional[UserEntity]:
+        return self.inner.get_by_email(email)
+
+    def list(self) -> Iterable[UserEntity]:
+        return self.inner.list()
+
+    def update(self, user_id: str, **fields) -> UserEntity:
+        entity = self.inner.update(user_id, **fields)
+        on_commit(lambda: self.cache.invalidate(user_id))
+        return entity
+
+    def soft_delete(self, user_id: str) -> None:
+        self.inner.soft_delete(user_id)
+        on_commit(lambda: self.cache.invalidate(user_id))
+
+    def list_responsible_grocery_uids(self, user_id: str, *, limit: int | None = None) -> Iterable[str]:
+        return self.inner.list_responsible_grocery_uids(user_id, limit=limit)
@@ -8,6 +8,7 @@ ROLE_CHOICES = {
 }
 
 class UserNode(StructuredNode):
+    __label__ = "User"
     uid = UniqueIdProperty()
     name = StringProperty(required=True)
     email = StringProperty(required=True, unique_index=True, lowercase=True, trim=True)
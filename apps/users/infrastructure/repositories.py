@@ -1,9 +1,13 @@
-from datetime import datetime
+import uuid
+from datetime import datetime, timezone
 from typing import Iterable, Optional
 from .models import UserNode
-from apps.groceries.infrastructure.models import GroceryNode
 from apps.users.domain.entities import UserEntity
 from apps.users.domain.repositories import UserRepositoryPort
+from infra.neo4j.driver import cypher_read, cypher_write
+from infra.neo4j.unit_of_work import identity_get, identity_put
+from infra.tracing import traced_methods
+
 
 def _to_entity(n: UserNode) -> UserEntity:
     return UserEntity(
@@ -12,16 +16,30 @@ def _to_entity(n: UserNode) -> UserEntity:
         created_at=n.created_at, updated_at=n.updated_at
     )
 
+def _now() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
+
+@traced_methods("repository")
 class Neo4jUserRepository(UserRepositoryPort):
     # create supplier + assign (used earlier)
     def create_supplier_and_assign(self, *, name: str, email: str,
                                    password_hash: str, grocery_uid: str) -> UserEntity:
-        g = GroceryNode.nodes.get_or_none(uid=grocery_uid, is_active=True)
-        if not g: raise ValueError("Grocery not found.")
-        u = UserNode(name=name, email=email, password=password_hash, role="SUPPLIER")
-        u.touch(); u.save()
-        u.responsible_for.connect(g)
-        return _to_entity(u)
+        # user and RESPONSIBLE_FOR edge in one statement; no row means no active grocery
+        q = """
+        MATCH (g:Grocery {uid:$gid})
+        WHERE g.is_active = true
+        CREATE (u:User {uid:$uid, name:$name, email:$email, password:$password, role:'SUPPLIER',
+                        is_active:true, created_at:$now, updated_at:$now})-[:RESPONSIBLE_FOR]->(g)
+        RETURN u
+        """
+        res, _ = cypher_write(q, {"gid": grocery_uid, "uid": uuid.uuid4().hex, "name": name,
+                                     "email": email, "password": password_hash,
+                                     "now": _now()})
+        if not res: raise ValueError("Grocery not found.")
+        entity = _to_entity(UserNode.inflate(res[0][0]))
+        identity_put("user", entity.id, entity)
+        return entity
 
 
     def create(self, *, name: str, email: str, password_hash: str, role: str) -> UserEntity:
@@ -31,8 +49,15 @@ class Neo4jUserRepository(UserRepositoryPort):
         return _to_entity(node)
 
     def get_by_id(self, user_id: str) -> Optional[UserEntity]:
+        cached = identity_get("user", user_id)
+        if cached is not None:
+            return cached
         n = UserNode.nodes.get_or_none(uid=user_id)
-        return _to_entity(n) if n else None
+        if not n:
+            return None
+        entity = _to_entity(n)
+        identity_put("user", user_id, entity)
+        return entity
 
     def get_by_email(self, email: str) -> Optional[UserEntity]:
         n = UserNode.nodes.first_or_none(email=email)
@@ -43,15 +68,39 @@ class Neo4jUserRepository(UserRepositoryPort):
             yield _to_entity(n)
 
     def update(self, user_id: str, **fields) -> UserEntity:
-        n = UserNode.nodes.get(uid=user_id)
-        for k, v in fields.items():
-            setattr(n, k, v)
-        n.touch()
-        n.save()
-        return _to_entity(n)
+        props = UserNode.defined_properties(aliases=False, rels=False)
+        for k in fields:
+            if k not in props:
+                raise ValueError(f"Unknown field: {k}")
+        q = """
+        MATCH (u:User {uid:$uid})
+        SET u += $fields, u.updated_at = $now
+        RETURN u
+        """
+        res, _ = cypher_write(q, {"uid": user_id, "now": _now(),
+                                     "fields": {k: props[k].deflate(v) for k, v in fields.items()}})
+        if not res:
+            raise UserNode.DoesNotExist(f"User {user_id} not found")
+        entity = _to_entity(UserNode.inflate(res[0][0]))
+        identity_put("user", user_id, entity)
+        return entity
 
     def soft_delete(self, user_id: str) -> None:
-        n = UserNode.nodes.get(uid=user_id)
-        n.is_active = False
-        n.touch()
-        n.save()
+        q = """
+        MATCH (u:User {uid:$uid})
+        SET u.is_active = false, u.updated_at = $now
+        RETURN u
+        """
+        res, _ = cypher_write(q, {"uid": user_id, "now": _now()})
+        if not res:
+            raise UserNode.DoesNotExist(f"User {user_id} not found")
+        identity_put("user", user_id, _to_entity(UserNode.inflate(res[0][0])))
+
+    def list_responsible_grocery_uids(self, user_id: str, *, limit: int | None = None) -> Iterable[str]:
+        q = """
+        MATCH (:User {uid:$uid})-[:RESPONSIBLE_FOR]->(g:Grocery)
+        WHERE g.is_active = true
+        RETURN g.uid
+        """ + ("LIMIT $limit" if limit is not None else "")
+        res, _ = cypher_read(q, {"uid": user_id, "limit": limit})
+        return [row[0] for row in res]
@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission
+from infra.tracing import traced_methods
 
+@traced_methods("permission")
 class IsAdminRole(BasePermission):
     def has_permission(self, request, view):
         return getattr(request.user, "role", None) == "ADMIN"
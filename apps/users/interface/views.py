@@ -4,26 +4,32 @@ from rest_framework.permissions import IsAuthenticated
 from apps.users.application.use_cases import CreateUser, UpdateUser, SoftDeleteUser, CreateSupplierAndAssign
 from apps.users.application.validators import UserCreateDTO
 from apps.users.infrastructure.repositories import Neo4jUserRepository
+from apps.users.infrastructure.cached_repositories import CachedUserRepository
 from .serializers import UserCreateSerializer, UserOutSerializer, UserUpdateSerializer,SupplierCreateSerializer
 from .permissions import IsAdminRole
 from rest_framework.exceptions import ValidationError
+from apps.users.domain.entities import UserEntity
 from common.api import ok
 from common.exceptions import problem_response
+from common.serialization import dumper
 
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample,OpenApiParameter, OpenApiTypes
 from common.schemas import Envelope, Problem
 
+# output fast path; UserOutSerializer stays the documented schema
+dump_user = dumper(UserEntity)
+
 
 class UserAdminViewSet(mixins.CreateModelMixin,
                        mixins.ListModelMixin,
                        mixins.RetrieveModelMixin,
                        viewsets.GenericViewSet):
     permission_classes = [IsAdminRole]
-    repo = Neo4jUserRepository()
+    repo = CachedUserRepository(Neo4jUserRepository())
 
     def list(self, request):
         items = list(self.repo.list())
-        data = UserOutSerializer(items, many=True).data
+        data = [dump_user(x) for x in items]
         return ok(
             data,
             code="USER_LIST",
@@ -45,7 +51,7 @@ class UserAdminViewSet(mixins.CreateModelMixin,
                 type_slug="not_found"
             )
         return ok(
-            UserOutSerializer(u).data,
+            dump_user(u),
             code="USER_RETRIEVED",
             message="User retrieved.",
             status=status.HTTP_200_OK,
@@ -86,7 +92,7 @@ class UserAdminViewSet(mixins.CreateModelMixin,
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(UserOutSerializer(u).data,
+        return ok(dump_user(u),
                   code="USER_CREATED", message="User created.", status=status.HTTP_201_CREATED, request=request)
 
 
@@ -107,7 +113,7 @@ class UserAdminViewSet(mixins.CreateModelMixin,
         ser.is_valid(raise_exception=True)
         u = UpdateUser(self.repo)(pk, **ser.validated_data)
         return ok(
-            UserOutSerializer(u).data,
+            dump_user(u),
             code="USER_UPDATED",
             message="User updated.",
             status=status.HTTP_200_OK,
@@ -142,7 +148,7 @@ class SupplierAdminViewSet(mixins.CreateModelMixin,
                            mixins.DestroyModelMixin,
                            viewsets.GenericViewSet):
     permission_classes = [IsAuthenticated, IsAdminRole]
-    repo = Neo4jUserRepository()
+    repo = CachedUserRepository(Neo4jUserRepository())
 
     def get_serializer_class(self):
         return SupplierCreateSerializer if self.action == "create" else UserUpdateSerializer
@@ -180,7 +186,7 @@ class SupplierAdminViewSet(mixins.CreateModelMixin,
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(UserOutSerializer(u).data,
+        return ok(dump_user(u),
                   code="SUPPLIER_CREATED", message="Supplier created and assigned.",
                   status=status.HTTP_201_CREATED, request=request)
 
@@ -220,7 +226,7 @@ class SupplierAdminViewSet(mixins.CreateModelMixin,
                 errors={"non_field_errors": [str(e)]},
                 type_slug="validation_failed"
             )
-        return ok(UserOutSerializer(u).data,
+        return ok(dump_user(u),
                   code="SUPPLIER_UPDATED", message="Supplier updated.", request=request)
 
 
@@ -0,0 +1,73 @@
+import re
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from neomodel import db
+
+SCHEMA_FILE = Path(settings.BASE_DIR) / "infra" / "neo4j" / "indexes_constraints.cql"
+
+# CREATE CONSTRAINT <name> ... FOR (n:Label) REQUIRE n.prop IS UNIQUE
+# CREATE INDEX <name> ... FOR (n:Label) ON (n.a, n.b)
+STATEMENT_RE = re.compile(
+    r"CREATE\s+(?P<kind>CONSTRAINT|INDEX)\s+(?P<name>\w+).*?FOR\s*\(\s*\w+\s*:\s*(?P<label>\w+)\s*\)"
+    r"\s*(?:ON|REQUIRE)\s*\(?(?P<props>[\w.,\s]+?)\)?\s*(?:IS\s+UNIQUE)?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def parse_schema(text: str) -> list[dict]:
+    """
+    Statements from the .cql file with their name and (label, properties) signature.
+    """
+    body = "\n".join(line for line in text.splitlines() if not line.strip().startswith("//"))
+    statements = []
+    for raw in body.split(";"):
+        stmt = " ".join(raw.split())
+        if not stmt:
+            continue
+        m = STATEMENT_RE.match(stmt)
+        if not m:
+            raise ValueError(f"Unrecognised schema statement: {stmt}")
+        props = tuple(p.strip().split(".", 1)[-1] for p in m["props"].split(","))
+        statements.append({
+            "kind": m["kind"].upper(),
+            "name": m["name"],
+            "signature": (m["kind"].upper(), m["label"], props),
+            "cypher": stmt,
+        })
+    return statements
+
+
+class Command(BaseCommand):
+    help = "Create the Neo4j indexes/constraints from infra/neo4j/indexes_constraints.cql that are missing"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only print what would be created"
+        )
+
+    def handle(self, *args, **options):
+        wanted = parse_schema(SCHEMA_FILE.read_text(encoding="utf-8"))
+
+        existing_names, existing_signatures = set(), set()
+        for kind, rows in (("INDEX", db.list_indexes(exclude_token_lookup=True)),
+                           ("CONSTRAINT", db.list_constraints())):
+            for row in rows:
+                existing_names.add(row["name"])
+                labels, props = row.get("labelsOrTypes") or [], row.get("properties") or []
+                if len(labels) == 1:
+                    existing_signatures.add((kind, labels[0], tuple(props)))
+
+        missing = [s for s in wanted
+                   if s["name"] not in existing_names and s["signature"] not in existing_signatures]
+        if not missing:
+            self.stdout.write(self.style.SUCCESS(f"Schema up to date ({len(wanted)} definitions)."))
+            return
+
+        for s in missing:
+            self.stdout.write(f" + {s['kind'].lower()} {s['name']}")
+            if not options["dry_run"]:
+                db.cypher_query(s["cypher"])
+        verb = "Would create" if options["dry_run"] else "Created"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(missing)} of {len(wanted)} definitions."))
@@ -0,0 +1,154 @@
+"""
+Async read endpoints for the ASGI deployment.
+
+DRF views are synchronous, so under ASGI each one runs in a worker thread and
+blocks it for the whole Neo4j round trip. `async_read_view` serves the hot
+read path (GET, plain JSON) from a coroutine instead. The request is
+authenticated, throttled and permission-checked the same way DRF does, and
+the response has the same ok()/problem_response() envelopes: every error,
+not only APIException, goes through drf_exception_handler as in DRF's
+handle_exception(). Everything
+else is handed to the original DRF view: writes, streaming, msgpack, the
+browsable API and ?format=.
+
+Only active when settings.ASYNC_READ_VIEWS is on (grocery/asgi.py sets it);
+WSGI deployments get the DRF view back unchanged.
+"""
+from functools import wraps
+from typing import Awaitable, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+from apps.authn.authentication import CustomJWTAuthentication
+from common.exceptions import drf_exception_handler, problem_response
+from common.serialization import dumps
+
+_authenticator = CustomJWTAuthentication()
+
+# Accept values that only the DRF view can answer
+_SYNC_ONLY_MEDIA = ("ndjson", "msgpack", "text/html")
+
+Permission = Callable[..., Awaitable[bool]]
+
+
+def to_http(response) -> HttpResponse:
+    """
+    A DRF Response (ok() / problem_response()) rendered eagerly with orjson, so
+    Django does not hop to a thread to render it.
+    """
+    http = HttpResponse(dumps(response.data) if response.data is not None else b"",
+                        status=response.status_code, content_type="application/json")
+    for key, value in response.items():
+        if key.lower() != "content-type":
+            http[key] = value
+    return http
+
+
+def _handled_async(request) -> bool:
+    if request.method != "GET":
+        return False
+    if request.GET.get("stream") in ("1", "true") or "format" in request.GET:
+        return False
+    accept = request.headers.get("Accept", "")
+    return not any(m in accept for m in _SYNC_ONLY_MEDIA)
+
+
+def _authenticate(request):
+    """
+    CustomJWTAuthentication on the plain HttpRequest; NotAuthenticated when
+    there is no bearer token (what DRF's IsAuthenticated would end up raising).
+    """
+    result = _authenticator.authenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    request.user, request.auth = result
+    return request.user
+
+
+def _throttle(request, view=None) -> None:
+    # `view` (the DRF view class) supplies throttle_scope / read_throttle_scope
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            raise exceptions.Throttled(throttle.wait())
+
+
+# A throttle check is a write to the shared SQLite file (common.throttling),
+# which can wait up to its busy timeout for the write lock: run it in the
+# thread pool, not on the event loop. Not thread-sensitive, so checks don't
+# queue behind the sync views on the one thread those share.
+_athrottle = sync_to_async(_throttle, thread_sensitive=False)
+
+
+def async_read_view(sync_view, *, permission: Optional[Permission] = None):
+    """
+    Decorates `async def handler(request, **kwargs) -> Response` into a view
+    that serves GETs itself and delegates everything else to `sync_view`.
+    `permission(request, **kwargs)` is awaited after authentication.
+    """
+    def decorator(handler):
+        if not getattr(settings, "ASYNC_READ_VIEWS", False):
+            return sync_view
+
+        delegate = sync_to_async(sync_view)
+        view_class = getattr(sync_view, "cls", None)
+
+        # wraps() keeps cls/actions/csrf_exempt, so the schema generator and the
+        # unit-of-work middleware still see the DRF view
+        @wraps(sync_view)
+        async def view(request, *args, **kwargs):
+            if not _handled_async(request):
+                return await delegate(request, *args, **kwargs)
+            try:
+                _authenticate(request)
+                await _athrottle(request, view_class)
+                if permission is not None and not await permission(request, **kwargs):
+                    raise exceptions.PermissionDenied()
+                return to_http(await handler(request, *args, **kwargs))
+            except Exception as exc:
+                return to_http(drf_exception_handler(exc, {"request": request, "view": view_class}))
+        return view
+    return decorator
+
+
+def async_stream_view(*, permission: Optional[Permission] = None):
+    """
+    For endpoints that only exist under ASGI (long-lived streams): the request
+    is authenticated, throttled and permission-checked as in async_read_view,
+    and the handler's HttpResponse is returned as is. Under WSGI, where every
+    open stream would hold a worker thread, the endpoint answers 404.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if not getattr(settings, "ASYNC_READ_VIEWS", False):
+                return to_http(problem_response(
+                    request,
+                    status=404,
+                    title="Not found.",
+                    code="NOT_FOUND",
+                    detail="This endpoint is only served by the ASGI deployment.",
+                    type_slug="not_found"
+                ))
+            if request.method != "GET":
+                return to_http(problem_response(
+                    request,
+                    status=405,
+                    title="Method not allowed.",
+                    code="METHOD_NOT_ALLOWED",
+                    detail=f"Method {request.method} not allowed.",
+                ))
+            try:
+                _authenticate(request)
+                await _athrottle(request)
+                if permission is not None and not await permission(request, **kwargs):
+                    raise exceptions.PermissionDenied()
+                return await handler(request, *args, **kwargs)
+            except Exception as exc:
+                return to_http(drf_exception_handler(exc, {"request": request, "view": handler}))
+        return view
+    return decorator
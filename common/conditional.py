@@ -0,0 +1,151 @@
+"""
+Conditional requests (ETag / Last-Modified) for the grocery read endpoints.
+
+A view decorated with @conditional(validator) first asks `validator(request,
+**view_kwargs)` for a `Validator`: one small aggregate Cypher query
+(max(updated_at) and count for a list, updated_at for a single resource)
+instead of the rows. If-None-Match / If-Modified-Since then answer 304 before
+any row is fetched or serialized, and a failed If-Match answers 412 before a
+write. Otherwise the view runs and its 200 response gets ETag and
+Last-Modified.
+
+Lists get weak ETags (the same rows may be rendered as JSON or MessagePack).
+Single resources get strong ones, because If-Match only matches strong ETags.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Callable, NamedTuple, Optional
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from common.exceptions import problem_response
+
+
+class Validator(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+    # the raw updated_at the ETag was derived from, for a compare-and-set write
+    updated_at: Optional[datetime] = None
+
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=10).hexdigest()
+
+
+def list_validator(request, last_modified: Optional[datetime], count: int) -> Validator:
+    """
+    Weak validator for a list; the query string is part of it, so every page
+    and filter has its own.
+    """
+    stamp = last_modified.timestamp() if last_modified else None
+    return Validator(f'W/"{_digest(stamp, count, request.get_full_path())}"', last_modified)
+
+
+def resource_validator(updated_at: Optional[datetime]) -> Optional[Validator]:
+    """
+    Strong validator for one resource (None when it doesn't exist).
+    """
+    if updated_at is None:
+        return None
+    return Validator(f'"{_digest(updated_at.timestamp())}"', updated_at, updated_at)
+
+
+def _etag_matches(header: str, etag: str, *, weak: bool) -> bool:
+    if header.strip() == "*":
+        return True
+    if weak:
+        opaque = etag.removeprefix("W/")
+        return any(candidate.removeprefix("W/") == opaque for candidate in parse_etags(header))
+    return not etag.startswith("W/") and etag in parse_etags(header)
+
+
+def not_modified(request, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    True when a GET/HEAD can be answered with 304 (If-None-Match takes
+    precedence over If-Modified-Since, as in RFC 9110).
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag, weak=True)
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return (if_modified_since is not None and last_modified is not None
+            and int(last_modified.timestamp()) <= if_modified_since)
+
+
+def not_modified_response(etag: Optional[str], last_modified: Optional[datetime]) -> Response:
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def precondition_failed(request) -> Response:
+    return problem_response(
+        request,
+        status=status.HTTP_412_PRECONDITION_FAILED,
+        title="Precondition failed.",
+        code="PRECONDITION_FAILED",
+        detail="The resource was modified since the ETag in If-Match was issued.",
+        errors={"If-Match": ["Stale or unknown ETag; fetch the resource again."]},
+        type_slug="precondition_failed"
+    )
+
+
+def set_validator_headers(response, etag: Optional[str], last_modified: Optional[datetime]) -> None:
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+
+def _evaluate(request, validator: Optional[Validator]):
+    if validator is None:
+        # nothing to compare against: the view answers (usually 404)
+        return None
+    if_match = request.headers.get("If-Match")
+    if if_match is not None and not _etag_matches(if_match, validator.etag, weak=False):
+        return precondition_failed(request)
+    if not_modified(request, validator.etag, validator.last_modified):
+        return not_modified_response(validator.etag, validator.last_modified)
+    return None
+
+
+def _finish(request, validator: Optional[Validator], response):
+    if validator is not None and request.method in ("GET", "HEAD") and response.status_code == 200:
+        set_validator_headers(response, validator.etag, validator.last_modified)
+    return response
+
+
+def conditional(validator: Callable[..., Optional[Validator]]):
+    """
+    Decorates a ViewSet method (sync validator) or an async read handler
+    (async validator). The validator is exposed to the view as
+    `request.validator`, e.g. for a compare-and-set write after If-Match.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                v = await validator(request, **kwargs)
+                early = _evaluate(request, v)
+                if early is not None:
+                    return early
+                request.validator = v
+                return _finish(request, v, await view(request, *args, **kwargs))
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            v = validator(request, **kwargs)
+            early = _evaluate(request, v)
+            if early is not None:
+                return early
+            request.validator = v
+            return _finish(request, v, view(self, request, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -1,11 +1,12 @@
 import logging
 from rest_framework.views import exception_handler
-from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.exceptions import APIException, Throttled, ValidationError
 from rest_framework import status as http
 from django.http import Http404
 from django.core.exceptions import PermissionDenied
 
-import traceback
+from infra.monitoring import THROTTLE_REJECTIONS
+
 
 logger = logging.getLogger("apps.api")
 
@@ -16,13 +17,14 @@ DEFAULT_TYPES = {
     http.HTTP_403_FORBIDDEN:    "forbidden",
     http.HTTP_404_NOT_FOUND:    "not_found",
     http.HTTP_409_CONFLICT:     "conflict",
+    http.HTTP_412_PRECONDITION_FAILED: "precondition_failed",
     http.HTTP_422_UNPROCESSABLE_ENTITY: "unprocessable_entity",
     http.HTTP_429_TOO_MANY_REQUESTS: "rate_limited",
     http.HTTP_500_INTERNAL_SERVER_ERROR: "server_error",
 }
 
 
-def problem_response(request, *, status, title, code, detail=None, errors=None, type_slug=None):
+def problem_response(request, *, status, title, code, detail=None, errors=None, type_slug=None, meta=None):
     base_url = "https://api.example.com/errors/"
     body = {
         "type": base_url + (type_slug or "server_error"),
@@ -32,22 +34,26 @@ def problem_response(request, *, status, title, code, detail=None, errors=None,
         "detail": detail,
         "instance": request.get_full_path() if request else None,
         "errors": errors or {},
-        "meta": {"trace_id": getattr(request, "trace_id", None)},
+        "meta": {"trace_id": getattr(request, "trace_id", None), **(meta or {})},
     }
     from rest_framework.response import Response
     return Response(body, status=status)
 
-def drf_exception_handler(exc, context):
+def _view_name(context) -> str:
+    # a DRF view instance; the async views (common.async_views) pass the view
+    # class or the handler function instead, or nothing
+    view = context.get("view")
+    if view is None:
+        return "-"
+    return getattr(view, "__name__", None) or type(view).__name__
+
+
+def _problem(exc, context):
     request = context.get("request")
 
-    # Log the exception with trace ID
-    logger.error("-" * 70)
-    logger.error(f"Trace ID: {getattr(request, 'trace_id', 'N/A')}")
-    logger.error(f"Exception: {exc}")
-    logger.error(traceback.format_exc())
-    logger.error("-" * 70)
-    
     # Map common exceptions
+    if isinstance(exc, Throttled):
+        THROTTLE_REJECTIONS.inc(_view_name(context))
     if isinstance(exc, ValidationError):
         return problem_response(request, status=400, title="Validation failed",
                                 code="VALIDATION_FAILED", detail="One or more fields are invalid.",
@@ -69,3 +75,20 @@ def drf_exception_handler(exc, context):
 
     return problem_response(request, status=500, title="Internal Server Error",
                             code="SERVER_ERROR", detail="An unexpected error occurred.")
+
+
+def drf_exception_handler(exc, context):
+    response = _problem(exc, context)
+    request = context.get("request")
+    extra = {"status": response.status_code, "method": getattr(request, "method", None),
+             "path": request.get_full_path() if request else None}
+
+    # One record per exception. Client errors are expected traffic: no
+    # traceback, and the message (the rate-limit key of infra.logging) leaves
+    # out the path so a burst of them is sampled.
+    if response.status_code >= 500:
+        logger.error("%s: %s", type(exc).__name__, exc, exc_info=exc, extra=extra)
+    else:
+        logger.info("%s %s in %s", response.status_code, response.data.get("code"),
+                    _view_name(context), extra={**extra, "detail": str(exc)})
+    return response
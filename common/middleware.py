@@ -1,23 +1,297 @@
+import time
 import uuid
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.urls import Resolver404, resolve
 from common.logging_filters import trace_id_var  # see step 2
+from django.conf import settings
+from infra import monitoring, tracing
+from infra.neo4j import instrumentation
+from infra.neo4j.driver import BOOKMARK_HEADER, begin_causal, encode_bookmarks
+from infra.neo4j.unit_of_work import UnitOfWork
+
+# The middlewares are sync *and* async capable, so under ASGI an async view
+# is reached without a thread hop per middleware.
 
 class CorrelationIdMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # allow client-provided ID, else generate one
-        trace_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        if self._async:
+            return self.__acall__(request)
+        token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            trace_id_var.reset(token)
+        return self._finish(request, response)
+
+    async def __acall__(self, request):
+        token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            trace_id_var.reset(token)
+        return self._finish(request, response)
+
+    def _start(self, request):
+        # allow client-provided ID (or the trace id of a W3C traceparent), else generate one
+        parent = tracing.parse_traceparent(request.headers.get("traceparent"))
+        trace_id = request.headers.get("X-Request-ID") or (parent and parent.trace_id) or uuid.uuid4().hex
         request.trace_id = trace_id
 
         # push into ContextVar so logging can read it
-        token = trace_id_var.set(trace_id)
+        return trace_id_var.set(trace_id)
+
+    @staticmethod
+    def _finish(request, response):
+        response["X-Request-ID"] = request.trace_id
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Request latency per (method, route pattern, status) and in-flight
+    requests (infra.monitoring); also feeds Cypher latencies to the metrics.
+    Listed first so the other middlewares are part of the measured time.
+    """
+    METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+        instrumentation.add_listener(monitoring.observe_query)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        monitoring.IN_FLIGHT.inc()
+        status = 500
         try:
             response = self.get_response(request)
+            status = response.status_code
         finally:
-            trace_id_var.reset(token)
+            self._finish(request, start, status)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        monitoring.IN_FLIGHT.inc()
+        status = 500
+        try:
+            response = await self.get_response(request)
+            status = response.status_code
+        finally:
+            self._finish(request, start, status)
+        return response
+
+    def _finish(self, request, start, status):
+        monitoring.IN_FLIGHT.dec()
+        match = getattr(request, "resolver_match", None)
+        # the route pattern, not the path, keeps the label set bounded
+        route = match.route if match is not None else "<unmatched>"
+        method = request.method if request.method in self.METHODS else "OTHER"
+        monitoring.REQUEST_LATENCY.observe(time.perf_counter() - start, method, route, str(status))
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of a sampled request (infra.tracing), continuing an
+    incoming traceparent; named after the route pattern once it is resolved.
+    Sampled responses carry a `traceresponse` header to find the trace by.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+        instrumentation.add_listener(tracing.observe_query)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        with self._span(request) as span:
+            response = self.get_response(request)
+            return self._finish(request, span, response)
+
+    async def __acall__(self, request):
+        with self._span(request) as span:
+            response = await self.get_response(request)
+            return self._finish(request, span, response)
+
+    @staticmethod
+    def _span(request):
+        return tracing.request_span(
+            request.method, trace_id=getattr(request, "trace_id", None),
+            traceparent=request.headers.get("traceparent"),
+            **{"http.request.method": request.method, "url.path": request.path,
+               "request_id": getattr(request, "trace_id", "-")})
 
-        response["X-Request-ID"] = trace_id
+    @staticmethod
+    def _finish(request, span, response):
+        if span is not None:
+            match = getattr(request, "resolver_match", None)
+            if match is not None:
+                span.name = f"{request.method} {match.route}"
+                span.attributes["http.route"] = match.route
+            span.attributes["http.response.status_code"] = response.status_code
+            if response.status_code >= 500:
+                span.error = str(response.status_code)
+            response["traceresponse"] = tracing.traceresponse(span)
         return response
 
 
+class ServerTimingMiddleware:
+    """
+    Collects the Cypher queries of the request (infra.neo4j.instrumentation)
+    and reports them with the total time in a Server-Timing header:
+    `cypher;dur=12.4;desc="3 queries", app;dur=20.9`. Queries a streamed
+    body runs after the headers went out are not included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        log, token = instrumentation.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.end_request(token)
+        return self._finish(start, log, response)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        log, token = instrumentation.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.end_request(token)
+        return self._finish(start, log, response)
+
+    @staticmethod
+    def _finish(start, log, response):
+        if settings.SERVER_TIMING:
+            elapsed = (time.perf_counter() - start) * 1000
+            response["Server-Timing"] = f"{instrumentation.server_timing(log)}, app;dur={elapsed:.1f}"
+        return response
+
+
+class CausalConsistencyMiddleware:
+    """
+    Read-your-writes across requests: the X-Neo4j-Bookmark a client sends back
+    makes this request's reads wait for its earlier writes (also on a follower),
+    and a request that committed writes returns the new bookmark.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        state = begin_causal(request.headers.get(BOOKMARK_HEADER))
+        return self._finish(state, self.get_response(request))
+
+    async def __acall__(self, request):
+        state = begin_causal(request.headers.get(BOOKMARK_HEADER))
+        return self._finish(state, await self.get_response(request))
+
+    @staticmethod
+    def _finish(state, response):
+        if state.written:
+            response[BOOKMARK_HEADER] = encode_bookmarks(state.bookmarks)
+        return response
+
+
+class UnitOfWorkMiddleware:
+    """
+    Wraps each non-safe request in one Neo4j transaction (infra.neo4j.unit_of_work).
+    Commits when the response is < 400, rolls back otherwise. View actions
+    decorated with @non_atomic manage their own transactions.
+    """
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        uow = self._open(request)
+        response = self.get_response(request)
+        self._close(uow, response)
+        return response
+
+    async def __acall__(self, request):
+        if request.method in self.SAFE_METHODS:
+            return await self.get_response(request)
+        # neomodel's transaction is thread-local: open and close it on the thread
+        # the (sync) view will run on
+        uow = await sync_to_async(self._open)(request)
+        response = await self.get_response(request)
+        await sync_to_async(self._close)(uow, response)
+        return response
+
+    def _open(self, request):
+        if request.method in self.SAFE_METHODS or self._is_non_atomic(request):
+            return None
+        uow = UnitOfWork()
+        uow.__enter__()
+        return uow
+
+    @staticmethod
+    def _close(uow, response) -> None:
+        # the handler has already turned view exceptions into 500 responses
+        if uow is None:
+            return
+        if response.status_code >= 400:
+            uow.set_rollback()
+        uow.__exit__(None, None, None)
+
+    @staticmethod
+    def _is_non_atomic(request) -> bool:
+        try:
+            view_func = resolve(request.path_info).func
+        except Resolver404:
+            return True
+        if getattr(view_func, "neo4j_non_atomic", False):
+            return True
+        # DRF: the ViewSet action this method maps to, or the APIView's handler
+        cls, actions = getattr(view_func, "cls", None), getattr(view_func, "actions", None)
+        method = request.method.lower()
+        name = actions.get(method, "") if actions else method
+        handler = getattr(cls, name, None) if cls else None
+        return bool(getattr(handler, "neo4j_non_atomic", False))
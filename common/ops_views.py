@@ -0,0 +1,93 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+
+from apps.users.interface.permissions import IsAdminRole
+from common.api import ok
+from common.schemas import Envelope, Problem
+from infra import monitoring
+from infra.cache import cache_metrics
+from infra.neo4j.driver import pool_metrics
+
+
+class PoolStatsSerializer(serializers.Serializer):
+    in_use = serializers.IntegerField()
+    idle = serializers.IntegerField()
+    servers = serializers.IntegerField()
+    acquisitions = serializers.IntegerField()
+    acquire_wait_ms_avg = serializers.FloatField()
+    acquire_wait_ms_max = serializers.FloatField()
+
+
+class Neo4jPoolOutSerializer(serializers.Serializer):
+    pid = serializers.IntegerField()
+    max_size = serializers.IntegerField()
+    sync_pool = PoolStatsSerializer(allow_null=True)
+    async_pool = PoolStatsSerializer(allow_null=True)
+
+
+class Neo4jPoolView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    @extend_schema(
+        tags=["Ops"],
+        summary="Neo4j connection pool of the worker serving the request",
+        description="In-use/idle connections and connection acquisition wait times. "
+                    "Counters are per worker process; null for a pool not created yet.",
+        responses={
+            200: OpenApiResponse(Envelope(Neo4jPoolOutSerializer), description="Pool metrics."),
+            401: Problem("unauthorized"),
+            403: Problem("forbidden"),
+        },
+    )
+    def get(self, request):
+        return ok(pool_metrics(), code="NEO4J_POOL", message="Neo4j pool metrics.", request=request)
+
+
+class CacheStatsSerializer(serializers.Serializer):
+    size = serializers.IntegerField()
+    maxsize = serializers.IntegerField()
+    ttl = serializers.FloatField()
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    hit_ratio = serializers.FloatField()
+    evictions = serializers.IntegerField()
+    expirations = serializers.IntegerField()
+    invalidations = serializers.IntegerField()
+
+
+class EntityCacheView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    @extend_schema(
+        tags=["Ops"],
+        summary="Entity cache statistics of the worker serving the request",
+        description="Hit ratio, LRU evictions, TTL expirations and cross-worker invalidations "
+                    "per cache (grocery, user), keyed by cache name.",
+        responses={
+            200: OpenApiResponse(Envelope(serializers.DictField(child=CacheStatsSerializer())),
+                                 description="Cache statistics."),
+            401: Problem("unauthorized"),
+            403: Problem("forbidden"),
+        },
+    )
+    def get(self, request):
+        return ok(cache_metrics(), code="ENTITY_CACHE", message="Entity cache statistics.", request=request)
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. A plain Django view: no DRF authentication,
+    throttling or envelope; guarded by METRICS_TOKEN when one is set.
+    """
+    token = settings.METRICS_TOKEN
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": 'Bearer realm="metrics"'})
+    return HttpResponse(monitoring.render(), content_type=monitoring.CONTENT_TYPE)
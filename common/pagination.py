@@ -0,0 +1,155 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from rest_framework.pagination import BasePagination
+from rest_framework.settings import api_settings
+from django.conf import settings
+
+
+NEXT = "n"
+PREV = "p"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Position in a keyset-ordered list: the sort key + uid of a boundary row,
+    and whether the client is walking forwards (after it) or backwards (before it).
+    """
+    key: Any
+    uid: str
+    direction: str = NEXT
+
+    @property
+    def position(self) -> tuple:
+        return (self.key, self.uid)
+
+
+def encode_cursor(key, uid: str, direction: str = NEXT) -> str:
+    raw = json.dumps([direction, key, uid], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Raises ValueError on anything that isn't a cursor we issued.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        direction, key, uid = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Invalid cursor.") from e
+    if direction not in (NEXT, PREV) or not isinstance(uid, str):
+        raise ValueError("Invalid cursor.")
+    return Cursor(key=key, uid=uid, direction=direction)
+
+
+def _query_params(request):
+    # DRF Request or, from the async views, a plain HttpRequest
+    return getattr(request, "query_params", None) or request.GET
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination over `(sort_key, uid)`.
+
+    The repository does the work: it gets `after=`/`before=` positions and a
+    `limit=` of page_size + 1, and must return rows in ascending key order
+    (reversing itself when walking backwards). The extra row only tells us
+    whether another page exists, so a page costs the same at any depth.
+
+    Usage in a view:
+        page = KeysetPagination(key=lambda e: (e.created_at.timestamp(), e.id))
+        items = page.paginate(request, lambda **kw: list(repo.list_x(..., **kw)))
+        return ok(..., meta=page.get_meta())
+    """
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+
+    def __init__(self, key: Optional[Callable[[Any], tuple]] = None):
+        self.key = key
+        self.next = None
+        self.prev = None
+        self.limit = None
+
+    def get_limit(self, request) -> int:
+        default = api_settings.PAGE_SIZE or 20
+        max_limit = getattr(settings, "MAX_PAGE_SIZE", 200)
+        try:
+            limit = int(_query_params(request).get(self.limit_query_param, default))
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer.")
+        if limit < 1:
+            raise ValueError("limit must be positive.")
+        return min(limit, max_limit)
+
+    def get_cursor(self, request) -> Optional[Cursor]:
+        token = _query_params(request).get(self.cursor_query_param)
+        return decode_cursor(token) if token else None
+
+    def paginate(self, request, fetch: Callable[..., list]) -> list:
+        """
+        Raises ValueError for a malformed cursor/limit (views turn it into a 400).
+        """
+        cursor, kwargs = self._start(request)
+        return self._page(cursor, fetch(**kwargs))
+
+    async def apaginate(self, request, fetch: Callable[..., Awaitable[list]]) -> list:
+        """
+        paginate() for async views: `fetch` is a coroutine function.
+        """
+        cursor, kwargs = self._start(request)
+        return self._page(cursor, await fetch(**kwargs))
+
+    def _start(self, request) -> tuple[Optional[Cursor], dict]:
+        self.limit = limit = self.get_limit(request)
+        cursor = self.get_cursor(request)
+        if cursor is not None and cursor.direction == PREV:
+            return cursor, {"before": cursor.position, "limit": limit + 1}
+        return cursor, {"after": cursor.position if cursor else None, "limit": limit + 1}
+
+    def _page(self, cursor: Optional[Cursor], rows: list) -> list:
+        limit = self.limit
+        if cursor is not None and cursor.direction == PREV:
+            has_more = len(rows) > limit
+            items = rows[-limit:]
+            self.prev = self._encode(items[0], PREV) if has_more and items else None
+            self.next = self._encode(items[-1], NEXT) if items else None
+            return items
+
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        self.next = self._encode(items[-1], NEXT) if has_more and items else None
+        self.prev = self._encode(items[0], PREV) if cursor is not None and items else None
+        return items
+
+    def get_meta(self) -> dict:
+        return {"next": self.next, "prev": self.prev, "limit": self.limit}
+
+    def _encode(self, entity, direction: str) -> str:
+        key, uid = self.key(entity)
+        return encode_cursor(key, uid, direction)
+
+    # ---- drf-spectacular hooks (views return the ok() envelope themselves) ----
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor taken from `meta.next` / `meta.prev` of a previous page.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.limit_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Page size (default PAGE_SIZE, capped at MAX_PAGE_SIZE).",
+                "schema": {"type": "integer"},
+            },
+        ]
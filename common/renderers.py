@@ -0,0 +1,36 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer
+
+from common.serialization import dumps, to_primitive
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Drop-in for DRF's JSONRenderer backed by orjson. Renders the ok() and
+    problem_response() envelopes as they are; entity dataclasses found inside
+    them go through common.serialization's compiled dumpers.
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Same envelopes as MessagePack, for `Accept: application/msgpack` clients.
+    Datetimes are sent as the same ISO strings the JSON responses use.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=to_primitive, datetime=False)
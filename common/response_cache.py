@@ -0,0 +1,226 @@
+"""
+Opt-in full-response cache for hot GET endpoints.
+
+    @cache_response(tags=lambda request, grocery_uid=None, **kw: [f"grocery:{grocery_uid}"])
+    def list(self, request, grocery_uid=None): ...
+
+A 200 envelope is stored under (path, sorted query string, role) together with
+the versions of its tags. Repository writes bump those versions once they
+commit (infra.cache.invalidate_tags), which purges every entry carrying the tag
+in every worker. A hit is answered before the view body runs, so no Cypher,
+mapping or serialization happens; it is only re-rendered for the client's
+media type with the current request's meta (trace id). The ETag and
+Last-Modified a @conditional view (common.conditional) set are stored with the
+entry, so a hit also answers If-None-Match / If-Modified-Since with 304.
+
+The decorator sits inside the view, so authentication, throttling and
+permission checks still run on a hit. The role in the key keeps admin and
+supplier responses apart.
+
+Backends (RESPONSE_CACHE_BACKEND): LocMemResponseBackend (per worker) and
+SQLiteResponseBackend (one file shared by the host's workers). Empty disables.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from inspect import iscoroutinefunction
+from typing import Callable, Iterable, Optional
+
+import orjson
+from django.conf import settings
+from django.utils.http import parse_http_date_safe
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+
+from common.conditional import not_modified, not_modified_response, set_validator_headers
+from common.serialization import dumps
+from infra.cache import invalidate_tags, tag_versions
+from infra.sqlite import LocalConnection
+
+
+class LocMemResponseBackend:
+    """
+    Per-process LRU of key -> (entry, tag versions, expires_at); an entry is
+    {"body": envelope, "etag": ..., "last_modified": epoch seconds}.
+    """
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[dict, tuple, float]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[tuple[dict, tuple]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key: str, entry: dict, versions: tuple, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (entry, versions, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteResponseBackend:
+    """
+    Entries in the shared SQLite file (INFRA_SQLITE_PATH), so a response cached
+    by one worker is served by all of them.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS response_cache (
+        key TEXT PRIMARY KEY,
+        payload BLOB NOT NULL,
+        versions TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, max_entries: int = 1000, path: str | None = None):
+        self.max_entries = max_entries
+        self._db = LocalConnection(path, self.SCHEMA)
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[tuple[dict, tuple]]:
+        row = self._db.get().execute(
+            "SELECT payload, versions FROM response_cache WHERE key = ? AND expires_at >= ?",
+            (key, time.time())).fetchone()
+        if row is None:
+            return None
+        return orjson.loads(row[0]), tuple(orjson.loads(row[1]))
+
+    def set(self, key: str, entry: dict, versions: tuple, ttl: float) -> None:
+        now = time.time()
+        conn = self._db.get()
+        conn.execute("INSERT OR REPLACE INTO response_cache (key, payload, versions, expires_at) "
+                     "VALUES (?, ?, ?, ?)", (key, dumps(entry), orjson.dumps(versions), now + ttl))
+        self._writes += 1
+        if self._writes % 100 == 0:
+            conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,))
+            conn.execute("DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache "
+                         "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def delete(self, key: str) -> None:
+        self._db.get().execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+
+@lru_cache(maxsize=None)
+def _backend():
+    path = settings.RESPONSE_CACHE_BACKEND
+    return import_string(path)(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES) if path else None
+
+
+def _cache_key(request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.GET.items()))
+    role = getattr(request.user, "role", None) or "-"
+    return f"{request.path}?{query}|{role}"
+
+
+def _cacheable(request) -> bool:
+    # streamed responses are never cached
+    if request.method != "GET" or request.GET.get("stream") in ("1", "true"):
+        return False
+    return "ndjson" not in request.headers.get("Accept", "")
+
+
+def _lookup(backend, key: str, tags: tuple) -> Optional[dict]:
+    hit = backend.get(key)
+    if hit is None:
+        return None
+    entry, versions = hit
+    if versions != tag_versions(tags):
+        backend.delete(key)
+        return None
+    return entry
+
+
+def _hit_response(request, entry: dict) -> Response:
+    etag = entry.get("etag")
+    stamp = entry.get("last_modified")
+    last_modified = datetime.fromtimestamp(stamp, timezone.utc) if stamp is not None else None
+    if not_modified(request, etag, last_modified):
+        response = not_modified_response(etag, last_modified)
+    else:
+        body = entry["body"]
+        meta = {**body.get("meta", {}),
+                "version": getattr(request, "version", "1"),
+                "trace_id": getattr(request, "trace_id", None)}
+        response = Response({**body, "meta": meta})
+        set_validator_headers(response, etag, last_modified)
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def _store(backend, key: str, versions: tuple, response, ttl: float) -> None:
+    if response.status_code == 200 and isinstance(getattr(response, "data", None), dict):
+        last_modified = parse_http_date_safe(response.get("Last-Modified", ""))
+        entry = {"body": response.data, "etag": response.get("ETag"), "last_modified": last_modified}
+        backend.set(key, entry, versions, ttl)
+        response["X-Cache"] = "MISS"
+
+
+def cache_response(*, tags: Callable[..., Iterable[str]], ttl: float | None = None):
+    """
+    Caches a GET view's ok() envelope. `tags(request, **view_kwargs)` names the
+    tags the response depends on; works on ViewSet methods and on the async
+    handlers of common.async_views.
+    """
+    def decorator(view):
+        def prepare(request, kwargs):
+            backend = _backend()
+            if backend is None or not _cacheable(request):
+                return None
+            tag_list = tuple(tags(request, **kwargs))
+            # versions are read before the view runs: a write racing with it
+            # leaves the entry already stale
+            return backend, _cache_key(request), tag_list, tag_versions(tag_list)
+
+        lifetime = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                ctx = prepare(request, kwargs)
+                if ctx is None:
+                    return await view(request, *args, **kwargs)
+                backend, key, tag_list, versions = ctx
+                entry = _lookup(backend, key, tag_list)
+                if entry is not None:
+                    return _hit_response(request, entry)
+                response = await view(request, *args, **kwargs)
+                _store(backend, key, versions, response, lifetime)
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            ctx = prepare(request, kwargs)
+            if ctx is None:
+                return view(self, request, *args, **kwargs)
+            backend, key, tag_list, versions = ctx
+            entry = _lookup(backend, key, tag_list)
+            if entry is not None:
+                return _hit_response(request, entry)
+            response = view(self, request, *args, **kwargs)
+            _store(backend, key, versions, response, lifetime)
+            return response
+        return wrapper
+    return decorator
+
+
+def purge(*tags: str) -> None:
+    """
+    Drops every cached response tagged with one of `tags`, in all workers.
+    """
+    invalidate_tags(*tags)
@@ -0,0 +1,95 @@
+"""
+Output-only fast paths for entity responses.
+
+`dumper(EntityCls)` generates (once per class) a plain function turning an
+entity dataclass into the dict its `*OutSerializer` would produce, without
+DRF's per-field introspection. `dumps()` encodes envelopes with orjson.
+"""
+import dataclasses
+import datetime as dt
+import decimal
+import types
+import typing
+import uuid
+import zoneinfo
+from functools import lru_cache
+from typing import Any, Callable, Iterable
+
+import orjson
+from django.conf import settings
+from django.utils.functional import Promise
+
+_TZ = zoneinfo.ZoneInfo(settings.TIME_ZONE) if settings.USE_TZ else None
+
+
+def format_datetime(value: dt.datetime | None) -> str | None:
+    # same output as DRF's DateTimeField: converted to TIME_ZONE, "+00:00" as "Z"
+    if value is None:
+        return None
+    if _TZ is not None and value.tzinfo is not None:
+        value = value.astimezone(_TZ)
+    out = value.isoformat()
+    return out[:-6] + "Z" if out.endswith("+00:00") else out
+
+
+def format_date(value: dt.date | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _converter(annotation) -> str | None:
+    """
+    Name of the formatter for a field type, or None to pass the value through.
+    """
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        annotation = args[0] if len(args) == 1 else annotation
+    if annotation is dt.datetime:
+        return "_dt"
+    if annotation is dt.date:
+        return "_date"
+    return None
+
+
+@lru_cache(maxsize=None)
+def dumper(cls) -> Callable[[Any], dict]:
+    """
+    Compiled `entity -> dict` for a dataclass, e.g. dumper(ItemEntity)(item).
+    """
+    hints = typing.get_type_hints(cls)
+    items = []
+    for f in dataclasses.fields(cls):
+        conv = _converter(hints[f.name])
+        items.append(f"{f.name!r}: {conv}(o.{f.name})" if conv else f"{f.name!r}: o.{f.name}")
+    src = f"def dump(o):\n    return {{{', '.join(items)}}}\n"
+    namespace = {"_dt": format_datetime, "_date": format_date}
+    exec(compile(src, f"<dumper {cls.__qualname__}>", "exec"), namespace)
+    return namespace["dump"]
+
+
+def dump_many(cls, objs: Iterable) -> list[dict]:
+    fn = dumper(cls)
+    return [fn(o) for o in objs]
+
+
+def to_primitive(obj):
+    # orjson/msgpack fallback: whatever DRF's JSONEncoder would also have handled
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dumper(type(obj))(obj)
+    if isinstance(obj, dt.datetime):
+        return format_datetime(obj)
+    if isinstance(obj, (dt.date, dt.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (uuid.UUID, Promise)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)) or hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=to_primitive, option=_ORJSON_OPTIONS)
@@ -0,0 +1,46 @@
+"""
+Server-Sent Events responses over a subscription of infra.events.
+
+Each event is written as `id:` / `event:` / `data:` (JSON) lines. When the
+subscriber's buffer overflowed, a `dropped` event with the number of lost
+events comes first, so the client knows to catch up through the changes
+feed. Idle streams get a comment line every EVENTS_KEEPALIVE seconds, which
+keeps proxies from closing them and lets the server notice dead clients.
+"""
+from typing import AsyncIterator, Callable
+
+import orjson
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from infra.events import Subscription
+
+
+def encode(event: str, data, id: str | None = None) -> bytes:
+    head = f"id: {id}\n" if id else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+async def _stream(subscribe: Callable[[], Subscription]) -> AsyncIterator[bytes]:
+    # subscribed on the first iteration, i.e. on the loop serving the response;
+    # the ASGI handler cancels the iteration when the client disconnects
+    sub = subscribe()
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            events, dropped = await sub.next_batch(settings.EVENTS_KEEPALIVE)
+            if dropped:
+                yield encode("dropped", {"count": dropped})
+            for e in events:
+                yield encode(e.type, e.data, e.id)
+            if not events and not dropped:
+                yield b": keep-alive\n\n"
+    finally:
+        sub.close()
+
+
+def sse_response(subscribe: Callable[[], Subscription]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(_stream(subscribe), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"    # nginx: don't buffer the stream
+    return response
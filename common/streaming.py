@@ -0,0 +1,102 @@
+import logging
+from typing import Callable, Iterable
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from common.serialization import dumps
+
+logger = logging.getLogger("apps.api")
+
+NDJSON = "application/x-ndjson"
+
+# rows are grouped into chunks so the server doesn't do one write() per row
+CHUNK_ROWS = 200
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Lets `Accept: application/x-ndjson` pass content negotiation. Streamed
+    responses bypass it; anything else (errors, 304s) is rendered as one line.
+    """
+    media_type = NDJSON
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data) + b"\n"
+
+
+def wants_stream(request) -> str | None:
+    """
+    "ndjson" for `Accept: application/x-ndjson`, "json" for `?stream=1`, else None.
+    """
+    accepted = getattr(request, "accepted_media_type", "") or request.headers.get("Accept", "")
+    if NDJSON in accepted:
+        return "ndjson"
+    if request.query_params.get("stream") in ("1", "true"):
+        return "json"
+    return None
+
+
+def _dumps(obj) -> str:
+    return dumps(obj).decode("utf-8")
+
+
+def stream_ok(rows: Iterable, *, to_dict: Callable, code="OK", message="OK", request=None,
+              mode="json", meta=None) -> StreamingHttpResponse:
+    """
+    Streaming counterpart of common.api.ok(): rows are serialized and written
+    as they come off the Neo4j cursor instead of being collected first.
+
+    json   -> {"code":..,"message":..,"data":[ ... ],"success":true,"meta":{..,"count":n}}
+              (`success` is written last so a failure mid-stream can still be reported)
+    ndjson -> header line {"code","message","meta"}, one line per row,
+              trailer line {"success":..,"count":n}
+    """
+    envelope_meta = {
+        "version": getattr(request, "version", "1"),
+        "trace_id": getattr(request, "trace_id", None),
+    }
+    if meta:
+        envelope_meta |= meta
+
+    def _json():
+        yield '{"code":%s,"message":%s,"data":[' % (_dumps(code), _dumps(message))
+        count, success, buf = 0, True, []
+        try:
+            for row in rows:
+                buf.append(_dumps(to_dict(row)))
+                count += 1
+                if len(buf) >= CHUNK_ROWS:
+                    yield ("," if count > len(buf) else "") + ",".join(buf)
+                    buf = []
+        except Exception:
+            logger.exception("Stream aborted after %s rows (trace_id=%s)", count, envelope_meta["trace_id"])
+            success = False
+        if buf:
+            yield ("," if count > len(buf) else "") + ",".join(buf)
+        yield '],"success":%s,"meta":%s}' % (_dumps(success), _dumps(envelope_meta | {"count": count}))
+
+    def _ndjson():
+        yield _dumps({"code": code, "message": message, "meta": envelope_meta}) + "\n"
+        count, success, buf = 0, True, []
+        try:
+            for row in rows:
+                buf.append(_dumps(to_dict(row)) + "\n")
+                count += 1
+                if len(buf) >= CHUNK_ROWS:
+                    yield "".join(buf)
+                    buf = []
+        except Exception:
+            logger.exception("Stream aborted after %s rows (trace_id=%s)", count, envelope_meta["trace_id"])
+            success = False
+        if buf:
+            yield "".join(buf)
+        yield _dumps({"success": success, "count": count}) + "\n"
+
+    if mode == "ndjson":
+        return StreamingHttpResponse(_ndjson(), content_type=NDJSON)
+    return StreamingHttpResponse(_json(), content_type="application/json")
@@ -0,0 +1,31 @@
+from django.http import JsonResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import path
+
+from infra.neo4j import instrumentation
+from infra.neo4j.instrumentation import QueryBudgetExceeded, assert_max_queries
+
+
+def n_plus_one(request, n):
+    # stands in for a view whose repository issues one Cypher query per row
+    for _ in range(n):
+        instrumentation.record("MATCH (i:Item {uid:$uid}) RETURN i", 0.001, 1)
+    return JsonResponse({"queries": n})
+
+
+urlpatterns = [path("queries/<int:n>/", n_plus_one)]
+
+
+@override_settings(ROOT_URLCONF=__name__, ALLOWED_HOSTS=["*"])
+class QueryBudgetTests(SimpleTestCase):
+    def test_request_over_budget_fails(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_max_queries(3):
+                self.client.get("/queries/50/")
+
+    def test_request_within_budget_passes(self):
+        with assert_max_queries(3) as log:
+            response = self.client.get("/queries/3/")
+        self.assertEqual(log.count, 3)
+        # the request's own log still feeds Server-Timing
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
@@ -0,0 +1,163 @@
+"""
+DRF throttles whose state is shared by all worker processes of a host.
+
+DRF's own throttles keep a timestamp list per client in the Django cache,
+which here is a per-process LocMemCache: every worker enforced its own quota.
+These keep one row per client and scope in the shared SQLite file
+(INFRA_SQLITE_PATH, WAL) and use GCRA, the generic cell rate algorithm: the
+only state is the "theoretical arrival time" (TAT) of the next request, and
+a check is a single atomic UPSERT ... RETURNING.
+
+For a rate of N requests per P seconds, requests are spaced I = P/N apart
+and a client may run up to N ahead (a burst of N, like DRF's sliding
+window). A request is allowed when max(TAT, now) + I - now <= P, and then
+moves TAT to max(TAT, now) + I.
+
+Scopes (REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]):
+  user / anon         every request, by user id / client IP
+  throttle_scope      a view attribute: an extra limit on top of user/anon
+                      (e.g. "login" on LoginView)
+  read_throttle_scope a view attribute: GET/HEAD requests are limited by
+                      this scope instead of user/anon (e.g. "item_read",
+                      so item reads get a looser budget than everything else)
+
+If the SQLite file is unavailable (locked past its timeout), requests are let
+through and a warning is logged: throttling is not worth an outage.
+"""
+import logging
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Optional
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+from infra.sqlite import LocalConnection
+
+logger = logging.getLogger(__name__)
+
+# an insert starts a fresh client one interval in; an update only happens
+# (and RETURNING only yields a row) when the request is allowed
+GCRA_HIT = """
+INSERT INTO throttle (key, tat) VALUES (:key, :now + :interval)
+ON CONFLICT (key) DO UPDATE SET tat = max(tat, :now) + :interval
+WHERE max(tat, :now) + :interval - :now <= :period
+RETURNING tat
+"""
+
+
+class GCRAStore:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS throttle (
+        key TEXT PRIMARY KEY,
+        tat REAL NOT NULL
+    ) WITHOUT ROWID;
+    """
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str | None = None):
+        self._db = LocalConnection(path, self.SCHEMA)
+        self._hits = 0
+
+    def hit(self, key: str, limit: int, period: float) -> tuple[bool, float]:
+        """
+        Counts one request against `limit` per `period` seconds: (allowed,
+        seconds until the next request would be allowed).
+        """
+        now = time.time()
+        interval = period / limit
+        conn = self._db.get()
+        row = conn.execute(GCRA_HIT, {"key": key, "now": now, "interval": interval,
+                                      "period": period}).fetchone()
+        self._hits += 1
+        if self._hits % self.PURGE_EVERY == 0:
+            # a TAT in the past is the same as no row
+            conn.execute("DELETE FROM throttle WHERE tat < ?", (now,))
+        if row is not None:
+            return True, 0.0
+        row = conn.execute("SELECT tat FROM throttle WHERE key = ?", (key,)).fetchone()
+        return False, max(0.0, row[0] + interval - period - now) if row else 0.0
+
+    def reset(self, key: Optional[str] = None) -> None:
+        conn = self._db.get()
+        if key is None:
+            conn.execute("DELETE FROM throttle")
+        else:
+            conn.execute("DELETE FROM throttle WHERE key = ?", (key,))
+
+
+@lru_cache(maxsize=None)
+def store() -> GCRAStore:
+    return GCRAStore()
+
+
+class GCRARateThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle (rates, scopes, cache keys) with the check done by
+    the shared GCRA store instead of the Django cache.
+    """
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        try:
+            allowed, self._wait = store().hit(self.key, self.num_requests, self.duration)
+        except sqlite3.Error as e:
+            logger.warning("throttle store unavailable, request let through: %s", e)
+            return True
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+def _read_scope(request, view) -> Optional[str]:
+    if request.method in SAFE_METHODS:
+        return getattr(view, "read_throttle_scope", None)
+    return None
+
+
+class UserRateThrottle(GCRARateThrottle):
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated or _read_scope(request, view):
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+
+class AnonRateThrottle(GCRARateThrottle):
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if (request.user and request.user.is_authenticated) or _read_scope(request, view):
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class ScopedRateThrottle(GCRARateThrottle):
+    """
+    The view's read_throttle_scope (GET/HEAD) or throttle_scope, per user
+    (or client IP when anonymous).
+    """
+    def __init__(self):
+        # the rate depends on the view: resolved in allow_request
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = _read_scope(request, view) or getattr(view, "throttle_scope", None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -29,14 +29,21 @@ echo "Ensuring SQLite database directory exists at $SQLITE_DIR..."
 # Create the directory if it doesn't exist (permissions already set in Dockerfile)
 mkdir -p "$SQLITE_DIR"
 
+# Per-worker metric files (infra.monitoring) must not outlive the workers that wrote
+# them: left over, the counters of every previous run are added to /metrics again.
+METRICS_DIR="${METRICS_DIR:-$SQLITE_DIR/metrics}"
+echo "Clearing metrics directory $METRICS_DIR..."
+mkdir -p "$METRICS_DIR"
+rm -rf "${METRICS_DIR:?}"/*
+
 
 
 echo "Running Django migrations..."
 python manage.py migrate --noinput
 
-echo "Installing Neomodel labels..."
-# Provided by django_neomodel
-python manage.py install_labels
+echo "Installing Neo4j indexes & constraints..."
+# Diffs infra/neo4j/indexes_constraints.cql against SHOW INDEXES; no-op when up to date
+python manage.py install_schema
 
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
@@ -44,5 +51,10 @@ python manage.py collectstatic --noinput
 echo "Creating superadmin user..."
 python manage.py create_superadmin --email admin@example.com --password "StrongP@ss!" || echo "Superadmin might already exist"
 
+if [ "${SERVER:-runserver}" = "asgi" ]; then
+  echo "Starting uvicorn (ASGI, async read views)..."
+  exec uvicorn grocery.asgi:application --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-1}"
+fi
+
 echo "Starting Django development server..."
 exec python manage.py runserver 0.0.0.0:8000
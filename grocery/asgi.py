@@ -12,5 +12,17 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'grocery.settings')
+# ASGI deployments serve the read endpoints from the async views (see common.async_views)
+os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
 
 application = get_asgi_application()
+
+# open this worker's Neo4j connections before the first request
+from infra.neo4j.driver import warm_up  # noqa: E402
+
+warm_up()
+
+# replay sales events spooled by workers that died, and start flushing
+from apps.groceries.infrastructure.sales_ingest import sales_ingestor  # noqa: E402
+
+sales_ingestor()
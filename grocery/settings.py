@@ -15,6 +15,8 @@ DEBUG = config('DEBUG', default=False, cast=bool)
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
 
 SQLITE_PATH = config("SQLITE_PATH", "/data/sqlite/db.sqlite3")
+# SQLite file the worker processes of a host share state through (infra.sqlite)
+INFRA_SQLITE_PATH = config("INFRA_SQLITE_PATH", default=str(Path(SQLITE_PATH).with_name("infra.sqlite3")))
 
 
 INSTALLED_APPS = [
@@ -32,6 +34,7 @@ INSTALLED_APPS = [
 
     # Neo4j
     'django_neomodel' ,
+    'infra.neo4j.apps.Neo4jDriverConfig',
 
     # API Development
     "rest_framework",
@@ -70,10 +73,15 @@ TEMPLATES = [
 
 
 MIDDLEWARE = [
+    'common.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'common.middleware.CorrelationIdMiddleware',
+    'common.middleware.TracingMiddleware',
+    'common.middleware.ServerTimingMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'common.middleware.CausalConsistencyMiddleware',
+    'common.middleware.UnitOfWorkMiddleware',
 ]
 
 ROOT_URLCONF = 'grocery.urls'
@@ -100,6 +108,14 @@ NEOMODEL_SIGNALS = config('NEOMODEL_SIGNALS', default=True, cast=bool)
 NEOMODEL_FORCE_TIMEZONE = config('NEOMODEL_FORCE_TIMEZONE', default=True, cast=bool)
 NEOMODEL_MAX_CONNECTION_POOL_SIZE = config('NEOMODEL_MAX_CONNECTION_POOL_SIZE', default=30, cast=int)
 NEOMODEL_DATABASE = config("NEOMODEL_DATABASE", default="neo4j")
+# Pool managed by infra.neo4j.driver (one per worker process). Use a neo4j:// URL
+# on a cluster so READ transactions are routed to followers.
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = config("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", default=60.0, cast=float)
+NEO4J_WARM_UP_CONNECTIONS = config("NEO4J_WARM_UP_CONNECTIONS", default=4, cast=int)
+# Every query is timed (infra.neo4j.instrumentation); slower ones are logged to
+# apps.neo4j.slow. SERVER_TIMING adds the per-request totals to the responses.
+NEO4J_SLOW_QUERY_MS = config("NEO4J_SLOW_QUERY_MS", default=200.0, cast=float)
+SERVER_TIMING = config("SERVER_TIMING", default=True, cast=bool)
 
 
 
@@ -161,20 +177,99 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "common.renderers.ORJSONRenderer",
+        "common.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "common.pagination.KeysetPagination",
     "PAGE_SIZE": 20,
+    # shared by all workers of a host (INFRA_SQLITE_PATH), see common.throttling
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
+        "common.throttling.UserRateThrottle",
+        "common.throttling.AnonRateThrottle",
+        "common.throttling.ScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
-        "user": "1000/day",  # 1000 requests per day
-        "anon": "100/day",  # 100 requests per day
+        "user": config("THROTTLE_RATE_USER", default="1000/day"),
+        "anon": config("THROTTLE_RATE_ANON", default="100/day"),
+        # LoginView, on top of user/anon: password guessing per client IP
+        "login": config("THROTTLE_RATE_LOGIN", default="5/min"),
+        # item list reads (GET), instead of user/anon
+        "item_read": config("THROTTLE_RATE_ITEM_READ", default="10000/day"),
     },
     "EXCEPTION_HANDLER": "common.exceptions.drf_exception_handler",
     
 }
 
+# Upper bound for ?limit= on cursor-paginated list endpoints
+MAX_PAGE_SIZE = config("MAX_PAGE_SIZE", default=200, cast=int)
+
+# Bulk item import: rows per UNWIND transaction, and max rows per request
+ITEM_BULK_BATCH_SIZE = config("ITEM_BULK_BATCH_SIZE", default=1000, cast=int)
+ITEM_BULK_MAX_ROWS = config("ITEM_BULK_MAX_ROWS", default=50000, cast=int)
+# Bulk income writes: max days per request (one transaction)
+INCOME_BULK_MAX_ROWS = config("INCOME_BULK_MAX_ROWS", default=3660, cast=int)
+
+# Point-of-sale ingestion (apps.groceries.infrastructure.sales_ingest): events buffered per
+# worker before requests get 429, events that trigger a flush, seconds between flushes,
+# the spool directory and whether every accepted request is fsynced to it
+SALES_BUFFER_SIZE = config("SALES_BUFFER_SIZE", default=50000, cast=int)
+SALES_FLUSH_SIZE = config("SALES_FLUSH_SIZE", default=5000, cast=int)
+SALES_FLUSH_INTERVAL = config("SALES_FLUSH_INTERVAL", default=1.0, cast=float)
+SALES_SPOOL_DIR = config("SALES_SPOOL_DIR", default=str(Path(SQLITE_PATH).with_name("sales-spool")))
+SALES_SPOOL_FSYNC = config("SALES_SPOOL_FSYNC", default=True, cast=bool)
+SALES_MAX_EVENTS = config("SALES_MAX_EVENTS", default=10000, cast=int)
+
+# Changes feed (/groceries/{uid}/changes/): rows stamped within the last N seconds
+# are held back, so a write whose transaction commits after a poll isn't skipped
+CHANGES_SETTLE_SECONDS = config("CHANGES_SETTLE_SECONDS", default=5.0, cast=float)
+
+# Serve GET on the grocery/item/income read endpoints from async views on the
+# async Neo4j driver. grocery/asgi.py turns this on; WSGI keeps the DRF views.
+ASYNC_READ_VIEWS = config("ASYNC_READ_VIEWS", default=False, cast=bool)
+
+# Per-worker grocery/user cache (infra.cache): max entries per cache (0 disables),
+# seconds an entry lives, and how often (seconds) a worker checks the shared
+# version table for writes made by other workers (0 = on every lookup)
+ENTITY_CACHE_SIZE = config("ENTITY_CACHE_SIZE", default=10000, cast=int)
+ENTITY_CACHE_TTL = config("ENTITY_CACHE_TTL", default=60.0, cast=float)
+ENTITY_CACHE_SYNC_INTERVAL = config("ENTITY_CACHE_SYNC_INTERVAL", default=0.0, cast=float)
+
+# Cached GET responses (common.response_cache): backend class path (empty disables),
+# seconds an entry is served at most, max entries
+RESPONSE_CACHE_BACKEND = config("RESPONSE_CACHE_BACKEND", default="common.response_cache.LocMemResponseBackend")
+RESPONSE_CACHE_TTL = config("RESPONSE_CACHE_TTL", default=30.0, cast=float)
+RESPONSE_CACHE_MAX_ENTRIES = config("RESPONSE_CACHE_MAX_ENTRIES", default=1000, cast=int)
+
+# Live change streams (infra.events, GET /groceries/{uid}/events under ASGI): how events
+# reach the other workers, buffered events per client (oldest dropped beyond), seconds
+# between keep-alive comments, and the socket directory / poll interval of the transports
+EVENTS_TRANSPORT = config("EVENTS_TRANSPORT", default="infra.events.UnixSocketTransport")
+EVENTS_BUFFER_SIZE = config("EVENTS_BUFFER_SIZE", default=100, cast=int)
+EVENTS_KEEPALIVE = config("EVENTS_KEEPALIVE", default=15.0, cast=float)
+EVENTS_SOCKET_DIR = config("EVENTS_SOCKET_DIR", default=str(Path(SQLITE_PATH).with_name("events")))
+EVENTS_POLL_INTERVAL = config("EVENTS_POLL_INTERVAL", default=0.5, cast=float)
+
+# Prometheus metrics (infra.monitoring, served on /metrics): one memory-mapped
+# file per worker in METRICS_DIR, summed at scrape time. Empty METRICS_TOKEN
+# leaves /metrics open (restrict it at the proxy); otherwise scrapers send
+# "Authorization: Bearer <token>".
+METRICS_DIR = config("METRICS_DIR", default=str(Path(SQLITE_PATH).with_name("metrics")))
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+METRICS_POOL_INTERVAL = config("METRICS_POOL_INTERVAL", default=5.0, cast=float)
+
+# Request tracing (infra.tracing): exporter class path (empty disables), share of
+# requests traced when no traceparent decides, and where spans go. Each worker
+# queues at most TRACING_QUEUE_SIZE spans and exports every TRACING_EXPORT_INTERVAL seconds.
+TRACING_EXPORTER = config("TRACING_EXPORTER", default="")
+TRACING_SAMPLE_RATE = config("TRACING_SAMPLE_RATE", default=0.01, cast=float)
+TRACING_SERVICE_NAME = config("TRACING_SERVICE_NAME", default="grocery-api")
+TRACING_FILE = config("TRACING_FILE", default=str(Path(SQLITE_PATH).with_name("traces.jsonl")))
+TRACING_OTLP_ENDPOINT = config("TRACING_OTLP_ENDPOINT", default="http://127.0.0.1:4318/v1/traces")
+TRACING_QUEUE_SIZE = config("TRACING_QUEUE_SIZE", default=4096, cast=int)
+TRACING_EXPORT_INTERVAL = config("TRACING_EXPORT_INTERVAL", default=2.0, cast=float)
+
 
 # JWT config 
 JWT_SECRET = SECRET_KEY
@@ -183,6 +278,13 @@ JWT_ISSUER = "grocery"
 JWT_AUDIENCE = "grocery.api"
 JWT_ACCESS_MINUTES = int(config("JWT_ACCESS_MINUTES", default="30"))
 JWT_REFRESH_DAYS = int(config("JWT_REFRESH_DAYS", default="7"))
+# Supplier access tokens carry hashed grocery scopes so writes can be authorized
+# without Neo4j; they get a shorter life to bound how stale those scopes can be.
+JWT_SCOPED_ACCESS_MINUTES = int(config("JWT_SCOPED_ACCESS_MINUTES", default="5"))
+# Above this many groceries the claim is left out and permissions fall back to the graph
+JWT_SCOPE_MAX_GROCERIES = int(config("JWT_SCOPE_MAX_GROCERIES", default="64"))
+# Per-process LRU of verified access-token claims (0 turns it off)
+JWT_DECODE_CACHE_SIZE = int(config("JWT_DECODE_CACHE_SIZE", default="10000"))
 
 
 
@@ -258,51 +360,54 @@ DJANGO_LOG_FILE = DJANGO_LOG_DIR / "django.log"
 
 LOG_TO_FILE = config("LOG_TO_FILE", default="1", cast=bool)
 
+# Records are queued and written by a listener thread per worker (infra.logging):
+# JSON lines in the file, at most LOG_RATE_LIMIT identical records per
+# LOG_RATE_WINDOW seconds, and records beyond LOG_QUEUE_SIZE waiting are dropped.
+LOG_RATE_LIMIT = config("LOG_RATE_LIMIT", default=10, cast=int)
+LOG_RATE_WINDOW = config("LOG_RATE_WINDOW", default=60.0, cast=float)
+LOG_QUEUE_SIZE = config("LOG_QUEUE_SIZE", default=10000, cast=int)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "formatters": {
-        "verbose": {
-            "format": "%(asctime)s | %(levelname)s | %(name)s | %(process)d | %(thread)d | %(message)s",
-        },
-        "simple": {"format": "%(levelname)s | %(name)s | %(message)s"},
-    },
     "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
+        "queue": {
+            "()": "infra.logging.QueueHandler",
             "level": "INFO",
-            "formatter": "simple",
-        },
-        # File handler is optional; directory must exist
-        "file": {
-            "class": "logging.handlers.RotatingFileHandler",
-            "level": "INFO",
-            "formatter": "verbose",
-            "filename": str(DJANGO_LOG_FILE),   # <-- str, not Path
-            "maxBytes": 10 * 1024 * 1024,      # 10 MB
-            "backupCount": 5,
-            "encoding": "utf-8",
+            "file": str(DJANGO_LOG_FILE) if LOG_TO_FILE else None,
+            "max_bytes": 10 * 1024 * 1024,      # 10 MB
+            "backup_count": 5,
+            "console": True,
+            "queue_size": LOG_QUEUE_SIZE,
+            "rate_limit": LOG_RATE_LIMIT,
+            "rate_window": LOG_RATE_WINDOW,
         },
     },
     "loggers": {
         "django": {
-            "handlers": ["console"] + (["file"] if LOG_TO_FILE else []),
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": False,
         },
+        # 4xx responses are logged once by common.exceptions.drf_exception_handler
+        "django.request": {
+            "handlers": ["queue"],
+            "level": "ERROR",
+            "propagate": False,
+        },
         "apps": {
-            "handlers": ["console"] + (["file"] if LOG_TO_FILE else []),
+            "handlers": ["queue"],
             "level": "DEBUG",
             "propagate": False,
         },
         "common": {
-            "handlers": ["console"] + (["file"] if LOG_TO_FILE else []),
+            "handlers": ["queue"],
             "level": "DEBUG",
             "propagate": False,
         },
         # your app modules can be listed here too
         "": {  # root logger
-            "handlers": ["console"] + (["file"] if LOG_TO_FILE else []),
+            "handlers": ["queue"],
             "level": "INFO",
         },
     },
@@ -12,13 +12,18 @@ from drf_spectacular.views import (
 # import views
 from apps.authn.interface.views import LoginView, RefreshView
 from apps.groceries.interface.views import (
-    GroceryAdminViewSet, GroceryItemViewSet, ItemDetailViewSet, GroceryIncomeViewSet
+    GroceryItemViewSet, ItemDetailViewSet, GroceryIncomeViewSet, GroceryChangesViewSet,
+    GrocerySalesViewSet,
+)
+from apps.groceries.interface.async_views import (
+    grocery_collection, grocery_detail, grocery_items, grocery_income, grocery_income_summary,
+    grocery_events,
 )
 from apps.users.interface.views import SupplierAdminViewSet
+from common.ops_views import Neo4jPoolView, EntityCacheView, metrics_view
 
 # DRF router
 router = DefaultRouter()
-router.register(r"v1/groceries", GroceryAdminViewSet, basename="groceries")
 router.register(r"v1/suppliers", SupplierAdminViewSet, basename="suppliers")
 
 urlpatterns = [
@@ -26,15 +31,25 @@ urlpatterns = [
     path("api/v1/auth/login/", LoginView.as_view(), name="auth-login"),
     path("api/v1/auth/refresh/", RefreshView.as_view(), name="auth-refresh"),
 
-    # groceries + suppliers (via router)
+    # groceries: explicit paths so GETs can be served by the async views under ASGI
+    # (each falls back to GroceryAdminViewSet; see apps.groceries.interface.async_views)
+    path("api/v1/groceries/", grocery_collection, name="groceries-list"),
+    path("api/v1/groceries/<str:pk>/", grocery_detail, name="groceries-detail"),
+
+    # suppliers (via router)
     path("api/", include(router.urls)),
 
     # items (explicit paths, not router)
     path(
         "api/v1/groceries/<str:grocery_uid>/items/",
-        GroceryItemViewSet.as_view({"get": "list", "post": "create"}),
+        grocery_items,
         name="grocery-items",
     ),
+    path(
+        "api/v1/groceries/<str:grocery_uid>/items/bulk/",
+        GroceryItemViewSet.as_view({"post": "bulk_create"}),
+        name="grocery-items-bulk",
+    ),
     path(
         "api/v1/items/<str:pk>/",
         ItemDetailViewSet.as_view({"patch": "partial_update", "delete": "destroy"}),
@@ -43,9 +58,39 @@ urlpatterns = [
 
     path(
         "api/v1/groceries/<str:grocery_uid>/income/",
-        GroceryIncomeViewSet.as_view({"post": "create", "get": "list"}),
+        grocery_income,
+    ),
+    path(
+        "api/v1/groceries/<str:grocery_uid>/income/bulk/",
+        GroceryIncomeViewSet.as_view({"post": "bulk_create"}),
+        name="grocery-income-bulk",
+    ),
+    path(
+        "api/v1/groceries/<str:grocery_uid>/income/summary/",
+        grocery_income_summary,
+        name="grocery-income-summary",
+    ),
+    path(
+        "api/v1/groceries/<str:grocery_uid>/sales/",
+        GrocerySalesViewSet.as_view({"post": "create"}),
+        name="grocery-sales",
+    ),
+    path(
+        "api/v1/groceries/<str:grocery_uid>/changes/",
+        GroceryChangesViewSet.as_view({"get": "list"}),
+        name="grocery-changes",
+    ),
+    # Server-Sent Events (ASGI only)
+    path(
+        "api/v1/groceries/<str:grocery_uid>/events/",
+        grocery_events,
+        name="grocery-events",
     ),
 
+    # ops
+    path("api/v1/ops/neo4j/pool/", Neo4jPoolView.as_view(), name="ops-neo4j-pool"),
+    path("api/v1/ops/cache/", EntityCacheView.as_view(), name="ops-entity-cache"),
+    path("metrics", metrics_view, name="metrics"),
 
 
     # API Documentation Routes
@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'grocery.settings')
 
 application = get_wsgi_application()
+
+# open this worker's Neo4j connections before the first request
+from infra.neo4j.driver import warm_up  # noqa: E402
+
+warm_up()
+
+# replay sales events spooled by workers that died, and start flushing
+from apps.groceries.infrastructure.sales_ingest import sales_ingestor  # noqa: E402
+
+sales_ingestor()
@@ -0,0 +1,230 @@
+"""
+In-process read-through cache for rarely changing entities (groceries, users).
+
+`EntityCache` is a bounded LRU with a TTL, per worker process. Every entry
+carries the version its key had when the value was loaded. Writes bump the
+key's version in a `VersionTable` shared by all workers of the host (a SQLite
+file, infra.sqlite), so an entry cached by another worker stops being served
+as soon as that worker sees the new version; a load that raced with a write
+is stored under the old version and never served.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+
+from django.conf import settings
+
+from infra.sqlite import LocalConnection
+
+_MISSING = object()
+
+
+class VersionTable:
+    """
+    Per-key version stamps shared across processes: a key's version is the seq
+    of its latest entry in an invalidation log. A bump appends to the log; each
+    process loads every key's latest entry on its first sync, then replays the
+    entries it hasn't seen (at most every `sync_interval` seconds) into a local
+    key -> version map, so all processes agree on a key's version.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entity_invalidations (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        key TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS entity_invalidations_key ON entity_invalidations (key, seq);
+    """
+    # superseded log rows older than this are pruned; a key's latest row is
+    # always kept, since it is the key's version
+    RETENTION = 3600.0
+
+    def __init__(self, path: str | None = None, sync_interval: float = 0.0):
+        self._db = LocalConnection(path, self.SCHEMA)
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._seq: Optional[int] = None
+        self._synced_at = 0.0
+
+    def current(self, key: str) -> int:
+        self.sync()
+        return self._versions.get(key, 0)
+
+    def bump(self, key: str) -> None:
+        now = time.time()
+        conn = self._db.get()
+        seq = conn.execute("INSERT INTO entity_invalidations (key, created_at) VALUES (?, ?)",
+                           (key, now)).lastrowid
+        if seq % 1000 == 0:
+            conn.execute("""
+                DELETE FROM entity_invalidations
+                WHERE created_at < ?
+                  AND seq NOT IN (SELECT MAX(seq) FROM entity_invalidations GROUP BY key)
+            """, (now - self.RETENTION,))
+        with self._lock:
+            self._versions[key] = max(self._versions.get(key, 0), seq)
+        self.sync(force=True)
+
+    def sync(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._seq is not None and now - self._synced_at < self.sync_interval:
+            return
+        conn = self._db.get()
+        with self._lock:
+            if self._seq is None:
+                # every key's current version, then follow the log from its end
+                rows = conn.execute("SELECT key, MAX(seq) FROM entity_invalidations GROUP BY key").fetchall()
+                for key, seq in rows:
+                    self._versions[key] = max(self._versions.get(key, 0), seq)
+                self._seq = max((seq for _, seq in rows), default=0)
+            else:
+                rows = conn.execute("SELECT seq, key FROM entity_invalidations WHERE seq > ? ORDER BY seq",
+                                    (self._seq,)).fetchall()
+                for seq, key in rows:
+                    self._versions[key] = seq
+                if rows:
+                    self._seq = rows[-1][0]
+            self._synced_at = now
+
+
+class EntityCache:
+    """
+    Bounded LRU + TTL map of key -> (value, version, expires_at).
+    `maxsize=0` disables caching (every lookup loads).
+    """
+    def __init__(self, name: str, versions: VersionTable, *, maxsize: int, ttl: float):
+        self.name = name
+        self.versions = versions
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[object, int, float]] = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def _version(self, key: str) -> int:
+        return self.versions.current(f"{self.name}:{key}")
+
+    def get(self, key: str, default=None):
+        version = self._version(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, entry_version, expires_at = entry
+            if entry_version != version:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return default
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value, version: int) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: str, load: Callable[[], object]):
+        """
+        Read-through: the cached value, else `load()` (cached unless None).
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        version = self._version(key)   # taken before loading, see module docstring
+        value = load()
+        if value is not None:
+            self.put(key, value, version)
+        return value
+
+    async def aget_or_load(self, key: str, load: Callable[[], Awaitable[object]]):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        version = self._version(key)
+        value = await load()
+        if value is not None:
+            self.put(key, value, version)
+        return value
+
+    def invalidate(self, key: str) -> None:
+        """
+        Bump the key's version for every worker (call once the write committed).
+        """
+        self.versions.bump(f"{self.name}:{key}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+_registry_lock = threading.Lock()
+_versions: Optional[VersionTable] = None
+_caches: dict[str, EntityCache] = {}
+
+
+def entity_versions() -> VersionTable:
+    global _versions
+    with _registry_lock:
+        if _versions is None:
+            _versions = VersionTable(sync_interval=settings.ENTITY_CACHE_SYNC_INTERVAL)
+        return _versions
+
+
+def entity_cache(name: str) -> EntityCache:
+    """
+    The process-wide cache `name` (e.g. "grocery"), sized by ENTITY_CACHE_SIZE / ENTITY_CACHE_TTL.
+    """
+    versions = entity_versions()
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = EntityCache(name, versions, maxsize=settings.ENTITY_CACHE_SIZE,
+                                                ttl=settings.ENTITY_CACHE_TTL)
+        return cache
+
+
+def cache_metrics() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def tag_versions(tags: Iterable[str]) -> tuple[int, ...]:
+    """
+    Current versions of cache tags (e.g. "grocery:<uid>"), in order.
+    """
+    versions = entity_versions()
+    return tuple(versions.current(f"tag:{tag}") for tag in tags)
+
+
+def invalidate_tags(*tags: str) -> None:
+    versions = entity_versions()
+    for tag in tags:
+        versions.bump(f"tag:{tag}")
@@ -0,0 +1,252 @@
+"""
+Change events for the live grocery streams (GET /groceries/{uid}/events).
+
+Repository writes `publish()` an event once their transaction commits. The
+event goes out through a transport that reaches every worker process of the
+host; each worker's `Broker` hands it to the subscribers of that grocery.
+
+A subscriber is a bounded deque owned by the event loop serving the stream:
+when a slow client lets it fill up, the oldest events are dropped and the
+client is told how many it missed (it can catch up with the changes feed).
+An idle subscriber is a deque and an asyncio.Event, so one worker can hold
+thousands of open streams.
+
+Transports (EVENTS_TRANSPORT):
+  UnixSocketTransport  one datagram socket per worker in EVENTS_SOCKET_DIR;
+                       publishing sends to all of them (default)
+  SQLiteTransport      an append-only table in INFRA_SQLITE_PATH polled by
+                       every worker (no socket directory needed, e.g. tests)
+  LocalTransport       this process only
+"""
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+import orjson
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from common.serialization import dumps
+from infra.sqlite import LocalConnection
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[bytes], None]
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    grocery: str
+    type: str           # item.created | item.updated | item.deleted | items.imported | income.added
+    data: dict
+    id: str
+
+
+class LocalTransport:
+    """
+    Delivers straight back to this process: enough for a single worker.
+    """
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, message: bytes) -> None:
+        if self._deliver is not None:
+            self._deliver(message)
+
+
+class UnixSocketTransport:
+    """
+    Every worker that has subscribers binds `<dir>/<pid>.sock` and reads it on
+    a daemon thread. Publishing sends one datagram to each socket in the
+    directory; sockets of dead workers refuse it and are removed.
+    """
+    def __init__(self, directory: str | None = None):
+        self.directory = Path(directory or settings.EVENTS_SOCKET_DIR)
+        self._sender: Optional[socket.socket] = None
+        self._sender_pid: Optional[int] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{os.getpid()}.sock"
+        path.unlink(missing_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(path))
+        threading.Thread(target=self._receive, args=(sock, deliver), name="events-socket",
+                         daemon=True).start()
+
+    @staticmethod
+    def _receive(sock: socket.socket, deliver: Deliver) -> None:
+        while True:
+            deliver(sock.recv(65536))
+
+    def publish(self, message: bytes) -> None:
+        if self._sender_pid != os.getpid():
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+            self._sender_pid = os.getpid()
+        for path in self.directory.glob("*.sock"):
+            try:
+                self._sender.sendto(message, str(path))
+            except (ConnectionRefusedError, FileNotFoundError):
+                path.unlink(missing_ok=True)
+            except BlockingIOError:
+                # that worker's receive buffer is full; its subscribers miss this one
+                logger.warning("events: %s is not keeping up, event dropped", path.name)
+
+
+class SQLiteTransport:
+    """
+    Events appended to a table in the shared SQLite file; each subscribing
+    worker polls for rows past the last one it saw.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        message BLOB NOT NULL,
+        created_at REAL NOT NULL
+    );
+    """
+    RETENTION = 300.0
+
+    def __init__(self, path: str | None = None, poll_interval: float | None = None):
+        self._db = LocalConnection(path, self.SCHEMA)
+        self.poll_interval = settings.EVENTS_POLL_INTERVAL if poll_interval is None else poll_interval
+
+    def start(self, deliver: Deliver) -> None:
+        row = self._db.get().execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()
+        threading.Thread(target=self._poll, args=(row[0], deliver), name="events-sqlite",
+                         daemon=True).start()
+
+    def _poll(self, seq: int, deliver: Deliver) -> None:
+        conn = self._db.get()
+        while True:
+            for seq, message in conn.execute("SELECT seq, message FROM events WHERE seq > ? ORDER BY seq",
+                                             (seq,)).fetchall():
+                deliver(message)
+            time.sleep(self.poll_interval)
+
+    def publish(self, message: bytes) -> None:
+        now = time.time()
+        conn = self._db.get()
+        seq = conn.execute("INSERT INTO events (message, created_at) VALUES (?, ?)", (message, now)).lastrowid
+        if seq % 1000 == 0:
+            conn.execute("DELETE FROM events WHERE created_at < ?", (now - self.RETENTION,))
+
+
+class Subscription:
+    """
+    One open stream: a drop-oldest buffer of at most `maxsize` events, filled
+    on the subscriber's event loop.
+    """
+    def __init__(self, broker: "Broker", grocery: str, maxsize: int):
+        self.broker = broker
+        self.grocery = grocery
+        self.loop = asyncio.get_running_loop()
+        self.buffer: deque[Event] = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, event: Event) -> None:
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> tuple[list[Event], int]:
+        """
+        Buffered events and the number dropped since the last batch; both
+        empty after `timeout` seconds without events.
+        """
+        if not self.buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        events, dropped = list(self.buffer), self.dropped
+        self.buffer.clear()
+        self.dropped = 0
+        return events, dropped
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """
+    Per-process fan-out from the transport to this worker's subscriptions.
+    """
+    def __init__(self, transport):
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._started_pid: Optional[int] = None
+        self._ids = itertools.count(1)
+
+    def publish(self, grocery: str, type: str, data) -> None:
+        event_id = f"{time.time_ns():x}-{os.getpid():x}-{next(self._ids):x}"
+        # common.serialization: entities come out as in the REST responses (dumper(), "Z" datetimes)
+        self.transport.publish(dumps({"grocery": grocery, "type": type, "data": data, "id": event_id}))
+
+    def subscribe(self, grocery: str, maxsize: int | None = None) -> Subscription:
+        with self._lock:
+            if self._started_pid != os.getpid():
+                self.transport.start(self._deliver)
+                self._started_pid = os.getpid()
+            sub = Subscription(self, grocery, maxsize or settings.EVENTS_BUFFER_SIZE)
+            self._subscribers.setdefault(grocery, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.grocery)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.grocery]
+
+    def _deliver(self, message: bytes) -> None:
+        # transport thread -> each subscriber's loop
+        try:
+            event = Event(**orjson.loads(message))
+        except (orjson.JSONDecodeError, TypeError):
+            logger.warning("events: malformed message dropped")
+            return
+        with self._lock:
+            subs = list(self._subscribers.get(event.grocery, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.push, event)
+            except RuntimeError:
+                # its loop is gone
+                self.unsubscribe(sub)
+
+
+@lru_cache(maxsize=None)
+def broker() -> Broker:
+    return Broker(import_string(settings.EVENTS_TRANSPORT)())
+
+
+def publish(grocery: str, type: str, data) -> None:
+    """
+    Publish now (`data`: a dict or an entity dataclass, serialized like the
+    REST responses by common.serialization.dumps);
+    repositories call it from on_commit() so only committed changes are
+    streamed. Never fails the write that triggered it.
+    """
+    try:
+        broker().publish(grocery, type, data)
+    except Exception:
+        logger.exception("events: publish failed (%s for grocery %s)", type, grocery)
@@ -0,0 +1,190 @@
+"""
+Non-blocking logging: request threads only enqueue records; one listener
+thread per worker formats them and does the I/O.
+
+    LOGGING = {
+        "handlers": {
+            "queue": {
+                "()": "infra.logging.QueueHandler",
+                "file": "/var/log/grocery/django.log",   # None: console only
+                "max_bytes": 10 * 1024 * 1024,
+                "backup_count": 5,
+                "console": True,
+            },
+        },
+        ...
+    }
+
+On the request thread `QueueHandler` adds the trace id (TraceIdFilter),
+applies `RateLimitFilter` and puts the record on a bounded queue; when the
+queue is full the record is dropped and counted instead of blocking. The
+listener writes JSON lines (`JSONFormatter`) to the rotating file and plain
+lines to the console; tracebacks are formatted there too.
+
+`RateLimitFilter` lets at most LOG_RATE_LIMIT identical records (same
+logger, level and message) through per LOG_RATE_WINDOW seconds; the first
+one after a suppressed stretch carries `suppressed=<n>`.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+
+from common.logging_filters import TraceIdFilter
+
+# LogRecord attributes that are not `extra=` fields
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, message, trace_id, pid,
+    thread, the `extra=` fields and, for records with exc_info, the
+    exception type and traceback.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", "-"),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in out:
+                out[key] = value
+        if record.exc_info and record.exc_info[0] is not None:
+            out["exc_type"] = record.exc_info[0].__name__
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            out["exc"] = record.exc_text
+        return orjson.dumps(out, default=str).decode()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    At most `limit` identical records per `window` seconds; 0 disables.
+    """
+    MAX_KEYS = 10_000
+
+    def __init__(self, limit: int = 10, window: float = 60.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        # key -> [window start, records passed, records suppressed]
+        self._seen: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0:
+            return True
+        key = (record.name, record.levelno, record.getMessage()[:300])
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] >= self.window:
+                if len(self._seen) >= self.MAX_KEYS:
+                    self._seen.clear()
+                suppressed = state[2] if state is not None else 0
+                self._seen[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to this worker's listener thread (started on the first
+    record, and again in a forked child).
+    """
+    def __init__(self, file: Optional[str] = None, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, console: bool = True, queue_size: int = 10_000,
+                 rate_limit: int = 10, rate_window: float = 60.0):
+        super().__init__(queue.Queue(queue_size))
+        self.file = file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.console = console
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.addFilter(TraceIdFilter())
+        self.addFilter(RateLimitFilter(rate_limit, rate_window))
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def _targets(self) -> list[logging.Handler]:
+        targets = []
+        if self.console:
+            console = logging.StreamHandler()
+            console.setFormatter(logging.Formatter("%(levelname)s | %(name)s | %(trace_id)s | %(message)s"))
+            targets.append(console)
+        if self.file:
+            os.makedirs(os.path.dirname(self.file) or ".", exist_ok=True)
+            file = logging.handlers.RotatingFileHandler(self.file, maxBytes=self.max_bytes,
+                                                        backupCount=self.backup_count, encoding="utf-8")
+            file.setFormatter(JSONFormatter())
+            targets.append(file)
+        return targets
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # forked: the parent's listener thread did not come along
+                self.queue = queue.Queue(self.queue_size)
+            self._listener = logging.handlers.QueueListener(self.queue, *self._targets(),
+                                                            respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """
+        Drains the queue (at exit).
+        """
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener lives in this process: keep exc_info so the traceback is
+        # formatted there, off the request thread. Only the message is resolved
+        # now, while its arguments still hold their current values.
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            try:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": "log queue full: %d records dropped", "args": (dropped,),
+                    "trace_id": "-"}))
+            except queue.Full:
+                self.dropped += dropped
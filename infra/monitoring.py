@@ -0,0 +1,372 @@
+"""
+Prometheus metrics, aggregated across the worker processes of a host.
+
+Each worker writes its samples into its own memory-mapped file
+`<METRICS_DIR>/<pid>.metrics` (an update is a dict lookup and an 8-byte
+read-modify-write under a process-local lock, no syscall). `/metrics`
+(common.ops_views.metrics_view) reads every file and renders the sums in the
+Prometheus text format:
+
+  counters, histograms  summed over all files, including those of workers
+                        that exited, so totals never go backwards
+  gauges                summed over the workers still alive
+
+Clear METRICS_DIR before the workers start (entrypoint.sh does, as with
+prometheus_client's multiprocess mode): the files of a previous run would
+otherwise be added to the totals again on every restart.
+
+    REQUEST_LATENCY.observe(0.012, "GET", "api/v1/items/<str:pk>/", "200")
+    IN_FLIGHT.inc()
+"""
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Optional
+
+import orjson
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_HEADER = struct.Struct("<Q")      # bytes used
+_LENGTH = struct.Struct("<I")      # key length
+_VALUE = struct.Struct("<d")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _entries(data) -> Iterable[tuple[bytes, float, int]]:
+    """
+    (key, value, value offset) of each entry: a u32 key length, the key padded
+    so the value is 8-byte aligned, a float64.
+    """
+    used = _HEADER.unpack_from(data, 0)[0]
+    pos = _HEADER.size
+    while pos < used:
+        length = _LENGTH.unpack_from(data, pos)[0]
+        key = bytes(data[pos + 4:pos + 4 + length])
+        pos += (4 + length + 7) // 8 * 8
+        yield key, _VALUE.unpack_from(data, pos)[0], pos
+        pos += 8
+
+
+class ValueFile:
+    """
+    This worker's samples. Only this process writes the file; other
+    processes read it at scrape time.
+    """
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        if size < self.INITIAL_SIZE:
+            os.ftruncate(self._fd, self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self._mm = mmap.mmap(self._fd, size)
+        # float64 view of the file: values are read and written as view[offset // 8]
+        self._view = memoryview(self._mm).cast("d")
+        self._offsets: dict[bytes, int] = {}
+        if _HEADER.unpack_from(self._mm, 0)[0] == 0:
+            _HEADER.pack_into(self._mm, 0, _HEADER.size)
+        for key, _, offset in _entries(self._mm):
+            self._offsets[key] = offset
+            if key.startswith(b'["gauge"'):
+                # a reused pid: the previous worker's gauges are not ours
+                _VALUE.pack_into(self._mm, offset, 0.0)
+
+    def _append(self, key: bytes) -> int:
+        used = _HEADER.unpack_from(self._mm, 0)[0]
+        padded = (4 + len(key) + 7) // 8 * 8
+        end = used + padded + 8
+        if end > len(self._mm):
+            size = len(self._mm)
+            while size < end:
+                size *= 2
+            os.ftruncate(self._fd, size)
+            self._view.release()
+            self._mm.close()
+            self._mm = mmap.mmap(self._fd, size)
+            self._view = memoryview(self._mm).cast("d")
+        _LENGTH.pack_into(self._mm, used, len(key))
+        self._mm[used + 4:used + 4 + len(key)] = key
+        offset = used + padded
+        _VALUE.pack_into(self._mm, offset, 0.0)
+        # readers only look at entries below the header
+        _HEADER.pack_into(self._mm, 0, end)
+        self._offsets[key] = offset
+        return offset
+
+    def offset(self, key: bytes) -> int:
+        """
+        Index of the value of `key` in the float64 view (created at 0.0);
+        stable for the file's lifetime, so metrics cache it.
+        """
+        with self._lock:
+            offset = self._offsets.get(key)
+            return (offset if offset is not None else self._append(key)) // 8
+
+    def add(self, index: int, amount: float) -> None:
+        with self._lock:
+            self._view[index] += amount
+
+    def set(self, index: int, value: float) -> None:
+        # under the lock: _append() may be swapping the view for a larger one
+        with self._lock:
+            self._view[index] = value
+
+    def observe(self, bucket: int, total: int, count: int, value: float) -> None:
+        # a histogram sample: three updates under one lock
+        with self._lock:
+            view = self._view
+            view[bucket] += 1.0
+            view[total] += value
+            view[count] += 1.0
+
+
+_file_lock = threading.Lock()
+_file: Optional[ValueFile] = None
+
+
+def _values() -> ValueFile:
+    global _file
+    if _file is None:
+        with _file_lock:
+            if _file is None:
+                _file = ValueFile(Path(settings.METRICS_DIR) / f"{os.getpid()}.metrics")
+                _start_pool_sampler()
+    return _file
+
+
+def reset_values() -> None:
+    """
+    Forgets this process's file: after a fork, or after pointing METRICS_DIR
+    elsewhere (benchmarks, tests).
+    """
+    global _file
+    _file = None
+
+
+os.register_at_fork(after_in_child=reset_values)
+
+
+# ---------------------------------------------------------------------------
+# metric types
+# ---------------------------------------------------------------------------
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        # labels -> (file, offsets in it); rebuilt when the process's file changes
+        self._series: dict[tuple, tuple] = {}
+        REGISTRY[name] = self
+
+    def _key(self, labels: tuple, suffix: str = "") -> bytes:
+        return orjson.dumps([self.type, self.name + suffix, labels])
+
+    def _offset(self, labels: tuple) -> tuple[ValueFile, int]:
+        values = _values()
+        series = self._series.get(labels)
+        if series is None or series[0] is not values:
+            series = self._series[labels] = (values, values.offset(self._key(labels)))
+        return series
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        values, offset = self._offset(labels)
+        values.add(offset, amount)
+
+
+class Gauge(_Metric):
+    """
+    Summed over the live workers.
+    """
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        values, offset = self._offset(labels)
+        values.add(offset, amount)
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        values, offset = self._offset(labels)
+        values.add(offset, -amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        values, offset = self._offset(labels)
+        values.set(offset, value)
+
+
+class Histogram(_Metric):
+    """
+    Bucket counts are stored per bucket and made cumulative when rendered.
+    """
+    type = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = _values()
+        series = self._series.get(labels)
+        if series is None or series[0] is not values:
+            series = self._series[labels] = (
+                values,
+                [values.offset(self._key(labels + (_le(b),), "_bucket")) for b in self.buckets],
+                values.offset(self._key(labels, "_sum")),
+                values.offset(self._key(labels, "_count")),
+            )
+        values.observe(series[1][bisect_left(self.buckets, value)], series[2], series[3], value)
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+REGISTRY: dict[str, _Metric] = {}
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route and status.",
+    ("method", "route", "status"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served.")
+THROTTLE_REJECTIONS = Counter(
+    "throttle_rejections_total", "Requests rejected by a DRF throttle (429).", ("view",))
+JWT_DECODE = Histogram(
+    "jwt_decode_seconds", "Access token signature and claims verification (verified-token cache misses).",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005))
+JWT_CACHE_HITS = Counter("jwt_decode_cache_hits_total", "Access tokens served by the verified-token cache.")
+CYPHER_LATENCY = Histogram(
+    "neo4j_query_duration_seconds", "Cypher round trips by statement fingerprint.", ("fingerprint",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+POOL_CONNECTIONS = Gauge(
+    "neo4j_pool_connections", "Neo4j pool connections by pool (sync/async) and state (in_use/idle).",
+    ("pool", "state"))
+POOL_MAX_SIZE = Gauge("neo4j_pool_max_size", "Maximum connections per Neo4j pool.", ("pool",))
+POOL_ACQUIRE_WAIT_MAX = Gauge(
+    "neo4j_pool_acquire_wait_seconds_max", "Longest connection acquisition wait so far.", ("pool",))
+
+
+def observe_query(record) -> None:
+    # infra.neo4j.instrumentation listener
+    CYPHER_LATENCY.observe(record.duration, record.fingerprint)
+
+
+def _sample_pools() -> None:
+    from infra.neo4j.driver import pool_metrics
+
+    metrics = pool_metrics()
+    for pool in ("sync_pool", "async_pool"):
+        stats = metrics[pool]
+        if stats is None:
+            continue
+        name = pool.removesuffix("_pool")
+        POOL_CONNECTIONS.set(stats["in_use"], name, "in_use")
+        POOL_CONNECTIONS.set(stats["idle"], name, "idle")
+        POOL_MAX_SIZE.set(metrics["max_size"], name)
+        POOL_ACQUIRE_WAIT_MAX.set(stats["acquire_wait_ms_max"] / 1000, name)
+
+
+def _start_pool_sampler() -> None:
+    interval = settings.METRICS_POOL_INTERVAL
+    if interval <= 0:
+        return
+
+    def run():
+        while True:
+            try:
+                _sample_pools()
+            except Exception:
+                logger.exception("metrics: pool sampling failed")
+            time.sleep(interval)
+
+    threading.Thread(target=run, name="metrics-pool", daemon=True).start()
+
+
+# ---------------------------------------------------------------------------
+# exposition
+# ---------------------------------------------------------------------------
+
+def collect(directory: str | None = None) -> dict[tuple, float]:
+    """
+    (type, sample name, labels) -> value, summed over the workers' files.
+    """
+    totals: dict[tuple, float] = {}
+    for path in Path(directory or settings.METRICS_DIR).glob("*.metrics"):
+        try:
+            pid = int(path.stem)
+            data = path.read_bytes()
+        except (ValueError, OSError):
+            continue
+        live = None
+        for key, value, _ in _entries(data):
+            kind, sample, labels = orjson.loads(key)
+            if kind == "gauge":
+                if live is None:
+                    live = _alive(pid)
+                if not live:
+                    continue
+            series = (kind, sample, tuple(labels))
+            totals[series] = totals.get(series, 0.0) + value
+    return totals
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(sample: str, names: Iterable[str], labels: Iterable[str], value: float) -> str:
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, labels))
+    return f"{sample}{{{pairs}}} {value!r}" if pairs else f"{sample} {value!r}"
+
+
+def render(directory: str | None = None) -> str:
+    totals = collect(directory)
+    lines = []
+    for metric in REGISTRY.values():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        if isinstance(metric, Histogram):
+            names = metric.labelnames + ("le",)
+            series = sorted({labels[:-1] for (kind, sample, labels) in totals
+                             if sample == metric.name + "_bucket"})
+            for labels in series:
+                cumulative = 0.0
+                for bound in metric.buckets:
+                    cumulative += totals.get(("histogram", metric.name + "_bucket", labels + (_le(bound),)), 0.0)
+                    lines.append(_format(metric.name + "_bucket", names, labels + (_le(bound),), cumulative))
+                for suffix in ("_sum", "_count"):
+                    lines.append(_format(metric.name + suffix, metric.labelnames, labels,
+                                         totals.get(("histogram", metric.name + suffix, labels), 0.0)))
+        else:
+            for (kind, sample, labels), value in sorted(totals.items()):
+                if sample == metric.name:
+                    lines.append(_format(sample, metric.labelnames, labels, value))
+    return "\n".join(lines) + "\n"
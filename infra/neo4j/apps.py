@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class Neo4jDriverConfig(AppConfig):
+    """
+    Hands neomodel the per-process driver (infra.neo4j.driver). Listed after
+    django_neomodel, whose ready() sets the connection URL this replaces.
+    """
+    name = "infra.neo4j"
+    label = "neo4j_driver"
+    verbose_name = "Neo4j driver"
+
+    def ready(self):
+        from .driver import install
+        install()
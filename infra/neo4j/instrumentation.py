@@ -0,0 +1,214 @@
+"""
+Per-query instrumentation of every Cypher round trip.
+
+Two hooks cover all traffic: `cypher_read` / `cypher_write` / `stream_read` /
+`acypher_read` (infra.neo4j.driver) record their own sessions, and `install()`
+wraps neomodel's `Database._run_cypher_query`, which every `db.cypher_query`
+and every OGM operation (save, nodes.get, relationship traversal) runs
+through, including the request transaction of infra.neo4j.unit_of_work.
+
+Each round trip becomes a `QueryRecord`: a fingerprint of the statement text,
+duration, rows returned, the calling function in `apps.*` (e.g.
+"Neo4jItemRepository.update_fields") and the request's trace id. Records go to
+
+  - the collector of the current request (common.middleware.ServerTimingMiddleware),
+    which adds a `Server-Timing: cypher;dur=..;desc="N queries"` header,
+  - the slow-query log (`apps.neo4j.slow`, NEO4J_SLOW_QUERY_MS),
+  - any listener registered with `add_listener()`.
+
+In tests, `assert_max_queries(n)` fails when a block issues more than n
+queries, so an N+1 regression in an endpoint fails the build:
+
+    with assert_max_queries(3):
+        client.get(f"/api/v1/groceries/{uid}/items/")
+"""
+import hashlib
+import logging
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+
+from common.logging_filters import trace_id_var
+
+slow_logger = logging.getLogger("apps.neo4j.slow")
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True, slots=True)
+class QueryRecord:
+    fingerprint: str
+    query: str
+    duration: float         # seconds
+    rows: int
+    caller: str
+    trace_id: str
+
+
+@dataclass(slots=True)
+class QueryLog:
+    """
+    The queries of one request (or one `capture_queries()` block), including
+    those of the logs opened inside it: the request log of
+    ServerTimingMiddleware within a test's `assert_max_queries()` block.
+    """
+    records: list[QueryRecord] = field(default_factory=list)
+    parent: Optional["QueryLog"] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def duration(self) -> float:
+        return sum(r.duration for r in self.records)
+
+
+_current: ContextVar[Optional[QueryLog]] = ContextVar("neo4j_query_log", default=None)
+_listeners: list[Callable[[QueryRecord], None]] = []
+
+
+@lru_cache(maxsize=1024)
+def normalize(query: str) -> str:
+    """
+    Statement text with literals replaced by `?` and whitespace collapsed, so
+    queries that only differ in inlined values share a fingerprint.
+    """
+    return _SPACE.sub(" ", _LITERALS.sub("?", query)).strip()
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    return hashlib.blake2b(normalize(query).encode(), digest_size=6).hexdigest()
+
+
+def _caller() -> str:
+    # the innermost frame in an app module: the repository / authorization
+    # method that issued the query
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("apps."):
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return "-"
+
+
+def add_listener(callback: Callable[[QueryRecord], None]) -> None:
+    """
+    Calls `callback(record)` for every query of this process (metrics,
+    tracing). It runs on the query's thread, so it must be cheap.
+    """
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def record(query: str, duration: float, rows: int) -> QueryRecord:
+    entry = QueryRecord(fingerprint(query), query, duration, rows, _caller(), trace_id_var.get())
+    log = _current.get()
+    while log is not None:
+        log.records.append(entry)
+        log = log.parent
+    if duration * 1000 >= settings.NEO4J_SLOW_QUERY_MS:
+        slow_logger.warning("slow cypher %s %.1fms rows=%d caller=%s trace_id=%s: %s",
+                            entry.fingerprint, duration * 1000, rows, entry.caller,
+                            entry.trace_id, normalize(query))
+    for callback in _listeners:
+        try:
+            callback(entry)
+        except Exception:
+            slow_logger.exception("query listener %r failed", callback)
+    return entry
+
+
+class _Timer:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def timed(query: str) -> Iterator[_Timer]:
+    """
+    `with timed(query) as t: ...; t.rows = n`: records the block's duration
+    and row count, also when it raises.
+    """
+    timer = _Timer()
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        record(query, time.perf_counter() - start, timer.rows)
+
+
+def start_request() -> tuple[QueryLog, object]:
+    log = QueryLog(parent=_current.get())
+    return log, _current.set(log)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """
+    Collects the queries issued inside the block; an enclosing block sees them too.
+    """
+    log, token = start_request()
+    try:
+        yield log
+    finally:
+        end_request(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryLog]:
+    """
+    Test helper: fails when the block issues more than `limit` Cypher queries,
+    listing them by caller and fingerprint.
+    """
+    with capture_queries() as log:
+        yield log
+    if log.count > limit:
+        lines = "\n".join(f"  {r.caller} [{r.fingerprint}] {r.duration * 1000:.1f}ms rows={r.rows}: "
+                          f"{normalize(r.query)[:120]}" for r in log.records)
+        raise QueryBudgetExceeded(f"{log.count} Cypher queries, budget {limit}:\n{lines}")
+
+
+def server_timing(log: QueryLog) -> str:
+    return f'cypher;dur={log.duration * 1000:.1f};desc="{log.count} queries"'
+
+
+def install() -> None:
+    """
+    Wraps neomodel's per-round-trip method (neomodel 5.x), once per process.
+    """
+    from neomodel.sync_.core import Database
+
+    original = Database._run_cypher_query
+    if getattr(original, "instrumented", False):
+        return
+
+    @wraps(original)
+    def _run_cypher_query(self, session, query, params, *args, **kwargs):
+        start = time.perf_counter()
+        results, meta = original(self, session, query, params, *args, **kwargs)
+        record(query, time.perf_counter() - start, len(results))
+        return results, meta
+
+    _run_cypher_query.instrumented = True
+    Database._run_cypher_query = _run_cypher_query
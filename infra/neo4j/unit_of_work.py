@@ -0,0 +1,115 @@
+"""
+Request-scoped unit of work for the Neo4j repositories.
+
+A write request runs inside one explicit transaction (neomodel's thread-local
+`db` routes every cypher_query to it), so a request either lands completely or
+not at all. The unit of work also keeps an identity map of entities already
+read or written in the request, and callbacks to run once the commit succeeded.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from neomodel import db
+
+from .driver import current_bookmarks, record_bookmarks
+
+_current: ContextVar[Optional["UnitOfWork"]] = ContextVar("neo4j_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    def __init__(self):
+        self.identity_map: dict[tuple[str, str], object] = {}
+        self.rollback_only = False
+        self._after_commit: list[Callable[[], None]] = []
+        self._owns_transaction = False
+        self._previous = None
+
+    def __enter__(self):
+        if db._active_transaction is None:
+            db.begin(access_mode="WRITE", bookmarks=current_bookmarks())
+            self._owns_transaction = True
+        # set/restore rather than a reset token: under ASGI enter and exit may run
+        # in different (copied) contexts
+        self._previous = _current.get()
+        _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.set(self._previous)
+        if not self._owns_transaction:
+            return False
+        if exc_type is None and not self.rollback_only:
+            record_bookmarks(db.commit())
+            callbacks, self._after_commit = self._after_commit, []
+            for fn in callbacks:
+                fn()
+        else:
+            db.rollback()
+        return False
+
+    def set_rollback(self) -> None:
+        self.rollback_only = True
+
+    def on_commit(self, fn: Callable[[], None]) -> None:
+        self._after_commit.append(fn)
+
+    # ---- identity map ----
+    def get(self, kind: str, uid: str):
+        return self.identity_map.get((kind, uid))
+
+    def put(self, kind: str, uid: str, entity) -> None:
+        self.identity_map[(kind, uid)] = entity
+
+
+def current_uow() -> Optional[UnitOfWork]:
+    return _current.get()
+
+
+def identity_get(kind: str, uid: str):
+    uow = _current.get()
+    return uow.get(kind, uid) if uow else None
+
+
+def identity_put(kind: str, uid: str, entity) -> None:
+    uow = _current.get()
+    if uow:
+        uow.put(kind, uid, entity)
+
+
+def on_commit(fn: Callable[[], None]) -> None:
+    """
+    Run `fn` after the current unit of work commits (right away if there is none).
+    """
+    uow = _current.get()
+    if uow:
+        uow.on_commit(fn)
+    else:
+        fn()
+
+
+@contextmanager
+def atomic():
+    """
+    Transaction for a multi-statement repository write: joins the request's
+    transaction when one is open, otherwise opens (and commits) its own.
+    """
+    if db._active_transaction is not None:
+        yield
+        return
+    db.begin(access_mode="WRITE", bookmarks=current_bookmarks())
+    try:
+        yield
+    except BaseException:
+        db.rollback()
+        raise
+    record_bookmarks(db.commit())
+
+
+def non_atomic(view_method):
+    """
+    Opt a view action out of the request transaction (e.g. bulk imports that
+    commit per batch), like Django's non_atomic_requests.
+    """
+    view_method.neo4j_non_atomic = True
+    return view_method
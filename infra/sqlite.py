@@ -0,0 +1,41 @@
+"""
+Shared SQLite file for state the worker processes of one host coordinate
+through (cache versions, ...), so no extra service is needed.
+
+Connections are per thread and per process (a forked child opens its own),
+in WAL mode so readers never block the single writer.
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+
+def connect(path: str) -> sqlite3.Connection:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class LocalConnection:
+    """
+    Lazily opened connection for the current thread. `schema` (a script of
+    CREATE ... IF NOT EXISTS statements) runs once per new connection.
+    """
+    def __init__(self, path: str | None = None, schema: str = ""):
+        self.path = path
+        self.schema = schema
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conn = connect(self.path or settings.INFRA_SQLITE_PATH)
+            local.pid = os.getpid()
+            if self.schema:
+                local.conn.executescript(self.schema)
+        return local.conn
@@ -0,0 +1,58 @@
+import multiprocessing
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from infra.cache import VersionTable
+
+
+def _current(path, key):
+    # a worker process that starts after the writes
+    return VersionTable(path).current(key)
+
+
+def _bump(path, key):
+    table = VersionTable(path)
+    table.current(key)
+    table.bump(key)
+    return table.current(key)
+
+
+class VersionTableTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "infra.sqlite3")
+        self.pool = multiprocessing.get_context("fork").Pool(1)
+        self.addCleanup(self.pool.terminate)
+
+    def test_process_started_after_a_bump_sees_it(self):
+        w1 = VersionTable(self.path)
+        stored = w1.current("tag:grocery:g1")     # an entry is cached at this version
+        w1.bump("tag:grocery:g1")
+        self.assertNotEqual(w1.current("tag:grocery:g1"), stored)
+        w2 = self.pool.apply(_current, (self.path, "tag:grocery:g1"))
+        self.assertEqual(w2, w1.current("tag:grocery:g1"))
+
+    def test_bump_in_another_process_is_seen(self):
+        w1 = VersionTable(self.path)
+        before = w1.current("tag:grocery:g1")
+        after = self.pool.apply(_bump, (self.path, "tag:grocery:g1"))
+        self.assertNotEqual(after, before)
+        self.assertEqual(w1.current("tag:grocery:g1"), after)
+
+    def test_pruning_keeps_each_keys_version(self):
+        w1 = VersionTable(self.path)
+        w1.bump("tag:grocery:g1")
+        w1.bump("tag:grocery:g2")
+        version = w1.current("tag:grocery:g1")
+        conn = w1._db.get()
+        conn.execute("UPDATE entity_invalidations SET created_at = 0")
+        # force the periodic prune on the next bump
+        conn.execute("UPDATE sqlite_sequence SET seq = 999 WHERE name = 'entity_invalidations'")
+        w1.bump("tag:grocery:g2")
+        keys = [k for k, in conn.execute("SELECT key FROM entity_invalidations ORDER BY seq")]
+        self.assertEqual(keys, ["tag:grocery:g1", "tag:grocery:g2"])
+        w2 = self.pool.apply(_current, (self.path, "tag:grocery:g1"))
+        self.assertEqual(w2, version)
@@ -0,0 +1,349 @@
+"""
+Request tracing: OpenTelemetry-shaped spans from the middleware down to each
+Cypher statement, with head-based sampling.
+
+    TracingMiddleware             "GET api/v1/groceries/<str:grocery_uid>/items/"  (server)
+      CustomJWTAuthentication.authenticate
+      AdminOrOwningSupplierOnGrocery.has_permission
+        Neo4jAuthorizationRepository.supplier_grocery_access
+          cypher 3f1c9a...                                                       (client)
+      UpdateGrocery
+        CachedGroceryRepository.update_fields
+          Neo4jGroceryRepository.update_fields
+            cypher ...
+
+Classes opt in with `@traced_methods` (every public method, or `__call__`
+for a use case); functions with `@traced()`. Cypher spans come from the
+query instrumentation (infra.neo4j.instrumentation), which reports each
+statement after it ran.
+
+Sampling is decided once per request: a `traceparent` header's sampled flag
+is followed, otherwise TRACING_SAMPLE_RATE of the trace ids are kept (the
+same ratio rule as OpenTelemetry's TraceIdRatioBased sampler). An unsampled
+request costs one ContextVar lookup per decorated call.
+
+Finished spans are queued per worker and exported in batches by a daemon
+thread (TRACING_EXPORTER; empty disables tracing):
+
+  FileSpanExporter   OTLP/JSON spans, one per line, in TRACING_FILE
+  OTLPHttpExporter   OTLP/JSON POSTs to TRACING_OTLP_ENDPOINT (an
+                     OpenTelemetry collector, or `manage.py collect_traces`)
+"""
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from inspect import iscoroutinefunction, isfunction, isgeneratorfunction
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+import orjson
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class TraceParent(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[TraceParent]:
+    """
+    The W3C `traceparent` header (version 00), or None when absent or invalid.
+    """
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if match is None or set(match[1]) == {"0"} or set(match[2]) == {"0"}:
+        return None
+    return TraceParent(match[1], match[2], bool(int(match[3], 16) & 1))
+
+
+@dataclass(slots=True)
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: str = "internal"
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_otlp(self) -> dict:
+        out = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_id:
+            out["parentSpanId"] = self.parent_id
+        return out
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# the innermost open span of the current request; None when not sampled
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+# ---------------------------------------------------------------------------
+# export
+# ---------------------------------------------------------------------------
+
+class FileSpanExporter:
+    def __init__(self, path: str | None = None):
+        self.path = Path(path or settings.TRACING_FILE)
+
+    def export(self, spans: list[Span]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(orjson.dumps(s.to_otlp()) + b"\n" for s in spans))
+
+
+class OTLPHttpExporter:
+    """
+    OTLP/HTTP with the JSON encoding (POST {endpoint}, usually .../v1/traces).
+    """
+    def __init__(self, endpoint: str | None = None, timeout: float = 2.0):
+        self.endpoint = endpoint or settings.TRACING_OTLP_ENDPOINT
+        self.timeout = timeout
+
+    def export(self, spans: list[Span]) -> None:
+        body = orjson.dumps({"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", settings.TRACING_SERVICE_NAME),
+                                        _attribute("process.pid", os.getpid())]},
+            "scopeSpans": [{"scope": {"name": "infra.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+        }]})
+        request = urllib.request.Request(self.endpoint, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchSpanProcessor:
+    """
+    Per-worker queue of finished spans; a daemon thread exports them every
+    TRACING_EXPORT_INTERVAL seconds. A full queue drops the oldest spans
+    rather than slowing requests down.
+    """
+    BATCH_SIZE = 512
+
+    def __init__(self, exporter, *, max_queue: int, interval: float):
+        self.exporter = exporter
+        self.interval = interval
+        self._queue: deque[Span] = deque(maxlen=max_queue)
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def submit(self, span: Span) -> None:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # first span of this process (also after a fork)
+                    self._queue.clear()
+                    threading.Thread(target=self._run, name="trace-export", daemon=True).start()
+                    self._pid = os.getpid()
+        self._queue.append(span)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self) -> None:
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.BATCH_SIZE:
+                batch.append(self._queue.popleft())
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning("tracing: export of %d spans failed: %s", len(batch), e)
+                return
+
+
+@lru_cache(maxsize=None)
+def processor() -> Optional[BatchSpanProcessor]:
+    path = settings.TRACING_EXPORTER
+    if not path:
+        return None
+    return BatchSpanProcessor(import_string(path)(), max_queue=settings.TRACING_QUEUE_SIZE,
+                              interval=settings.TRACING_EXPORT_INTERVAL)
+
+
+# ---------------------------------------------------------------------------
+# spans
+# ---------------------------------------------------------------------------
+
+def _span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def _sampled(trace_id: str, parent: Optional[TraceParent]) -> bool:
+    if parent is not None:
+        return parent.sampled
+    rate = settings.TRACING_SAMPLE_RATE
+    return int(trace_id[-16:], 16) < rate * (1 << 64)
+
+
+def _finish(span: Span) -> None:
+    span.end_ns = time.time_ns()
+    p = processor()
+    if p is not None:
+        p.submit(span)
+
+
+@contextmanager
+def request_span(name: str, *, trace_id: Optional[str], traceparent: Optional[str],
+                 **attributes) -> Iterator[Optional[Span]]:
+    """
+    The root (server) span of a request, or None when tracing is off or the
+    request is not sampled. `trace_id` (the correlation id) is used when it
+    is a valid W3C trace id and no traceparent came in.
+    """
+    parent = parse_traceparent(traceparent)
+    if processor() is None:
+        yield None
+        return
+    if parent is not None:
+        trace_id = parent.trace_id
+    elif trace_id is None or not _TRACE_ID.match(trace_id):
+        trace_id = secrets.token_hex(16)
+    if not _sampled(trace_id, parent):
+        yield None
+        return
+    span = Span(trace_id, _span_id(), parent.span_id if parent else None, name, "server",
+                time.time_ns(), attributes=attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        _finish(span)
+
+
+@contextmanager
+def start_span(name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+    """
+    A child of the current span; does nothing outside a sampled request.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(parent.trace_id, _span_id(), parent.span_id, name, kind, time.time_ns(),
+                attributes=attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        _finish(span)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, kind: str = "internal", **attributes) -> None:
+    """
+    A finished child of the current span, for work timed elsewhere.
+    """
+    parent = _current.get()
+    if parent is None:
+        return
+    span = Span(parent.trace_id, _span_id(), parent.span_id, name, kind, start_ns, attributes=attributes)
+    p = processor()
+    if p is not None:
+        span.end_ns = end_ns
+        p.submit(span)
+
+
+def traceresponse(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """
+    Runs the decorated function (sync or async) in a span named `name` (the
+    function's qualified name by default).
+    """
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        if iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _current.get() is None:
+                    return await fn(*args, **kwargs)
+                with start_span(span_name, **attributes):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with start_span(span_name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_methods(component: str):
+    """
+    Class decorator: a span per call of each public method defined on the
+    class (and of `__call__`), named "<Class>.<method>" ("<Class>" for
+    `__call__`) and tagged with `component`. Generator methods are left
+    alone: their work happens while the caller iterates, outside any span
+    they could open; their Cypher statements still get spans.
+    """
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if not isfunction(value) or isgeneratorfunction(value) \
+                    or (attr.startswith("_") and attr != "__call__"):
+                continue
+            span_name = cls.__name__ if attr == "__call__" else f"{cls.__name__}.{attr}"
+            setattr(cls, attr, traced(span_name, component=component)(value))
+        return cls
+    return decorator
+
+
+def observe_query(record) -> None:
+    # infra.neo4j.instrumentation listener: one client span per statement
+    if _current.get() is None:
+        return
+    end = time.time_ns()
+    record_span(f"cypher {record.fingerprint}", end - int(record.duration * 1e9), end, "client",
+                **{"db.system": "neo4j", "db.statement": record.query.strip()[:2000],
+                   "db.response.returned_rows": record.rows, "code.function": record.caller})